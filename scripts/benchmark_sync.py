@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""
+benchmark_sync.py - End-to-end benchmark of sync-agents.py and sync-skills.py
+against a local GitHub stand-in.
+
+Generates a synthetic upstream repository of N agents and N skills, serves
+it from a loopback HTTP server emulating the Git Trees / Contents APIs,
+raw.githubusercontent.com and codeload.github.com (ETag / 304, rate-limit
+headers, optional 429 + Retry-After injection), then runs each sync mode
+as a subprocess pointed at it through the SYNC_GITHUB_API, SYNC_RAW_BASE
+and SYNC_CODELOAD_BASE environment overrides.
+
+For every (script, scenario, size) it records wall time, request counts by
+endpoint and status, exit code and peak RSS, and prints the results as
+JSON so they can be tracked across releases.
+
+Usage:
+    python scripts/benchmark_sync.py
+    python scripts/benchmark_sync.py --sizes 100,1000,10000 --jobs 8
+    python scripts/benchmark_sync.py --inject-429 50 --output bench.json
+    python scripts/benchmark_sync.py --scripts sync-agents --scenarios cold,bulk
+
+Requires: Python 3.8+ (stdlib only, no pip dependencies)
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import importlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from sync_common import (
+    CATEGORY_MAP,
+    DEFAULT_BRANCH,
+    DEFAULT_REPO,
+    _git_blob_sha,
+)
+
+sync_agents = importlib.import_module("sync-agents")
+sync_skills = importlib.import_module("sync-skills")
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# The API is served as 127.0.0.1 and raw/codeload as localhost so the
+# client's per-host rate limiter keeps them apart, as on github.com.
+API_HOST = "127.0.0.1"
+CONTENT_HOST = "localhost"
+
+DEFAULT_SIZES = (100, 1000)
+
+# (script, scenario, arguments, output directory). Scenarios run in this
+# order, so "incremental" and "force" start from the "cold" run's output.
+SCENARIOS: List[Tuple[str, str, List[str], str]] = [
+    ("sync-agents", "cold", ["--tier=all", "--incremental"], "main"),
+    ("sync-agents", "incremental", ["--tier=all", "--incremental"], "main"),
+    ("sync-agents", "force", ["--tier=all", "--force"], "main"),
+    ("sync-agents", "bulk", ["--tier=all", "--bulk", "--force"], "bulk"),
+    ("sync-skills", "cold", ["--all"], "main"),
+    ("sync-skills", "incremental", ["--all"], "main"),
+    ("sync-skills", "force", ["--all", "--force"], "main"),
+    ("sync-skills", "bulk", ["--all", "--bulk", "--force"], "bulk"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic upstream repository
+# ---------------------------------------------------------------------------
+
+
+class SyntheticRepo:
+    """In-memory upstream repository with *agents* agents and *skills* skills.
+
+    Agents and skills are spread over the known upstream categories, so the
+    sync scripts map them exactly as they would real ones.
+    """
+
+    def __init__(self, agents: int, skills: int) -> None:
+        self.files: Dict[str, bytes] = {}
+        categories = sorted(CATEGORY_MAP)
+        for i in range(agents):
+            category = categories[i % len(categories)]
+            name = f"bench-agent-{i:05d}"
+            self.files[f"{sync_agents.AGENTS_BASE_PATH}/{category}/{name}.md"] = (
+                _agent_source(name)
+            )
+        for i in range(skills):
+            category = categories[i % len(categories)]
+            name = f"bench-skill-{i:05d}"
+            base = f"{sync_skills.SKILLS_BASE_PATH}/{category}/{name}"
+            self.files[f"{base}/SKILL.md"] = _skill_source(name)
+            self.files[f"{base}/reference/notes.md"] = (
+                f"# Notes for {name}\n\n" + "Reference material.\n" * 20
+            ).encode("utf-8")
+
+        self.shas = {path: _git_blob_sha(data) for path, data in self.files.items()}
+        self.dirs = {
+            path.rsplit("/", i)[0]
+            for path in self.files
+            for i in range(1, path.count("/") + 1)
+        }
+        self._tarball: Optional[bytes] = None
+
+    def tree(self, path: str = "") -> List[Dict[str, Any]]:
+        """Recursive ``git/trees`` entries below *path* (relative to it)."""
+        prefix = f"{path}/" if path else ""
+        entries: List[Dict[str, Any]] = []
+        for d in sorted(self.dirs):
+            if d.startswith(prefix):
+                entries.append(
+                    {"path": d[len(prefix) :], "mode": "040000", "type": "tree"}
+                )
+        for p in sorted(self.files):
+            if p.startswith(prefix):
+                entries.append(
+                    {
+                        "path": p[len(prefix) :],
+                        "mode": "100644",
+                        "type": "blob",
+                        "sha": self.shas[p],
+                        "size": len(self.files[p]),
+                    }
+                )
+        return entries
+
+    def contents(self, path: str, api_base: str, raw_base: str) -> Any:
+        """Contents API response for *path*: a listing, a file, or None."""
+        if path in self.files:
+            return self._content_entry(path, "file", api_base, raw_base)
+        if path not in self.dirs:
+            return None
+        children = {
+            p[len(path) + 1 :].split("/", 1)[0]: p
+            for p in list(self.files) + list(self.dirs)
+            if p.startswith(path + "/")
+        }
+        return [
+            self._content_entry(
+                f"{path}/{name}",
+                "file" if f"{path}/{name}" in self.files else "dir",
+                api_base,
+                raw_base,
+            )
+            for name in sorted(children)
+        ]
+
+    def _content_entry(
+        self, path: str, kind: str, api_base: str, raw_base: str
+    ) -> Dict[str, Any]:
+        entry = {
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "type": kind,
+            "url": f"{api_base}/repos/{DEFAULT_REPO}/contents/{path}",
+        }
+        if kind == "file":
+            entry.update(
+                sha=self.shas[path],
+                size=len(self.files[path]),
+                download_url=f"{raw_base}/{DEFAULT_REPO}/{DEFAULT_BRANCH}/{path}",
+            )
+        return entry
+
+    def tarball(self) -> bytes:
+        """The repository as a codeload-style ``{repo}-{ref}/`` tar.gz."""
+        if self._tarball is None:
+            buf = io.BytesIO()
+            top = f"{DEFAULT_REPO.split('/')[1]}-{DEFAULT_BRANCH}"
+            with tarfile.open(fileobj=buf, mode="w") as tar:
+                for path, data in sorted(self.files.items()):
+                    info = tarfile.TarInfo(f"{top}/{path}")
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+            self._tarball = gzip.compress(buf.getvalue(), compresslevel=1)
+        return self._tarball
+
+
+def _agent_source(name: str) -> bytes:
+    return (
+        f"---\nname: {name}\n"
+        f"description: Synthetic benchmark agent {name} for sync timing runs.\n"
+        "tools: Read, Write, Edit, Bash, Glob, Grep\n---\n\n"
+        f"You are {name}, a synthetic agent used to benchmark the sync.\n\n"
+        "## Workflow\n\n" + "- Analyse the request and act on it.\n" * 40
+    ).encode("utf-8")
+
+
+def _skill_source(name: str) -> bytes:
+    return (
+        f"---\nname: {name}\n"
+        f"description: Synthetic benchmark skill {name}.\n---\n\n"
+        f"# {name}\n\nSee reference/notes.md.\n\n" + "Step.\n" * 40
+    ).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Local GitHub stand-in
+# ---------------------------------------------------------------------------
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Routes /api, /raw and /codeload requests to the synthetic repo."""
+
+    protocol_version = "HTTP/1.1"
+    server: "GitHubStandIn"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        section, _, rest = url.path.lstrip("/").partition("/")
+        if section == "api":
+            self._api(unquote(rest), parse_qs(url.query))
+        elif section == "raw":
+            self._raw(unquote(rest))
+        elif section == "codeload":
+            self._send("codeload", 200, self.server.repo.tarball(), "application/gzip")
+        else:
+            self._send("other", 404, b"")
+
+    def _api(self, path: str, query: Dict[str, List[str]]) -> None:
+        server = self.server
+        repo_prefix = f"repos/{DEFAULT_REPO}/"
+        if path == "rate_limit":
+            body: Any = {"resources": {"core": server.budget_snapshot()}}
+            return self._json(200, body)
+        if not path.startswith(repo_prefix):
+            return self._json(404, {"message": "Not Found"})
+        path = path[len(repo_prefix) :]
+        if path.startswith("git/trees/") and server.trees:
+            treeish = path[len("git/trees/") :]
+            _branch, _, subpath = treeish.partition(":")
+            if subpath and subpath not in server.repo.dirs:
+                return self._json(404, {"message": "Not Found"})
+            tree = server.repo.tree(subpath)
+            return self._json(200, {"sha": "0" * 40, "tree": tree, "truncated": False})
+        if path.startswith("contents/"):
+            listing = server.repo.contents(
+                path[len("contents/") :].strip("/"), server.api_base, server.raw_base
+            )
+            if listing is not None:
+                return self._json(200, listing)
+        return self._json(404, {"message": "Not Found"})
+
+    def _raw(self, path: str) -> None:
+        prefix = f"{DEFAULT_REPO}/{DEFAULT_BRANCH}/"
+        path = path[len(prefix) :] if path.startswith(prefix) else ""
+        data = self.server.repo.files.get(path)
+        if data is None:
+            return self._send("raw", 404, b"404: Not Found")
+        if self.server.throttle():
+            return self._send("raw", 429, b"", extra={"Retry-After": "1"})
+        etag = f'"{self.server.repo.shas[path]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send("raw", 304, b"", extra={"ETag": etag})
+        self._send("raw", 200, data, "text/plain; charset=utf-8", {"ETag": etag})
+
+    def _json(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode("utf-8")
+        headers = self.server.spend_budget()
+        self._send("api", status, data, "application/json", headers)
+
+    def _send(
+        self,
+        endpoint: str,
+        status: int,
+        body: bytes,
+        content_type: str = "text/plain",
+        extra: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.server.count(endpoint, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class GitHubStandIn(ThreadingHTTPServer):
+    """Loopback server emulating the GitHub endpoints used by the sync.
+
+    API responses carry ``X-RateLimit-*`` headers drawn from *api_budget*;
+    every *inject_429*-th raw request (0 disables) is answered with a 429
+    and ``Retry-After: 1``. With *trees* False the Git Trees API returns
+    404, exercising the Contents API fallback.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        repo: SyntheticRepo,
+        *,
+        api_budget: int = 5000,
+        inject_429: int = 0,
+        trees: bool = True,
+    ) -> None:
+        super().__init__((API_HOST, 0), _StandInHandler)
+        self.repo = repo
+        self.api_budget = api_budget
+        self.inject_429 = inject_429
+        self.trees = trees
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.reset()
+
+    @property
+    def api_base(self) -> str:
+        return f"http://{API_HOST}:{self.server_port}/api"
+
+    @property
+    def raw_base(self) -> str:
+        return f"http://{CONTENT_HOST}:{self.server_port}/raw"
+
+    @property
+    def codeload_base(self) -> str:
+        return f"http://{CONTENT_HOST}:{self.server_port}/codeload"
+
+    def env(self) -> Dict[str, str]:
+        """Environment overrides pointing the sync scripts at this server."""
+        return {
+            "SYNC_GITHUB_API": self.api_base,
+            "SYNC_RAW_BASE": self.raw_base,
+            "SYNC_CODELOAD_BASE": self.codeload_base,
+        }
+
+    def reset(self) -> None:
+        """Reset request counters and the rate-limit budget between runs."""
+        with self._lock:
+            self.requests: Counter = Counter()
+            self.remaining = self.api_budget
+            self.reset_at = int(time.time()) + 3600
+            self._raw_seen = 0
+
+    def count(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            self.requests[f"{endpoint}:{status}"] += 1
+
+    def throttle(self) -> bool:
+        """True when this raw request should be answered with a 429."""
+        if self.inject_429 <= 0:
+            return False
+        with self._lock:
+            self._raw_seen += 1
+            return self._raw_seen % self.inject_429 == 0
+
+    def spend_budget(self) -> Dict[str, str]:
+        with self._lock:
+            self.remaining = max(self.remaining - 1, 0)
+            return self._budget_headers()
+
+    def budget_snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "limit": self.api_budget,
+                "remaining": self.remaining,
+                "reset": self.reset_at,
+            }
+
+    def _budget_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.api_budget),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset_at),
+        }
+
+    def start(self) -> "GitHubStandIn":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def run_scenario(
+    script: str,
+    args: List[str],
+    env: Dict[str, str],
+    *,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Run one sync script; return wall time, exit code and peak RSS."""
+    cmd = [sys.executable, str(SCRIPTS_DIR / f"{script}.py"), *args]
+    output = None if verbose else subprocess.DEVNULL
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=output, stderr=output)
+    peak_rss_kb: Optional[int] = None
+    if hasattr(os, "wait4"):
+        _pid, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = (
+            os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+        )
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss_kb = usage.ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+    else:
+        proc.wait()
+    return {
+        "wall_time_s": round(time.perf_counter() - start, 3),
+        "exit_code": proc.returncode,
+        "peak_rss_kb": peak_rss_kb,
+    }
+
+
+def run_benchmarks(
+    sizes: List[int],
+    *,
+    jobs: int = 4,
+    inject_429: int = 0,
+    trees: bool = True,
+    scripts: Optional[List[str]] = None,
+    scenarios: Optional[List[str]] = None,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Run every selected scenario for every size and collect the results."""
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        server = GitHubStandIn(
+            SyntheticRepo(size, size), inject_429=inject_429, trees=trees
+        ).start()
+        env = {k: v for k, v in os.environ.items() if k != "GITHUB_TOKEN"}
+        env.update(server.env())
+        try:
+            with tempfile.TemporaryDirectory(prefix="sync-bench-") as tmp:
+                for script, scenario, args, workdir in SCENARIOS:
+                    if scripts and script not in scripts:
+                        continue
+                    if scenarios and scenario not in scenarios:
+                        continue
+                    out_dir = Path(tmp) / script / workdir
+                    argv = [*args, "--output-dir", str(out_dir), "--jobs", str(jobs)]
+                    server.reset()
+                    run = run_scenario(script, argv, env, verbose=verbose)
+                    results.append(
+                        {
+                            "script": script,
+                            "scenario": scenario,
+                            "size": size,
+                            **run,
+                            "requests": dict(sorted(server.requests.items())),
+                            "request_count": sum(server.requests.values()),
+                        }
+                    )
+                    print(
+                        f"  {script:12s} {scenario:12s} n={size:<6d} "
+                        f"{run['wall_time_s']:8.2f}s "
+                        f"{results[-1]['request_count']:6d} req "
+                        f"exit={run['exit_code']}",
+                        file=sys.stderr,
+                    )
+        finally:
+            server.stop()
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "jobs": jobs,
+        "inject_429": inject_429,
+        "trees": trees,
+        "results": results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _csv_list(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark sync-agents.py and sync-skills.py against a local "
+            "GitHub stand-in serving a synthetic repository."
+        ),
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda v: [int(n) for n in _csv_list(v)],
+        default=list(DEFAULT_SIZES),
+        metavar="N[,N...]",
+        help="Agent and skill counts to generate (default: 100,1000)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=4,
+        metavar="N",
+        help="--jobs passed to the sync scripts (default: 4)",
+    )
+    parser.add_argument(
+        "--inject-429",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Answer every Nth raw request with 429 + Retry-After (default: off)",
+    )
+    parser.add_argument(
+        "--contents-only",
+        action="store_true",
+        help="Disable the Git Trees API to benchmark the Contents API fallback",
+    )
+    parser.add_argument(
+        "--scripts",
+        type=_csv_list,
+        metavar="NAME[,NAME...]",
+        help="Only run these scripts (sync-agents, sync-skills)",
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=_csv_list,
+        metavar="NAME[,NAME...]",
+        help="Only run these scenarios (cold, incremental, force, bulk)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        metavar="FILE",
+        help="Write the JSON results to FILE instead of stdout",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Show the output of the sync scripts",
+    )
+    return parser
+
+
+def main() -> int:
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    report = run_benchmarks(
+        args.sizes,
+        jobs=args.jobs,
+        inject_429=args.inject_429,
+        trees=not args.contents_only,
+        scripts=args.scripts,
+        scenarios=args.scenarios,
+        verbose=args.verbose,
+    )
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0 if all(r["exit_code"] == 0 for r in report["results"]) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,20 +7,27 @@ and updates the markdown tables in README.md (French) and README.en.md (English)
 between <!-- SCORES:BEGIN --> and <!-- SCORES:END --> markers.
 
 Usage:
-    python3 scripts/generate_readme_scores.py           # Update READMEs in place
-    python3 scripts/generate_readme_scores.py --check   # Exit 1 if out of date (CI)
+    python3 scripts/generate_readme_scores.py             # Update READMEs in place
+    python3 scripts/generate_readme_scores.py --check     # Exit 1 if out of date (CI)
+    python3 scripts/generate_readme_scores.py --no-cache  # Rescore every agent
+
+Scores are cached in .score-cache.json, keyed by agent path, file sha256 and
+scorer version, so only changed agents are rescored. The cache is committed
+so that CI's --check reuses it too; --check never writes it, and fails when
+it is out of date just like the tables.
 
 Requires: Python 3.10+ (stdlib only, no pip dependencies)
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import sys
 from collections import Counter
 from pathlib import Path
 from statistics import mean
-from typing import Any, Dict, List, NamedTuple
+from typing import Any, Dict, List, NamedTuple, Optional
 
 # ---------------------------------------------------------------------------
 # Path setup — allow importing quality_scorer from the scripts/ directory
@@ -32,7 +39,8 @@ _PROJECT_ROOT = _SCRIPTS_DIR.parent
 if str(_SCRIPTS_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPTS_DIR))
 
-from quality_scorer import score_agent  # noqa: E402
+from quality_scorer import SCORER_VERSION, score_agent  # noqa: E402
+from sync_common import atomic_write_text  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -46,6 +54,7 @@ README_FR = _PROJECT_ROOT / "README.md"
 README_EN = _PROJECT_ROOT / "README.en.md"
 MANIFEST_PATH = _PROJECT_ROOT / "manifest.json"
 AGENTS_DIR = _PROJECT_ROOT / "agents"
+SCORE_CACHE_PATH = _PROJECT_ROOT / ".score-cache.json"
 
 
 # ---------------------------------------------------------------------------
@@ -92,9 +101,42 @@ def load_manifest() -> List[Dict[str, Any]]:
     return agents
 
 
-def score_all_agents(agents: List[Dict[str, Any]]) -> List[AgentScore]:
-    """Score every agent from the manifest, skipping missing files."""
+def load_score_cache() -> Dict[str, Any]:
+    """Load cached scores (``{path: entry}``) for the current scorer version.
+
+    Returns an empty dict when the cache is missing, corrupt or was written
+    by another :data:`~quality_scorer.SCORER_VERSION`.
+    """
+    try:
+        data = json.loads(SCORE_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("scorer_version") != SCORER_VERSION:
+        return {}
+    agents = data.get("agents")
+    return agents if isinstance(agents, dict) else {}
+
+
+def save_score_cache(cache: Dict[str, Any]) -> None:
+    """Persist *cache* (as filled by :func:`score_all_agents`) atomically."""
+    data = {"scorer_version": SCORER_VERSION, "agents": cache}
+    atomic_write_text(
+        SCORE_CACHE_PATH, json.dumps(data, indent=2, sort_keys=True) + "\n"
+    )
+
+
+def score_all_agents(
+    agents: List[Dict[str, Any]], cache: Optional[Dict[str, Any]] = None
+) -> List[AgentScore]:
+    """Score every agent from the manifest, skipping missing files.
+
+    *cache* (``{path: entry}``, updated in-place) skips rescoring agents
+    whose file sha256 matches the cached entry. The hash is taken from the
+    file itself rather than the manifest, which can lag behind local edits.
+    Entries for agents that were not scored are dropped.
+    """
     results: List[AgentScore] = []
+    fresh: Dict[str, Any] = {}
 
     for entry in agents:
         agent_path = AGENTS_DIR / f"{entry['path']}.md"
@@ -106,12 +148,19 @@ def score_all_agents(agents: List[Dict[str, Any]]) -> List[AgentScore]:
             continue
 
         try:
-            content = agent_path.read_text(encoding="utf-8")
-            file_size = agent_path.stat().st_size
-            line_count = len(content.splitlines())
-            tokens = file_size // 4
-
-            result = score_agent(content)
+            sha256 = hashlib.sha256(agent_path.read_bytes()).hexdigest()
+            cached = cache.get(entry["path"]) if cache is not None else None
+            if not isinstance(cached, dict) or cached.get("sha256") != sha256:
+                content = agent_path.read_text(encoding="utf-8")
+                file_size = agent_path.stat().st_size
+                result = score_agent(content)
+                cached = {
+                    "sha256": sha256,
+                    "overall": result["overall"],
+                    "label": result["label"],
+                    "tokens": file_size // 4,
+                    "lines": len(content.splitlines()),
+                }
         except Exception as exc:
             print(
                 f"WARNING: scoring failed for {entry['name']}: {exc}",
@@ -119,17 +168,22 @@ def score_all_agents(agents: List[Dict[str, Any]]) -> List[AgentScore]:
             )
             continue
 
+        fresh[entry["path"]] = cached
         results.append(
             AgentScore(
                 category=entry["category"],
                 name=entry["name"],
-                overall=result["overall"],
-                label=result["label"],
-                tokens=tokens,
-                lines=line_count,
+                overall=cached["overall"],
+                label=cached["label"],
+                tokens=cached["tokens"],
+                lines=cached["lines"],
             )
         )
 
+    if cache is not None:
+        cache.clear()
+        cache.update(fresh)
+
     # Sort by category, then by name within category
     results.sort(key=lambda a: (a.category, a.name))
     return results
@@ -253,17 +307,25 @@ def replace_between_markers(content: str, new_section: str, filepath: Path) -> s
     return before + new_section + "\n" + after
 
 
-def update_readmes(check: bool = False) -> int:
+def update_readmes(check: bool = False, use_cache: bool = True) -> int:
     """Main entry point: score agents and update (or check) both READMEs.
 
     Args:
-        check: If True, don't write — just verify content matches.
+        check: If True, don't write — just verify content matches, score
+            cache included.
+        use_cache: Reuse the score cache (see :func:`score_all_agents`),
+            and save it when scores changed unless *check* is set.
 
     Returns:
         0 if everything is up to date (or was updated), 1 if check failed.
     """
     agents = load_manifest()
-    scores = score_all_agents(agents)
+    cache = load_score_cache() if use_cache else None
+    previous = dict(cache) if cache is not None else None
+    scores = score_all_agents(agents, cache)
+    cache_stale = cache is not None and cache != previous
+    if not check and cache_stale:
+        save_score_cache(cache)
 
     table_fr = generate_table_fr(scores)
     table_en = generate_table_en(scores)
@@ -275,6 +337,13 @@ def update_readmes(check: bool = False) -> int:
 
     if check:
         all_ok = True
+        if cache_stale:
+            print(
+                f"MISMATCH: {SCORE_CACHE_PATH.name} is out of date. "
+                f"Run: python3 scripts/generate_readme_scores.py",
+                file=sys.stderr,
+            )
+            all_ok = False
         for readme_path, table_content in updates:
             if not readme_path.exists():
                 print(
@@ -323,7 +392,8 @@ def update_readmes(check: bool = False) -> int:
 def main() -> int:
     """Parse CLI args and run."""
     check = "--check" in sys.argv[1:]
-    return update_readmes(check=check)
+    use_cache = "--no-cache" not in sys.argv[1:]
+    return update_readmes(check=check, use_cache=use_cache)
 
 
 if __name__ == "__main__":
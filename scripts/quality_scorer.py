@@ -11,6 +11,7 @@ Quality Gate, Conciseness, No Banned Sections, Version Pinning.
 Pass criteria: overall mean >= 3.5 AND no dimension < 2.
 
 Standalone: python3 scripts/quality_scorer.py path/to/agent.md
+Batch:      python3 scripts/quality_scorer.py --batch agents/ --min-overall 3.5
 Importable: from quality_scorer import score_agent
 
 Requires: Python 3.10+ (stdlib only, no pip dependencies)
@@ -18,26 +19,43 @@ Requires: Python 3.10+ (stdlib only, no pip dependencies)
 
 from __future__ import annotations
 
+import argparse
+import csv
+import json
+import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from statistics import mean
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, TextIO, Union
 
-from sync_common import parse_nested_frontmatter
+from sync_common import AgentDocument
+
+# Version of the scoring rules. Bump whenever score_agent() can return a
+# different result for the same file, so persisted scores (e.g. the
+# generate_readme_scores.py cache) are invalidated.
+SCORER_VERSION = "1"
 
 
 # ---------------------------------------------------------------------------
 # Regex patterns
 # ---------------------------------------------------------------------------
 
+# The per-line patterns below run over whole sections in MULTILINE mode;
+# [^\S\n] is whitespace other than a newline, so a match never spans lines.
+
 # IF/THEN/ELIF/ELSE decision tree keywords (case-insensitive, whole words)
-_RE_DECISION_TREE = re.compile(r"(?i)^\s*[-*]?\s*\b(IF|THEN|ELIF|ELSE)\b")
+_RE_DECISION_TREE = re.compile(
+    r"(?im)^[^\S\n]*[-*]?[^\S\n]*\b(?:IF|THEN|ELIF|ELSE)\b"
+)
 
 # Fenced code block opener (``` with optional language tag)
-_RE_CODE_FENCE = re.compile(r"^```")
+_RE_CODE_FENCE = re.compile(r"(?m)^[^\S\n]*```")
 
 # Bullet point (- or * at start of line, possibly indented)
-_RE_BULLET = re.compile(r"^\s*[-*]\s+\S")
+_RE_BULLET = re.compile(r"(?m)^[^\S\n]*[-*][^\S\n]+\S")
 
 # Version numbers: 5.x, 3.11+, v2, >=4.0, ~=1.2, etc.
 _RE_VERSION = re.compile(r"\b(?:v?\d+\.\d+[\w.*+-]*|\bv\d+\b|\b\d+\.x\b)")
@@ -45,14 +63,11 @@ _RE_VERSION = re.compile(r"\b(?:v?\d+\.\d+[\w.*+-]*|\bv\d+\b|\b\d+\.x\b)")
 # Year references: 2020-2029
 _RE_YEAR = re.compile(r"\b20[2-3]\d\b")
 
-# Banned section headings from the old format (any heading level)
-_RE_BANNED_SECTION = re.compile(
-    r"^#{1,3}\s+(Workflow|Tools|Anti-patterns|Collaboration)\s*$",
-    re.MULTILINE | re.IGNORECASE,
-)
+# Inline IF...THEN pattern (e.g., "IF x → THEN y")
+_RE_INLINE_DECISION = re.compile(r"(?i)\bIF\b.*?\bTHEN\b")
 
-# Section heading detector
-_RE_SECTION_HEADING = re.compile(r"^##\s+(.+)", re.MULTILINE)
+# Banned section titles from the old format (any heading level up to ###)
+_BANNED_TITLES = frozenset({"workflow", "tools", "anti-patterns", "collaboration"})
 
 # Generic filler phrases (kept from old scorer for density check)
 _RE_FILLER = re.compile(
@@ -66,53 +81,17 @@ _RE_FILLER = re.compile(
 # ---------------------------------------------------------------------------
 
 
-def _extract_identity_paragraph(body: str) -> str:
-    """Extract text between the end of frontmatter and the first ## heading.
-
-    Returns the identity paragraph text (may be empty).
-    """
-    match = re.search(r"^##\s", body, re.MULTILINE)
-    if match:
-        return body[: match.start()].strip()
-    # No ## heading found — entire body is "identity" (unlikely but handle it)
-    return body.strip()
-
-
-def _extract_section(body: str, heading: str) -> str:
-    """Extract content under a specific ## heading until the next ## or end.
-
-    Args:
-        body: The markdown body (after frontmatter).
-        heading: The heading text to find (e.g., "Decisions").
-
-    Returns:
-        Section content (empty string if heading not found).
-    """
-    pattern = re.compile(
-        r"^##\s+" + re.escape(heading) + r"\s*$",
-        re.MULTILINE,
-    )
-    match = pattern.search(body)
-    if not match:
-        return ""
-
-    start = match.end()
-    # Find the next ## heading
-    next_heading = re.search(r"^##\s+", body[start:], re.MULTILINE)
-    if next_heading:
-        return body[start : start + next_heading.start()].strip()
-    return body[start:].strip()
-
-
-def _count_code_fences(text: str) -> int:
-    """Count the number of fenced code blocks (``` pairs) in text."""
-    fences = [ln for ln in text.split("\n") if _RE_CODE_FENCE.match(ln.strip())]
-    return len(fences) // 2  # opening + closing = 1 block
-
-
-def _count_bullets(text: str) -> int:
-    """Count bullet-point lines in text."""
-    return sum(1 for ln in text.split("\n") if _RE_BULLET.match(ln))
+def _count_filler_lines(body: str) -> int:
+    """Number of lines of *body* holding at least one filler phrase."""
+    count = 0
+    line_end = -1
+    for match in _RE_FILLER.finditer(body):
+        if match.start() > line_end:
+            count += 1
+            line_end = body.find("\n", match.start())
+            if line_end == -1:
+                break
+    return count
 
 
 # ---------------------------------------------------------------------------
@@ -120,7 +99,7 @@ def _count_bullets(text: str) -> int:
 # ---------------------------------------------------------------------------
 
 
-def score_agent(content: str) -> Dict[str, Any]:
+def score_agent(content: Union[str, AgentDocument]) -> Dict[str, Any]:
     """Score an agent markdown file across 8 quality dimensions.
 
     Dimensions:
@@ -134,17 +113,20 @@ def score_agent(content: str) -> Dict[str, Any]:
         version_pinning — identity contains version numbers or year refs
 
     Args:
-        content: Raw markdown string of the agent file.
+        content: Raw markdown string of the agent file, or an already
+            parsed :class:`AgentDocument` (its views are reused).
 
     Returns:
         Dict with ``dimensions`` (name→int), ``overall`` (float),
         ``min_dimension`` (int), ``passed`` (bool), ``label`` (str).
     """
-    meta, body = parse_nested_frontmatter(content)
+    document = AgentDocument.of(content)
+    meta, body = document.frontmatter, document.body
 
-    # Count body lines only (excludes frontmatter YAML) for conciseness scoring
-    body_lines = body.strip().split("\n")
-    body_line_count = len(body_lines)
+    # Body-based dimensions read the document's section index (the body
+    # excludes frontmatter YAML)
+    sections = document.sections
+    body_line_count = body.count("\n") + 1
 
     scores: Dict[str, int] = {}
 
@@ -170,7 +152,7 @@ def score_agent(content: str) -> Dict[str, Any]:
     # ---------------------------------------------------------------
     # 2. Identity — paragraph before first ##, 50-300 words
     # ---------------------------------------------------------------
-    identity_text = _extract_identity_paragraph(body)
+    identity_text = document.preamble
     # Strip any `# Identity` heading if present (old format compat)
     identity_text = re.sub(r"^#\s+Identity\s*\n+", "", identity_text).strip()
     identity_words = len(identity_text.split()) if identity_text else 0
@@ -187,14 +169,13 @@ def score_agent(content: str) -> Dict[str, Any]:
     # ---------------------------------------------------------------
     # 3. Decisions — ## Decisions with IF/THEN/ELIF/ELSE patterns
     # ---------------------------------------------------------------
-    decisions_section = _extract_section(body, "Decisions")
+    decisions_section = sections.get("Decisions")
     if decisions_section:
-        decision_keywords = sum(
-            1 for ln in decisions_section.split("\n") if _RE_DECISION_TREE.search(ln)
+        # Keyword lines, or inline IF...THEN patterns if there are more
+        total_decision_signals = max(
+            len(_RE_DECISION_TREE.findall(decisions_section)),
+            len(_RE_INLINE_DECISION.findall(decisions_section)),
         )
-        # Also count inline IF...THEN patterns (e.g., "IF x → THEN y")
-        inline_patterns = len(re.findall(r"(?i)\bIF\b.*?\bTHEN\b", decisions_section))
-        total_decision_signals = max(decision_keywords, inline_patterns)
 
         if total_decision_signals >= 5:
             scores["decisions"] = 5
@@ -208,9 +189,10 @@ def score_agent(content: str) -> Dict[str, Any]:
     # ---------------------------------------------------------------
     # 4. Examples — ## Examples with 2+ fenced code blocks
     # ---------------------------------------------------------------
-    examples_section = _extract_section(body, "Examples")
+    examples_section = sections.get("Examples")
     if examples_section:
-        code_blocks = _count_code_fences(examples_section)
+        fences = len(_RE_CODE_FENCE.findall(examples_section))
+        code_blocks = fences // 2  # opening + closing = 1 block
         if code_blocks >= 3:
             scores["examples"] = 5
         elif code_blocks >= 2:
@@ -225,9 +207,9 @@ def score_agent(content: str) -> Dict[str, Any]:
     # ---------------------------------------------------------------
     # 5. Quality Gate — ## Quality Gate with 3+ bullet points
     # ---------------------------------------------------------------
-    qg_section = _extract_section(body, "Quality Gate")
+    qg_section = sections.get("Quality Gate")
     if qg_section:
-        bullet_count = _count_bullets(qg_section)
+        bullet_count = len(_RE_BULLET.findall(qg_section))
         if bullet_count >= 5:
             scores["quality_gate"] = 5
         elif bullet_count >= 3:
@@ -242,8 +224,7 @@ def score_agent(content: str) -> Dict[str, Any]:
     # ---------------------------------------------------------------
     # 6. Conciseness — body line count sweet spot 70-120, acceptable 50-150
     # ---------------------------------------------------------------
-    filler_count = sum(1 for ln in body_lines if _RE_FILLER.search(ln))
-    filler_ratio = filler_count / max(body_line_count, 1)
+    filler_ratio = _count_filler_lines(body) / max(body_line_count, 1)
 
     if 70 <= body_line_count <= 120 and filler_ratio <= 0.03:
         scores["conciseness"] = 5
@@ -259,10 +240,14 @@ def score_agent(content: str) -> Dict[str, Any]:
     # ---------------------------------------------------------------
     # 7. No Banned Sections — old format headings must be absent
     # ---------------------------------------------------------------
-    banned_matches = _RE_BANNED_SECTION.findall(body)
-    if len(banned_matches) == 0:
+    banned_headings = sum(
+        1
+        for level, title, _start, _end in document.headings
+        if level <= 3 and title.lower() in _BANNED_TITLES
+    )
+    if banned_headings == 0:
         scores["no_banned_sections"] = 5
-    elif len(banned_matches) == 1:
+    elif banned_headings == 1:
         scores["no_banned_sections"] = 3
     else:
         scores["no_banned_sections"] = 1
@@ -307,19 +292,197 @@ def score_agent(content: str) -> Dict[str, Any]:
     }
 
 
+# ---------------------------------------------------------------------------
+# Batch scoring
+# ---------------------------------------------------------------------------
+
+# Dimension order of score_agent() results (CSV columns)
+DIMENSIONS = (
+    "frontmatter",
+    "identity",
+    "decisions",
+    "examples",
+    "quality_gate",
+    "conciseness",
+    "no_banned_sections",
+    "version_pinning",
+)
+
+_CSV_FIELDS = ["path", *DIMENSIONS, "overall", "min_dimension", "label", "passed"]
+
+
+def _score_file(path: str) -> Dict[str, Any]:
+    """Score one file for :func:`score_batch` (runs in a worker process)."""
+    try:
+        content = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as exc:
+        return {"path": path, "error": str(exc)}
+    return {"path": path, **score_agent(content)}
+
+
+def score_batch(root: Path, jobs: int = 1) -> List[Dict[str, Any]]:
+    """Score every ``*.md`` file under *root*, in path order.
+
+    With *jobs* > 1 the files are spread over a process pool in chunks, so
+    each worker scores many files per round trip. Each record holds the
+    :func:`score_agent` result plus ``path`` (relative to *root*), or only
+    ``path`` and ``error`` when the file could not be read.
+    """
+    files = sorted(str(p) for p in root.rglob("*.md") if p.is_file())
+    if jobs > 1 and len(files) > 1:
+        chunksize = max(1, len(files) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            records = list(executor.map(_score_file, files, chunksize=chunksize))
+    else:
+        records = [_score_file(path) for path in files]
+    for record in records:
+        record["path"] = Path(record["path"]).relative_to(root).as_posix()
+    return records
+
+
+def write_records(records: List[Dict[str, Any]], out: TextIO, fmt: str) -> None:
+    """Write batch *records* to *out* as JSON Lines (``jsonl``) or ``csv``.
+
+    CSV has one column per dimension; unreadable files get an empty row
+    apart from their path.
+    """
+    if fmt == "jsonl":
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return
+    writer = csv.DictWriter(out, fieldnames=_CSV_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for record in records:
+        row = {k: v for k, v in record.items() if k in _CSV_FIELDS}
+        row.update(record.get("dimensions", {}))
+        writer.writerow(row)
+
+
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
 
 
-def main() -> int:
-    """Score one or more agent files from the command line."""
-    if len(sys.argv) < 2:
-        print(f"Usage: {sys.argv[0]} <agent.md> [agent2.md ...]", file=sys.stderr)
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Score agent markdown files across 8 quality dimensions.",
+        epilog=(
+            "Exit codes: 0=all passed, 1=a file failed, could not be read or "
+            "scored below --min-overall"
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="agent.md",
+        help="Agent files to score, with a human-readable report each",
+    )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        metavar="DIR",
+        help="Score every *.md file under DIR and emit one record per agent",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("jsonl", "csv"),
+        default="jsonl",
+        help="Record format for --batch (default: jsonl)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        metavar="PATH",
+        help="Write --batch records to PATH instead of stdout",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Worker processes for --batch (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--min-overall",
+        type=float,
+        metavar="SCORE",
+        help=(
+            "Fail when any agent's overall score is below SCORE. In --batch "
+            "mode this is the only quality gate; file mode also requires "
+            "each agent to pass."
+        ),
+    )
+    return parser
+
+
+def _print_report(path: str, result: Dict[str, Any]) -> None:
+    print(f"\n{'=' * 60}")
+    print(f"  {path}")
+    print(f"{'=' * 60}")
+    for dim, val in result["dimensions"].items():
+        bar = "#" * val + "." * (5 - val)
+        print(f"  {dim:30s} [{bar}] {val}/5")
+    print(f"  {'':30s} --------")
+    print(f"  {'overall':30s} {result['overall']:.2f}/5.00")
+    print(f"  {'label':30s} {result['label']}")
+    print(f"  {'passed':30s} {'YES' if result['passed'] else 'NO'}")
+
+
+def _run_batch(args: argparse.Namespace) -> int:
+    """``--batch`` mode: score a whole tree, emit records, apply the gate."""
+    started = time.monotonic()
+    records = score_batch(args.batch, jobs=args.jobs)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            write_records(records, out, args.format)
+    else:
+        write_records(records, sys.stdout, args.format)
+
+    errors = [r for r in records if "error" in r]
+    for record in errors:
+        print(f"ERROR: {record['path']}: {record['error']}", file=sys.stderr)
+    below = [
+        r
+        for r in records
+        if args.min_overall is not None
+        and "error" not in r
+        and r["overall"] < args.min_overall
+    ]
+    for record in below:
+        print(
+            f"BELOW: {record['path']}: {record['overall']:.2f} "
+            f"< {args.min_overall:.2f}",
+            file=sys.stderr,
+        )
+    print(
+        f"Scored {len(records) - len(errors)} agents in "
+        f"{time.monotonic() - started:.2f}s ({args.jobs} workers): "
+        f"{len(below)} below --min-overall, {len(errors)} unreadable",
+        file=sys.stderr,
+    )
+    return 1 if errors or below else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Score agent files, or a whole tree with ``--batch``."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.batch is not None:
+        if args.paths:
+            parser.error("--batch cannot be combined with file arguments")
+        if not args.batch.is_dir():
+            parser.error(f"--batch: not a directory: {args.batch}")
+        return _run_batch(args)
+    if not args.paths:
+        parser.print_usage(sys.stderr)
         return 1
 
     exit_code = 0
-    for path in sys.argv[1:]:
+    for path in args.paths:
         try:
             with open(path, encoding="utf-8") as f:
                 content = f.read()
@@ -329,19 +492,12 @@ def main() -> int:
             continue
 
         result = score_agent(content)
-        print(f"\n{'=' * 60}")
-        print(f"  {path}")
-        print(f"{'=' * 60}")
-        for dim, val in result["dimensions"].items():
-            bar = "#" * val + "." * (5 - val)
-            print(f"  {dim:30s} [{bar}] {val}/5")
-        print(f"  {'':30s} --------")
-        print(f"  {'overall':30s} {result['overall']:.2f}/5.00")
-        print(f"  {'label':30s} {result['label']}")
-        print(f"  {'passed':30s} {'YES' if result['passed'] else 'NO'}")
+        _print_report(path, result)
 
         if not result["passed"]:
             exit_code = 1
+        if args.min_overall is not None and result["overall"] < args.min_overall:
+            exit_code = 1
 
     return exit_code
 
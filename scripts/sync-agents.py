@@ -10,6 +10,12 @@ Usage:
     python scripts/sync-agents.py --all
     python scripts/sync-agents.py --dry-run --verbose
     python scripts/sync-agents.py --clean --force
+    python scripts/sync-agents.py --tier=all --jobs 8
+    python scripts/sync-agents.py --tier=all --bulk
+    python scripts/sync-agents.py --tier=all --record fixtures/
+    python scripts/sync-agents.py --tier=all --replay fixtures/ --replay-latency 0.05
+    python scripts/sync-agents.py --tier=extended --jobs 4 --stats-json stats.json
+    python scripts/sync-agents.py --tier=all --resume
 
 Requires: Python 3.8+ (stdlib only, no pip dependencies)
 Supports: GITHUB_TOKEN env var for higher rate limits (5000 req/hr vs 60 req/hr)
@@ -18,17 +24,17 @@ Supports: GITHUB_TOKEN env var for higher rate limits (5000 req/hr vs 60 req/hr)
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import os
 import re
 import sys
 import tempfile
-import time
 import traceback
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from sync_common import (
     CATEGORY_MAP,
@@ -37,16 +43,34 @@ from sync_common import (
     GITHUB_API,
     RAW_BASE,
     SYNC_CACHE_FILENAME,
+    ArchiveError,
+    RepoArchive,
+    StageResult,
+    SyncJournal,
+    SyncJournalMismatch,
+    sync_journal_filename,
     _get_headers,
     _http_request,
     _api_get,
     _raw_get,
     _cached_get,
     check_rate_limit,
+    fetch_blob_oids,
+    get_repo_tree,
+    prime_repo_tree,
+    download_repo_archive,
+    add_fixture_arguments,
+    install_fixture_store,
+    add_stats_arguments,
+    add_resume_argument,
+    write_stats,
+    stats,
     _load_sync_cache,
     _save_sync_cache,
     _remove_sync_cache,
-    parse_frontmatter,
+    atomic_write_text,
+    run_pipeline,
+    AgentDocument,
     validate_output_path,
     is_synced_file,
     clean_synced_files,
@@ -60,6 +84,15 @@ from sync_common import (
 
 AGENTS_BASE_PATH = "cli-tool/components/agents"
 
+# Version of the agent conversion (clean_body, descriptions, YAML layout).
+# Bump whenever build_opencode_agent() output changes for the same input so
+# the transform cache is invalidated.
+CONVERTER_VERSION = "1"
+
+# Built OpenCode markdown per agent, keyed by a digest of the conversion
+# inputs, stored next to the agents (alongside .sync-cache.json)
+TRANSFORM_CACHE_FILENAME = ".transform-cache.json"
+
 logger = logging.getLogger("sync-agents")
 
 
@@ -1021,8 +1054,8 @@ def _yaml_serialize_permission(
 
 def build_opencode_agent(
     name: str,
-    meta: Dict[str, str],
-    body: str,
+    meta: Union[Dict[str, str], AgentDocument],
+    body: Optional[str],
     category: str,
     permissions: Optional[Dict[str, PermissionValue]] = None,
 ) -> str:
@@ -1030,8 +1063,15 @@ def build_opencode_agent(
     Build an OpenCode agent markdown file from parsed source data.
 
     Generates the modern OpenCode frontmatter format using ``permission:``
-    only (no deprecated ``tools:`` block).
+    only (no deprecated ``tools:`` block). *meta* may be the parsed source
+    :class:`AgentDocument`, whose flat frontmatter and body are then used
+    (pass ``None`` as *body*).
     """
+    if isinstance(meta, AgentDocument):
+        if body is None:
+            body = meta.body
+        meta = meta.meta
+
     # --- Description ---
     short_desc = extract_short_description(meta.get("description", ""), name)
 
@@ -1092,16 +1132,23 @@ def build_opencode_agent(
 # ---------------------------------------------------------------------------
 
 
+@stats.timed("discovery")
 def discover_all_agents(repo: str) -> Dict[str, str]:
     """
     Walk all subdirectories under AGENTS_BASE_PATH and return a dict
     mapping agent_name -> category/agent_name for every .md file found.
     Excludes README.md files.
+
+    Served from the repository tree index (a single Git Trees API call)
+    when available, otherwise from one Contents API call per category.
     """
     all_agents: Dict[str, str] = {}
+    tree = get_repo_tree(repo, DEFAULT_BRANCH, fetch=_api_get)
 
-    url = f"{GITHUB_API}/repos/{repo}/contents/{AGENTS_BASE_PATH}"
-    categories = _api_get(url)
+    if tree is not None:
+        categories = tree.listdir(AGENTS_BASE_PATH)
+    else:
+        categories = _api_get(f"{GITHUB_API}/repos/{repo}/contents/{AGENTS_BASE_PATH}")
     if not categories:
         logger.error("Error: Could not list agent categories from repo.")
         return all_agents
@@ -1111,8 +1158,12 @@ def discover_all_agents(repo: str) -> Dict[str, str]:
             continue
         cat_name = entry["name"]
 
-        cat_url = f"{GITHUB_API}/repos/{repo}/contents/{AGENTS_BASE_PATH}/{cat_name}"
-        files = _api_get(cat_url)
+        if tree is not None:
+            files = tree.listdir(f"{AGENTS_BASE_PATH}/{cat_name}")
+        else:
+            files = _api_get(
+                f"{GITHUB_API}/repos/{repo}/contents/{AGENTS_BASE_PATH}/{cat_name}"
+            )
         if not files:
             continue
 
@@ -1162,6 +1213,59 @@ def clean_synced_agents(
 # ---------------------------------------------------------------------------
 
 
+def permissions_for_agent(name: str) -> Optional[Dict[str, PermissionValue]]:
+    """Return the permission override to sync agent *name* with.
+
+    Uncurated agents get locked-down read-only permissions; curated ones use
+    the archetype system, or ``None`` to fall back to legacy auto-detection.
+    """
+    if name not in CURATED_AGENTS and name not in EXTENDED_AGENTS:
+        return UNKNOWN_PERMISSIONS
+    return build_archetype_permissions(name)
+
+
+def fetch_upstream_oids(
+    repo: str,
+    agents: Dict[str, str],
+    sync_cache: Dict[str, Any],
+) -> Dict[str, Optional[str]]:
+    """Look up the upstream blob OID of every agent in one batched query.
+
+    Returns ``{agent_name: oid}`` (``None`` for missing files), or an empty
+    dict when the GraphQL API is unavailable so callers fall back to
+    conditional requests.
+    """
+    source_files = {f"{AGENTS_BASE_PATH}/{p}.md": n for n, p in agents.items()}
+    oids = fetch_blob_oids(repo, DEFAULT_BRANCH, sorted(source_files))
+    if oids is None:
+        return {}
+    upstream_oids = {source_files[path]: oid for path, oid in oids.items()}
+    fresh = sum(
+        1
+        for n, oid in upstream_oids.items()
+        if oid
+        and isinstance(sync_cache.get(n), dict)
+        and sync_cache[n].get("oid") == oid
+    )
+    logger.info(
+        "  Freshness check: %d/%d agents unchanged upstream", fresh, len(agents)
+    )
+    return upstream_oids
+
+
+def _unchanged_entry(name: str, source_path: str, category: str) -> Dict[str, Any]:
+    """Build the minimal manifest entry of an agent that did not change."""
+    return {
+        "name": name,
+        "path": _get_agent_relative_path(name, category),
+        "category": category,
+        "opencode_category": _get_opencode_category(category),
+        "mode": "primary" if name in PRIMARY_AGENTS else "subagent",
+        "source": f"{AGENTS_BASE_PATH}/{source_path}.md",
+        "status": "unchanged",
+    }
+
+
 def sync_agent(
     name: str,
     source_path: str,
@@ -1174,6 +1278,9 @@ def sync_agent(
     permissions: Optional[Dict[str, PermissionValue]] = None,
     incremental: bool = False,
     sync_cache: Optional[Dict[str, Any]] = None,
+    archive: Optional[RepoArchive] = None,
+    upstream_oid: Optional[str] = None,
+    transform_cache: Optional[Dict[str, Any]] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     Fetch, convert, and write a single agent. Returns manifest entry or None.
@@ -1188,28 +1295,102 @@ def sync_agent(
             agents.
         sync_cache: Mutable cache dict — updated in-place by
             :func:`_cached_get`.  Ignored when *force* is True.
+        archive: Unpacked repository archive (``--bulk``). When provided,
+            the source is read from it instead of being downloaded, and
+            the incremental cache is not consulted.
+        upstream_oid: Current git blob OID of the source file, from the
+            GraphQL freshness pre-pass. In incremental mode, an agent whose
+            cached OID matches is reported unchanged without any request;
+            otherwise the OID is recorded in the cache after fetching.
+        transform_cache: Built-markdown cache passed to
+            :func:`transform_agent`. Consulted even with *force*.
+    """
+    fetched = fetch_agent_source(
+        name,
+        source_path,
+        repo,
+        output_dir,
+        force=force,
+        verbose=verbose,
+        incremental=incremental,
+        sync_cache=sync_cache,
+        archive=archive,
+        upstream_oid=upstream_oid,
+    )
+    if not isinstance(fetched, str):
+        return fetched
+    rendered = transform_agent(
+        name,
+        source_path,
+        fetched,
+        permissions=permissions,
+        transform_cache=transform_cache,
+    )
+    if rendered is None:
+        return None
+    return write_agent(
+        name, rendered, output_dir, dry_run=dry_run, force=force, verbose=verbose
+    )
+
+
+@stats.timed("agent.fetch")
+def fetch_agent_source(
+    name: str,
+    source_path: str,
+    repo: str,
+    output_dir: Path,
+    *,
+    force: bool = False,
+    verbose: bool = False,
+    incremental: bool = False,
+    sync_cache: Optional[Dict[str, Any]] = None,
+    archive: Optional[RepoArchive] = None,
+    upstream_oid: Optional[str] = None,
+) -> Union[str, Dict[str, Any], None]:
+    """Fetch stage of :func:`sync_agent`: return the agent's source markdown.
+
+    Returns the "unchanged" manifest entry instead when the incremental
+    cache shows nothing changed upstream, and ``None`` when the source
+    cannot be found. Arguments are as for :func:`sync_agent`.
     """
     category = source_path.split("/")[0] if "/" in source_path else "unknown"
     raw_url = f"{RAW_BASE}/{repo}/{DEFAULT_BRANCH}/{AGENTS_BASE_PATH}/{source_path}.md"
 
-    if verbose:
+    if verbose and archive is None:
         logger.debug("  Fetching: %s", raw_url)
 
     # Use incremental (cached) GET when possible
     use_cache = incremental and sync_cache is not None and not force
-    if use_cache:
+    if archive is not None:
+        content = archive.read_text(f"{AGENTS_BASE_PATH}/{source_path}.md")
+        if content is None:
+            logger.warning("  [skip] %s: not found at %s.md", name, source_path)
+            return None
+    elif use_cache:
         if sync_cache is None:  # narrowing for type checker
             raise RuntimeError(
                 "sync_cache must not be None when incremental caching is enabled"
             )
+        expected_file = output_dir / f"{_get_agent_relative_path(name, category)}.md"
+        cached = sync_cache.get(name)
+        if (
+            upstream_oid
+            and isinstance(cached, dict)
+            and cached.get("oid") == upstream_oid
+            and expected_file.is_file()
+        ):
+            # Blob OID unchanged upstream — no request needed at all
+            stats.add("oid_unchanged")
+            if verbose:
+                logger.debug("  [cached] %s: unchanged (same blob OID)", name)
+            return _unchanged_entry(name, source_path, category)
+
         content = _cached_get(raw_url, name, sync_cache)
         if content is None and name in sync_cache:
             # Could be 304 Not Modified or a 404 for a deleted agent.
             # Verify the agent file actually exists on disk — if it doesn't,
             # this isn't a valid 304 scenario (the agent was likely deleted
             # upstream and we just have stale cache metadata).
-            relative_path = _get_agent_relative_path(name, category)
-            expected_file = output_dir / f"{relative_path}.md"
             if not expected_file.is_file():
                 logger.warning(
                     "  [skip] %s: cached but file missing on disk — treating as 404",
@@ -1219,31 +1400,71 @@ def sync_agent(
             # 304 Not Modified — agent unchanged
             if verbose:
                 logger.debug("  [cached] %s: unchanged (304 Not Modified)", name)
-            # Build a minimal manifest entry from previous data
-            oc_category = _get_opencode_category(category)
-            relative_path = _get_agent_relative_path(name, category)
-            mode = "primary" if name in PRIMARY_AGENTS else "subagent"
-            return {
-                "name": name,
-                "path": relative_path,
-                "category": category,
-                "opencode_category": oc_category,
-                "mode": mode,
-                "source": f"{AGENTS_BASE_PATH}/{source_path}.md",
-                "status": "unchanged",
-            }
+            if upstream_oid and isinstance(sync_cache[name], dict):
+                sync_cache[name]["oid"] = upstream_oid
+            return _unchanged_entry(name, source_path, category)
         elif content is None:
             # Truly not found (404)
             logger.warning("  [skip] %s: not found at %s.md", name, source_path)
             return None
+        if upstream_oid:
+            sync_cache[name]["oid"] = upstream_oid
     else:
         content = _raw_get(raw_url)
         if content is None:
             logger.warning("  [skip] %s: not found at %s.md", name, source_path)
             return None
 
-    meta, body = parse_frontmatter(content)
-    if not body.strip():
+    return content
+
+
+def transform_cache_key(
+    name: str,
+    category: str,
+    content: str,
+    permissions: Dict[str, PermissionValue],
+    mode: str,
+) -> str:
+    """Digest of every input of :func:`build_opencode_agent` for one agent.
+
+    Combines the sha256 of the raw source, a hash of the permission dict and
+    :data:`CONVERTER_VERSION`, plus the name, category, *mode* (membership
+    of :data:`PRIMARY_AGENTS`) and source repository, which also shape the
+    output.
+    """
+    source_sha = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    perms_sha = hashlib.sha256(
+        json.dumps(permissions, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    material = "\0".join(
+        [CONVERTER_VERSION, DEFAULT_REPO, name, category, mode, source_sha, perms_sha]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@stats.timed("agent.transform")
+def transform_agent(
+    name: str,
+    source_path: str,
+    content: str,
+    *,
+    permissions: Optional[Dict[str, PermissionValue]] = None,
+    transform_cache: Optional[Dict[str, Any]] = None,
+) -> Optional[Tuple[Dict[str, str], str, Dict[str, Any]]]:
+    """Transform stage of :func:`sync_agent`: convert and validate *content*.
+
+    Returns ``(meta, agent_md, entry)`` where *entry* is the manifest entry
+    without its ``status``, or ``None`` when the body is empty. Pure CPU
+    work, no I/O.
+
+    *transform_cache* (``{name: {"key", "markdown"}}``, updated in-place)
+    skips conversion and validation when :func:`transform_cache_key` still
+    matches the cached build.
+    """
+    category = source_path.split("/")[0] if "/" in source_path else "unknown"
+    source = AgentDocument(content)
+    meta = source.meta
+    if not source.body.strip():
         logger.warning("  [skip] %s: empty body after parsing", name)
         return None
 
@@ -1257,21 +1478,62 @@ def sync_agent(
         if perms is None:
             perms = build_permissions(meta.get("tools", ""))
 
-    # Build OpenCode agent
-    agent_md = build_opencode_agent(name, meta, body, category, permissions=perms)
+    # Reuse the built markdown when the source, permissions, mode and
+    # converter are all unchanged (e.g. --force after an archetype tweak)
+    mode = "primary" if name in PRIMARY_AGENTS else "subagent"
+    key = transform_cache_key(name, category, content, perms, mode)
+    cached = transform_cache.get(name) if transform_cache is not None else None
+    if isinstance(cached, dict) and cached.get("key") == key:
+        agent_md = cached["markdown"]
+        logger.debug("  [transform-cache] %s: reusing built agent", name)
+        stats.add("transform_cache_hits")
+    else:
+        # Build OpenCode agent
+        agent_md = build_opencode_agent(
+            name, source, None, category, permissions=perms
+        )
+
+        # S2 validation — log warnings, never block sync
+        document = AgentDocument(agent_md)
+        schema_warnings = validate_agent_schema(document)
+        for w in schema_warnings:
+            logger.debug("  [schema] %s: %s", name, w)
+        conformance_warnings = check_template_conformance(document)
+        for w in conformance_warnings:
+            logger.debug("  [template] %s: %s", name, w)
 
-    # S2 validation — log warnings, never block sync
-    schema_warnings = validate_agent_schema(agent_md)
-    for w in schema_warnings:
-        logger.debug("  [schema] %s: %s", name, w)
-    conformance_warnings = check_template_conformance(agent_md)
-    for w in conformance_warnings:
-        logger.debug("  [template] %s: %s", name, w)
+        if transform_cache is not None:
+            transform_cache[name] = {"key": key, "markdown": agent_md}
 
-    # Determine output path using category subdirectories
-    relative_path = _get_agent_relative_path(name, category)
-    oc_category = _get_opencode_category(category)
-    mode = "primary" if name in PRIMARY_AGENTS else "subagent"
+    # Output path uses category subdirectories
+    entry = {
+        "name": name,
+        "path": _get_agent_relative_path(name, category),
+        "category": category,
+        "opencode_category": _get_opencode_category(category),
+        "mode": mode,
+        "permission": perms,
+        "source": f"{AGENTS_BASE_PATH}/{source_path}.md",
+    }
+    return meta, agent_md, entry
+
+
+@stats.timed("agent.write")
+def write_agent(
+    name: str,
+    rendered: Tuple[Dict[str, str], str, Dict[str, Any]],
+    output_dir: Path,
+    *,
+    dry_run: bool = False,
+    force: bool = False,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Writer stage of :func:`sync_agent`: write a :func:`transform_agent` result.
+
+    Returns the manifest entry with its ``status`` (none in dry-run mode).
+    """
+    meta, agent_md, entry = rendered
+    relative_path = entry["path"]
     out_path = output_dir / f"{relative_path}.md"
 
     # Security: ensure the resolved path stays under the output directory
@@ -1285,57 +1547,28 @@ def sync_agent(
                 extract_short_description(meta.get("description", ""), name),
             )
             logger.debug("  Path: %s", relative_path)
-        return {
-            "name": name,
-            "path": relative_path,
-            "category": category,
-            "opencode_category": oc_category,
-            "mode": mode,
-            "permission": perms,
-            "source": f"{AGENTS_BASE_PATH}/{source_path}.md",
-        }
+        return dict(entry)
 
     # Check existing
     if out_path.exists() and not force:
         logger.info("  [skip] %s: already exists (use --force to overwrite)", name)
-        return {
-            "name": name,
-            "path": relative_path,
-            "category": category,
-            "opencode_category": oc_category,
-            "mode": mode,
-            "permission": perms,
-            "source": f"{AGENTS_BASE_PATH}/{source_path}.md",
-            "status": "skipped",
-        }
+        return {**entry, "status": "skipped"}
 
-    # Ensure parent directory exists (handles category subdirs)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    tmp_fd, tmp_path = tempfile.mkstemp(
-        dir=str(out_path.parent), suffix=".tmp", prefix=".sync-"
-    )
-    try:
-        with os.fdopen(tmp_fd, "w", encoding="utf-8") as tmp:
-            tmp.write(agent_md)
-        os.replace(tmp_path, str(out_path))
-    except BaseException:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
-        raise
+    # Atomic write (creates category subdirs as needed)
+    atomic_write_text(out_path, agent_md)
     if verbose:
         logger.debug("  [wrote] %s (%d bytes)", out_path, len(agent_md))
 
+    return {**entry, "status": "synced"}
+
+
+def build_manifest(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the sync manifest dict for *entries* (sorted by agent name)."""
     return {
-        "name": name,
-        "path": relative_path,
-        "category": category,
-        "opencode_category": oc_category,
-        "mode": mode,
-        "permission": perms,
-        "source": f"{AGENTS_BASE_PATH}/{source_path}.md",
-        "status": "synced",
+        "synced_at": datetime.now(timezone.utc).isoformat(),
+        "source_repo": DEFAULT_REPO,
+        "agent_count": len(entries),
+        "agents": sorted(entries, key=lambda e: e["name"]),
     }
 
 
@@ -1344,20 +1577,18 @@ def write_manifest(
     entries: List[Dict[str, Any]],
     *,
     dry_run: bool = False,
-) -> None:
-    """Write manifest.json alongside the agent files."""
-    manifest = {
-        "synced_at": datetime.now(timezone.utc).isoformat(),
-        "source_repo": DEFAULT_REPO,
-        "agent_count": len(entries),
-        "agents": sorted(entries, key=lambda e: e["name"]),
-    }
+) -> Dict[str, Any]:
+    """Write manifest.json alongside the agent files.
 
+    Returns the manifest dict (also in dry-run mode, when nothing is
+    written) so callers can hand it to ``update_manifest()`` in-process.
+    """
+    manifest = build_manifest(entries)
     manifest_path = output_dir / "manifest.json"
 
     if dry_run:
         logger.info("  [dry-run] Would write manifest: %s", manifest_path)
-        return
+        return manifest
 
     output_dir.mkdir(parents=True, exist_ok=True)
     tmp_fd, tmp_path = tempfile.mkstemp(
@@ -1375,6 +1606,7 @@ def write_manifest(
             pass
         raise
     logger.info("Manifest written: %s", manifest_path)
+    return manifest
 
 
 # ---------------------------------------------------------------------------
@@ -1397,6 +1629,8 @@ def build_parser() -> argparse.ArgumentParser:
             "  python scripts/sync-agents.py --all            # Sync ALL agents\n"
             "  python scripts/sync-agents.py --dry-run -v     # Preview without writing\n"
             "  python scripts/sync-agents.py --clean --force  # Clean + re-sync\n"
+            "  python scripts/sync-agents.py --all --jobs 8   # Sync with 8 workers\n"
+            "  python scripts/sync-agents.py --all --bulk     # One archive download\n"
         ),
     )
     parser.add_argument(
@@ -1476,6 +1710,30 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Run quality scorer on each synced agent and include scores in the manifest",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Number of agents fetched concurrently (default: 1). Workers share "
+            "the process-wide rate limiter; manifest and cache output stay "
+            "ordered."
+        ),
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help=(
+            "Download the upstream repository archive once and sync from it "
+            "instead of fetching each agent (falls back to per-file fetching "
+            "if the download fails)"
+        ),
+    )
+    add_resume_argument(parser)
+    add_fixture_arguments(parser)
+    add_stats_arguments(parser)
     return parser
 
 
@@ -1487,9 +1745,14 @@ def main() -> int:
     if args.all:
         args.tier = "all"
 
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
     # Configure logging level based on verbosity
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=log_level, format="%(message)s", stream=sys.stderr)
+    install_fixture_store(args)
+    stats.reset()
 
     repo = args.source
     output_dir = Path(args.output_dir)
@@ -1518,14 +1781,37 @@ def main() -> int:
         )
         action = "Would remove" if args.dry_run else "Removed"
         logger.info("  %s %d synced agent file(s).", action, removed)
-        # Also remove the incremental sync cache
+        # Also remove the incremental sync and transform caches
         if not args.dry_run:
             _remove_sync_cache(output_dir, verbose=args.verbose)
+            _remove_sync_cache(
+                output_dir,
+                verbose=args.verbose,
+                cache_filename=TRANSFORM_CACHE_FILENAME,
+            )
+            _remove_sync_cache(
+                output_dir,
+                verbose=args.verbose,
+                cache_filename=sync_journal_filename("sync-agents"),
+            )
         else:
             cache_path = output_dir / SYNC_CACHE_FILENAME
             if cache_path.exists():
                 logger.info("  [dry-run] Would remove: %s", SYNC_CACHE_FILENAME)
 
+    # --- Bulk mode: one archive download serves discovery and every agent ---
+    archive: Optional[RepoArchive] = None
+    if args.bulk and not args.list:
+        logger.info("Downloading repository archive of %s...", repo)
+        try:
+            archive = download_repo_archive(
+                repo, DEFAULT_BRANCH, prefixes=(AGENTS_BASE_PATH,)
+            )
+        except ArchiveError as exc:
+            logger.warning("  [bulk] %s — falling back to per-file fetching", exc)
+        else:
+            prime_repo_tree(repo, DEFAULT_BRANCH, archive.tree)
+
     # --- Determine agent set ---
     if args.tier == "all":
         logger.info("Discovering all agents in %s...", repo)
@@ -1631,102 +1917,259 @@ def main() -> int:
     elif args.verbose:
         logger.debug("  Force mode: ignoring incremental cache")
 
+    # --- Transform cache ---
+    # Kept even with --force: a forced rebuild only re-converts agents whose
+    # source, permissions or converter version changed.
+    transform_cache = _load_sync_cache(output_dir, TRANSFORM_CACHE_FILENAME)
+
+    # --- Checkpoint journal ---
+    # Every completed agent is journaled with its manifest entry and cache
+    # deltas; --resume replays them and only syncs the remaining agents.
+    journal: Optional[SyncJournal] = None
+    resumed_entries: List[Dict[str, Any]] = []
+    pending = dict(agents)
+    if not args.dry_run:
+        journal = SyncJournal(
+            output_dir / sync_journal_filename("sync-agents"),
+            {
+                "script": "sync-agents",
+                "repo": repo,
+                "tier": args.tier,
+                "filter": args.filter,
+                "force": args.force,
+            },
+        )
+        try:
+            done = journal.open(resume=args.resume).get("agent", {})
+        except SyncJournalMismatch as exc:
+            logger.error("  [resume] %s — rerun with the same options", exc)
+            return 1
+        for name in sorted(set(done) & set(agents)):
+            record = done[name]
+            if sync_cache is not None and record.get("cache") is not None:
+                sync_cache[name] = record["cache"]
+            if record.get("transform") is not None:
+                transform_cache[name] = record["transform"]
+            resumed_entries.append(record["entry"])
+            del pending[name]
+        if resumed_entries:
+            logger.info(
+                "  Resuming: %d agents already done, %d remaining",
+                len(resumed_entries),
+                len(pending),
+            )
+
+    # --- Freshness pre-pass ---
+    # One batched GraphQL lookup of every source blob OID replaces the
+    # per-agent conditional GETs for agents that did not change.
+    upstream_oids: Dict[str, Optional[str]] = {}
+    if use_incremental and sync_cache and archive is None:
+        upstream_oids = fetch_upstream_oids(repo, pending, sync_cache)
+
     # Determine which agents are curated vs discovered-only
     curated_names = set(CURATED_AGENTS.keys()) | set(EXTENDED_AGENTS.keys())
 
-    manifest_entries: List[Dict[str, Any]] = []
+    manifest_entries: List[Dict[str, Any]] = list(resumed_entries)
     success = 0
     skipped = 0
     failed = 0
     unchanged = 0
     uncurated_count = 0
+    # Synced agents whose --score failed (still counted as synced)
+    score_errors = 0
 
     # Import quality scorer once before the loop (conditional on --score flag)
     if args.score:
         from quality_scorer import score_agent
 
-    for i, (name, path) in enumerate(sorted(agents.items()), 1):
-        label = f"[{i}/{len(agents)}]"
-        print(f"  {label} {name}...", end="", flush=True)
+    # Built agents awaiting --score, so _record scores them without
+    # re-reading the written files
+    built_documents: Dict[str, AgentDocument] = {}
+    # Each agent is fetched against a copy of its cache entry; the new ETag
+    # and OID reach sync_cache in _record, once the agent has been written,
+    # so a failed or interrupted write never leaves it looking unchanged
+    fetched_caches: Dict[str, Dict[str, Any]] = {}
+
+    # Fetch -> transform -> write pipeline: downloads keep running while
+    # earlier agents are converted and written.
+    def _fetch(item: Tuple[str, str], _value: None) -> Any:
+        name, path = item
+        agent_cache: Optional[Dict[str, Any]] = None
+        if sync_cache is not None:
+            cached = sync_cache.get(name)
+            agent_cache = {name: dict(cached)} if isinstance(cached, dict) else {}
+            fetched_caches[name] = agent_cache
+        fetched = fetch_agent_source(
+            name,
+            path,
+            repo,
+            output_dir,
+            force=args.force,
+            verbose=args.verbose,
+            incremental=use_incremental,
+            sync_cache=agent_cache,
+            archive=archive,
+            upstream_oid=upstream_oids.get(name),
+        )
+        return fetched if isinstance(fetched, str) else StageResult(fetched)
+
+    def _transform(item: Tuple[str, str], content: str) -> Any:
+        name, path = item
+        rendered = transform_agent(
+            name,
+            path,
+            content,
+            permissions=permissions_for_agent(name),
+            transform_cache=transform_cache,
+        )
+        if rendered is None:
+            return StageResult(None)
+        if args.score:
+            built_documents[name] = AgentDocument(rendered[1])
+        return rendered
+
+    def _write(
+        item: Tuple[str, str], rendered: Tuple[Dict[str, str], str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return write_agent(
+            item[0],
+            rendered,
+            output_dir,
+            dry_run=args.dry_run,
+            force=args.force,
+            verbose=args.verbose,
+        )
+
+    if args.jobs > 1:
+        logger.info("  Running with %d concurrent workers", args.jobs)
+
+    progress = 0
+
+    def _record(
+        item: Tuple[str, str],
+        entry: Optional[Dict[str, Any]],
+        error: Optional[BaseException],
+    ) -> None:
+        nonlocal progress, success, skipped, failed, unchanged, uncurated_count
+        nonlocal score_errors
+        name = item[0]
+        document = built_documents.pop(name, None)
+        agent_cache = fetched_caches.pop(name, None)
+        progress += 1
+        print(f"  [{progress}/{len(pending)}] {name}...", end="", flush=True)
+
+        if error is not None:
+            failed += 1
+            logger.error(" error: %s", error)
+            if args.verbose:
+                traceback.print_exception(type(error), error, error.__traceback__)
+            return
 
-        # Uncurated agents get locked-down read-only permissions
-        if name not in curated_names:
-            agent_permissions: Optional[Dict[str, PermissionValue]] = (
-                UNKNOWN_PERMISSIONS
-            )
+        if not entry:
+            failed += 1
+            print(" not found")
+            return
+
+        manifest_entries.append(entry)
+        if sync_cache is not None and agent_cache and name in agent_cache:
+            sync_cache[name] = agent_cache[name]
+        status = entry.get("status", "synced")
+        if status == "skipped":
+            skipped += 1
+            print(" skipped")
+        elif status == "unchanged":
+            unchanged += 1
+            print(" unchanged")
         else:
-            # Try archetype system first; fall back to legacy auto-detection
-            agent_permissions = build_archetype_permissions(name)
+            success += 1
+            if name not in curated_names:
+                uncurated_count += 1
+            print(" done")
+
+        # Quality scoring (optional, --score flag)
+        # Dry runs write nothing, so there is nothing to score
+        if args.score and status == "synced" and not args.dry_run and document:
+            try:
+                result = score_agent(document)
+            except Exception as exc:
+                score_errors += 1
+                logger.error("  [score] %s: error: %s", name, exc)
+            else:
+                entry["quality_score"] = result
+                if args.verbose:
+                    logger.debug(
+                        "  [score] %s: %.2f (%s)",
+                        name,
+                        result["overall"],
+                        result["label"],
+                    )
 
-        try:
-            entry = sync_agent(
+        if journal is not None:
+            journal.record(
+                "agent",
                 name,
-                path,
-                repo,
-                output_dir,
-                dry_run=args.dry_run,
-                force=args.force,
-                verbose=args.verbose,
-                permissions=agent_permissions,
-                incremental=use_incremental,
-                sync_cache=sync_cache,
+                entry=entry,
+                cache=sync_cache.get(name) if sync_cache is not None else None,
+                transform=transform_cache.get(name),
             )
-            if entry:
-                manifest_entries.append(entry)
-                status = entry.get("status", "synced")
-                if status == "skipped":
-                    skipped += 1
-                    print(" skipped")
-                elif status == "unchanged":
-                    unchanged += 1
-                    print(" unchanged")
-                else:
-                    success += 1
-                    if name not in curated_names:
-                        uncurated_count += 1
-                    print(" done")
-
-                # Quality scoring (optional, --score flag)
-                if args.score and status == "synced":
-                    rel = entry.get("path", "")
-                    agent_file = output_dir / f"{rel}.md"
-                    if agent_file.is_file():
-                        agent_content = agent_file.read_text(encoding="utf-8")
-                        result = score_agent(agent_content)
-                        entry["quality_score"] = result
-                        if args.verbose:
-                            logger.debug(
-                                "  [score] %s: %.2f (%s)",
-                                name,
-                                result["overall"],
-                                result["label"],
-                            )
-            else:
-                failed += 1
-                print(" not found")
-        except Exception as exc:
-            failed += 1
-            logger.error(" error: %s", exc)
-            if args.verbose:
-                traceback.print_exc()
 
-        # Polite delay to avoid hammering the API
-        if i < len(agents):
-            time.sleep(0.3)
+    # Results are recorded in sorted order whatever the completion order,
+    # so counters, the manifest and the cache are updated deterministically.
+    completed = run_pipeline(
+        sorted(pending.items()),
+        [_fetch, _transform, _write],
+        _record,
+        workers=[args.jobs, 1, 1],
+    )
+
+    if archive is not None:
+        archive.close()
 
-    # --- Persist incremental cache ---
+    # --- Persist incremental and transform caches (also after Ctrl-C) ---
     if sync_cache is not None and not args.dry_run:
         _save_sync_cache(output_dir, sync_cache)
+    if not args.dry_run:
+        _save_sync_cache(output_dir, transform_cache, TRANSFORM_CACHE_FILENAME)
+
+    # Keep the journal while anything is left to do, so --resume can retry
+    # just the interrupted or failed agents
+    if journal is not None:
+        journal.close(completed=completed and failed == 0)
+
+    summary = {
+        "agents": len(agents),
+        "resumed": len(resumed_entries),
+        "synced": success,
+        "unchanged": unchanged,
+        "skipped": skipped,
+        "failed": failed,
+        "score_errors": score_errors,
+        "completed": completed,
+    }
+    if not completed:
+        write_stats(args, summary)
+        logger.warning(
+            "Sync interrupted after %d/%d agents; manifest not written. "
+            "Run again with --resume to continue.",
+            progress,
+            len(pending),
+        )
+        return 130
 
     # --- Write manifest ---
     if manifest_entries:
         write_manifest(output_dir, manifest_entries, dry_run=args.dry_run)
+    write_stats(args, summary)
 
     # --- Summary ---
     parts = [f"{success} synced"]
     if unchanged > 0:
         parts.append(f"{unchanged} unchanged")
+    if resumed_entries:
+        parts.append(f"{len(resumed_entries)} resumed")
     parts.extend([f"{skipped} skipped", f"{failed} failed"])
+    if score_errors > 0:
+        parts.append(f"{score_errors} not scored")
     logger.info("Sync complete: %s", ", ".join(parts))
 
     if uncurated_count > 0:
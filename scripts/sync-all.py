@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+sync-all.py - Sync agents and skills from davila7/claude-code-templates in a
+single run, then merge the agent manifest into the root manifest.
+
+Discovery runs once (one Git Trees listing, or one archive download with
+--bulk) and serves both syncs. Agents and skills share one connection pool,
+one rate-limit budget and one worker pool, and the resulting sync manifest
+is handed to update_manifest() in-process instead of being re-read from disk.
+
+Usage:
+    python scripts/sync-all.py
+    python scripts/sync-all.py --tier=extended --jobs 4
+    python scripts/sync-all.py --all --bulk --jobs 8
+    python scripts/sync-all.py --dry-run --verbose
+    python scripts/sync-all.py --no-manifest-update
+    python scripts/sync-all.py --all --jobs 8 --stats-json stats.json
+    python scripts/sync-all.py --all --jobs 8 --resume
+
+Requires: Python 3.8+ (stdlib only, no pip dependencies)
+Supports: GITHUB_TOKEN env var for higher rate limits (5000 req/hr vs 60 req/hr)
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sync_common import (
+    DEFAULT_REPO,
+    DEFAULT_BRANCH,
+    SYNC_CACHE_FILENAME,
+    ArchiveError,
+    RepoArchive,
+    SyncJournal,
+    SyncJournalMismatch,
+    sync_journal_filename,
+    check_rate_limit,
+    prime_repo_tree,
+    download_repo_archive,
+    add_fixture_arguments,
+    install_fixture_store,
+    add_stats_arguments,
+    add_resume_argument,
+    write_stats,
+    stats,
+    _load_sync_cache,
+    _save_sync_cache,
+    run_sync_groups,
+)
+
+sync_agents = importlib.import_module("sync-agents")
+sync_skills = importlib.import_module("sync-skills")
+update_manifest_mod = importlib.import_module("update-manifest")
+
+logger = logging.getLogger("sync-all")
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+
+def select_agents(tier: str, repo: str) -> Dict[str, str]:
+    """Return ``{name: source_path}`` for the agents of *tier*."""
+    if tier == "all":
+        return sync_agents.discover_all_agents(repo)
+    if tier == "extended":
+        return {**sync_agents.CURATED_AGENTS, **sync_agents.EXTENDED_AGENTS}
+    return dict(sync_agents.CURATED_AGENTS)
+
+
+def select_skills(all_skills: bool, repo: str) -> Dict[str, Dict[str, str]]:
+    """Return ``{name: config}`` for the curated skills, or every skill."""
+    if all_skills:
+        return sync_skills.discover_all_skills(repo, DEFAULT_BRANCH)
+    return dict(sync_skills.CURATED_SKILLS)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Sync agents and skills from davila7/claude-code-templates in one "
+            "run and merge the result into the root manifest."
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Examples:\n"
+            "  python scripts/sync-all.py                  # Core agents + skills\n"
+            "  python scripts/sync-all.py --all --bulk -j 8  # Everything\n"
+            "  python scripts/sync-all.py --dry-run -v     # Preview only\n"
+        ),
+    )
+    parser.add_argument(
+        "--agents-dir",
+        type=str,
+        default="agents",
+        help="Output directory for agent files (default: agents)",
+    )
+    parser.add_argument(
+        "--skills-dir",
+        type=str,
+        default=".opencode/skills",
+        help="Output directory for skill files (default: .opencode/skills)",
+    )
+    parser.add_argument(
+        "--tier",
+        choices=["core", "extended", "all"],
+        default="core",
+        help="Agent tier to sync (default: core)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Sync ALL agents and ALL skills (implies --tier=all)",
+    )
+    parser.add_argument(
+        "--source",
+        type=str,
+        default=DEFAULT_REPO,
+        metavar="OWNER/REPO",
+        help=f"Override source repository (default: {DEFAULT_REPO})",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Total number of agents and skills synced concurrently (default: 1). "
+            "One budget is shared by both syncs."
+        ),
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help=(
+            "Download the upstream repository archive once for both syncs "
+            "(falls back to per-file fetching if the download fails)"
+        ),
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be done without writing files",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Overwrite existing files and ignore the incremental caches",
+    )
+    parser.add_argument(
+        "--root-manifest",
+        type=str,
+        default=update_manifest_mod.DEFAULT_ROOT_MANIFEST,
+        help=(
+            "Root project manifest to update "
+            f"(default: {update_manifest_mod.DEFAULT_ROOT_MANIFEST})"
+        ),
+    )
+    parser.add_argument(
+        "--metadata-output",
+        type=str,
+        default=update_manifest_mod.DEFAULT_METADATA_OUTPUT,
+        help=(
+            "Path to write sync metadata JSON "
+            f"(default: {update_manifest_mod.DEFAULT_METADATA_OUTPUT})"
+        ),
+    )
+    parser.add_argument(
+        "--no-manifest-update",
+        action="store_true",
+        help="Do not merge the agent manifest into the root manifest",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Verbose output",
+    )
+    add_resume_argument(parser)
+    add_fixture_arguments(parser)
+    add_stats_arguments(parser)
+    return parser
+
+
+def main() -> int:
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.all:
+        args.tier = "all"
+
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(level=log_level, format="%(message)s", stream=sys.stderr)
+    install_fixture_store(args)
+    stats.reset()
+
+    repo = args.source
+    agents_dir = Path(args.agents_dir)
+    skills_dir = Path(args.skills_dir)
+
+    # --- Check rate limit (one budget for the whole run) ---
+    if args.verbose:
+        limit, remaining, reset_ts = check_rate_limit()
+        logger.debug("GitHub API: %d/%d requests remaining", remaining, limit)
+        if remaining < 10:
+            reset_dt = datetime.fromtimestamp(reset_ts, tz=timezone.utc)
+            logger.warning("  Rate limit resets at: %s", reset_dt.isoformat())
+
+    # --- Bulk mode: one archive serves agents, skills and discovery ---
+    archive: Optional[RepoArchive] = None
+    if args.bulk:
+        logger.info("Downloading repository archive of %s...", repo)
+        try:
+            archive = download_repo_archive(
+                repo,
+                DEFAULT_BRANCH,
+                prefixes=(sync_agents.AGENTS_BASE_PATH, sync_skills.SKILLS_BASE_PATH),
+            )
+        except ArchiveError as exc:
+            logger.warning("  [bulk] %s — falling back to per-file fetching", exc)
+        else:
+            prime_repo_tree(repo, DEFAULT_BRANCH, archive.tree)
+
+    # --- Discovery (served by the memoized repository tree) ---
+    agents = select_agents(args.tier, repo)
+    skills = select_skills(args.all, repo)
+    if not agents and not skills:
+        logger.error("No agents or skills found.")
+        if archive is not None:
+            archive.close()
+        return 1
+    logger.info(
+        "Syncing %d agents -> %s/ and %d skills -> %s/ from %s",
+        len(agents),
+        agents_dir,
+        len(skills),
+        skills_dir,
+        repo,
+    )
+    if args.dry_run:
+        logger.info("  (dry-run mode: no files will be written)")
+
+    # --- Incremental caches ---
+    agent_cache: Optional[Dict[str, Any]] = None
+    skill_cache: Dict[str, Any] = {}
+    if not args.force:
+        agent_cache = _load_sync_cache(agents_dir)
+        skill_cache = _load_sync_cache(skills_dir, sync_skills.SKILLS_CACHE_FILENAME)
+    use_incremental = bool(agent_cache)
+    transform_cache = _load_sync_cache(agents_dir, sync_agents.TRANSFORM_CACHE_FILENAME)
+
+    # --- Checkpoint journal (--resume replays completed items) ---
+    journal: Optional[SyncJournal] = None
+    manifest_entries: List[Dict[str, Any]] = []
+    synced_skills = 0
+    resumed = 0
+    pending_agents = dict(agents)
+    pending_skills = dict(skills)
+    if not args.dry_run:
+        journal = SyncJournal(
+            agents_dir / sync_journal_filename("sync-all"),
+            {
+                "script": "sync-all",
+                "repo": repo,
+                "branch": DEFAULT_BRANCH,
+                "tier": args.tier,
+                "all": args.all,
+                "force": args.force,
+            },
+        )
+        try:
+            done = journal.open(resume=args.resume)
+        except SyncJournalMismatch as exc:
+            logger.error("  [resume] %s — rerun with the same options", exc)
+            return 1
+        agents_done = done.get("agent", {})
+        for name in sorted(set(agents_done) & set(agents)):
+            record = agents_done[name]
+            if agent_cache is not None and record.get("cache") is not None:
+                agent_cache[name] = record["cache"]
+            if record.get("transform") is not None:
+                transform_cache[name] = record["transform"]
+            manifest_entries.append(record["entry"])
+            del pending_agents[name]
+        skills_done = done.get("skill", {})
+        for name in sorted(set(skills_done) & set(skills)):
+            record = skills_done[name]
+            if record.get("cache") is not None:
+                skill_cache[name] = record["cache"]
+            synced_skills += bool(record.get("result"))
+            del pending_skills[name]
+        resumed = len(agents) + len(skills) - len(pending_agents) - len(pending_skills)
+        if resumed:
+            logger.info(
+                "  Resuming: %d items already done, %d remaining",
+                resumed,
+                len(pending_agents) + len(pending_skills),
+            )
+
+    upstream_oids: Dict[str, Optional[str]] = {}
+    if agent_cache and archive is None:
+        upstream_oids = sync_agents.fetch_upstream_oids(
+            repo, pending_agents, agent_cache
+        )
+
+    counts = {"synced": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+    progress = 0
+    total = len(pending_agents) + len(pending_skills)
+
+    def _report(kind: str, name: str, status: str) -> None:
+        nonlocal progress
+        progress += 1
+        print(f"  [{progress}/{total}] {kind} {name}... {status}", flush=True)
+
+    def _failed(kind: str, name: str, error: Optional[BaseException]) -> None:
+        counts["failed"] += 1
+        _report(kind, name, f"error: {error}" if error else "not found")
+        if error is not None and args.verbose:
+            traceback.print_exception(type(error), error, error.__traceback__)
+
+    def _sync_agent(item: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        name, path = item
+        return sync_agents.sync_agent(
+            name,
+            path,
+            repo,
+            agents_dir,
+            dry_run=args.dry_run,
+            force=args.force,
+            verbose=args.verbose,
+            permissions=sync_agents.permissions_for_agent(name),
+            incremental=use_incremental,
+            sync_cache=agent_cache,
+            archive=archive,
+            upstream_oid=upstream_oids.get(name),
+            transform_cache=transform_cache,
+        )
+
+    def _record_agent(
+        item: Tuple[str, str],
+        entry: Optional[Dict[str, Any]],
+        error: Optional[BaseException],
+    ) -> None:
+        if error is not None or not entry:
+            _failed("agent", item[0], error)
+            return
+        manifest_entries.append(entry)
+        status = entry.get("status", "synced")
+        counts[status] += 1
+        _report("agent", item[0], "done" if status == "synced" else status)
+        if journal is not None:
+            journal.record(
+                "agent",
+                item[0],
+                entry=entry,
+                cache=agent_cache.get(item[0]) if agent_cache is not None else None,
+                transform=transform_cache.get(item[0]),
+            )
+
+    def _sync_skill(item: Tuple[str, Dict[str, str]]) -> bool:
+        name, config = item
+        return sync_skills.sync_skill(
+            name,
+            config,
+            str(skills_dir),
+            repo,
+            DEFAULT_BRANCH,
+            verbose=args.verbose,
+            dry_run=args.dry_run,
+            force=args.force,
+            archive=archive,
+            skill_cache=skill_cache,
+        )
+
+    def _record_skill(
+        item: Tuple[str, Dict[str, str]],
+        result: Optional[bool],
+        error: Optional[BaseException],
+    ) -> None:
+        nonlocal synced_skills
+        if error is not None:
+            _failed("skill", item[0], error)
+            return
+        if result:
+            counts["synced"] += 1
+            synced_skills += 1
+            _report("skill", item[0], "done")
+        else:
+            counts["skipped"] += 1
+            _report("skill", item[0], "skipped")
+        if journal is not None:
+            journal.record(
+                "skill", item[0], result=result, cache=skill_cache.get(item[0])
+            )
+
+    if args.jobs > 1:
+        logger.info("  Running with %d concurrent workers", args.jobs)
+    completed = run_sync_groups(
+        [
+            (sorted(pending_agents.items()), _sync_agent, _record_agent),
+            (sorted(pending_skills.items()), _sync_skill, _record_skill),
+        ],
+        jobs=args.jobs,
+    )
+
+    if archive is not None:
+        archive.close()
+
+    # --- Persist incremental caches (also after Ctrl-C) ---
+    if not args.dry_run:
+        if agent_cache is not None:
+            _save_sync_cache(agents_dir, agent_cache, SYNC_CACHE_FILENAME)
+        _save_sync_cache(
+            agents_dir, transform_cache, sync_agents.TRANSFORM_CACHE_FILENAME
+        )
+        _save_sync_cache(skills_dir, skill_cache, sync_skills.SKILLS_CACHE_FILENAME)
+
+    # Keep the journal while anything is left to do (see --resume)
+    if journal is not None:
+        journal.close(completed=completed and counts["failed"] == 0)
+
+    summary = {"agents": len(agents), "skills": len(skills), "resumed": resumed}
+    summary.update(counts, completed=completed)
+    if not completed:
+        write_stats(args, summary)
+        logger.warning(
+            "Sync interrupted after %d/%d items; manifests not written. "
+            "Run again with --resume to continue.",
+            progress,
+            total,
+        )
+        return 130
+
+    # --- Manifests ---
+    manifest: Optional[Dict[str, Any]] = None
+    if manifest_entries:
+        manifest = sync_agents.write_manifest(
+            agents_dir, manifest_entries, dry_run=args.dry_run
+        )
+    if synced_skills > 0 and not args.dry_run:
+        sync_skills.write_manifest(skills_dir, skills, dry_run=args.dry_run)
+
+    parts = [f"{v} {k}" for k, v in counts.items()]
+    if resumed:
+        parts.append(f"{resumed} resumed")
+    logger.info("Sync complete: %s", ", ".join(parts))
+    write_stats(args, summary)
+
+    # --- Root manifest update, in-process ---
+    if manifest is not None and not args.no_manifest_update:
+        try:
+            update_manifest_mod.update_manifest(
+                root_path=args.root_manifest,
+                sync_path=str(agents_dir / "manifest.json"),
+                metadata_path=args.metadata_output,
+                dry_run=args.dry_run,
+                sync_data=manifest,
+            )
+        except update_manifest_mod.ManifestError as exc:
+            logger.error("Manifest update failed: %s", exc)
+            return 1
+
+    if not os.environ.get("GITHUB_TOKEN") and total > 30:
+        logger.info(
+            "Tip: Set GITHUB_TOKEN env var for higher rate limits "
+            "(5000 req/hr vs 60 req/hr)."
+        )
+
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
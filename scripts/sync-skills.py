@@ -14,6 +14,12 @@ Usage:
     python scripts/sync-skills.py --all
     python scripts/sync-skills.py --dry-run --verbose
     python scripts/sync-skills.py --clean --force
+    python scripts/sync-skills.py --all --bulk
+    python scripts/sync-skills.py --all --jobs 8
+    python scripts/sync-skills.py --all --record fixtures/
+    python scripts/sync-skills.py --all --replay fixtures/ --replay-latency 0.05
+    python scripts/sync-skills.py --all --stats-json stats.json
+    python scripts/sync-skills.py --all --resume
 
 Requires: Python 3.8+ (stdlib only, no pip dependencies)
 Supports: GITHUB_TOKEN env var for higher rate limits (5000 req/hr vs 60 req/hr)
@@ -22,6 +28,7 @@ Supports: GITHUB_TOKEN env var for higher rate limits (5000 req/hr vs 60 req/hr)
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import os
@@ -29,8 +36,8 @@ import re
 import shutil
 import sys
 import tempfile
-import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -41,6 +48,12 @@ from sync_common import (
     GITHUB_API,
     RAW_BASE,
     SYNC_CACHE_FILENAME,
+    ArchiveError,
+    RateLimited,
+    RepoArchive,
+    SyncJournal,
+    SyncJournalMismatch,
+    sync_journal_filename,
     logger,
     _get_headers,
     _http_request,
@@ -48,9 +61,22 @@ from sync_common import (
     _raw_get,
     _cached_get,
     check_rate_limit,
+    get_repo_tree,
+    get_subtree,
+    prime_repo_tree,
+    download_repo_archive,
+    add_fixture_arguments,
+    install_fixture_store,
+    add_stats_arguments,
+    add_resume_argument,
+    write_stats,
+    stats,
     _load_sync_cache,
     _save_sync_cache,
     _remove_sync_cache,
+    atomic_write_text,
+    StagedDirectory,
+    run_sync,
     parse_frontmatter,
     validate_output_path,
     is_synced_file,
@@ -66,15 +92,17 @@ SKILLS_BASE_PATH = "cli-tool/components/skills"
 # Maximum total size for a skill (5MB)
 MAX_SKILL_SIZE_BYTES = 5 * 1024 * 1024
 
-# Delay between files within a skill (milliseconds)
-INTER_FILE_DELAY_MS = 100
-
-# Delay between skills (milliseconds)
-INTER_SKILL_DELAY_MS = 300
+# Companion files of one skill downloaded concurrently; every request still
+# goes through the shared rate limiter and connection pool
+COMPANION_FILE_JOBS = 4
 
 # Marker file for hand-written skills
 HANDWRITTEN_MARKER = ".hand-written"
 
+# Per-skill cache of upstream blob SHAs and local output hashes, stored next
+# to the skills (alongside .sync-cache.json)
+SKILLS_CACHE_FILENAME = ".skills-cache.json"
+
 # ---------------------------------------------------------------------------
 # Curated skills list
 # ---------------------------------------------------------------------------
@@ -144,7 +172,10 @@ def fetch_skill_tree(skill_path: str, repo: str, branch: str) -> List[Dict[str,
     """
     List all files in a skill directory from the upstream repository.
 
-    Uses the GitHub API to recursively fetch the directory tree.
+    Served from the repository tree index (a single Git Trees API call)
+    when available, otherwise from one recursive tree listing of the skill
+    directory. The Contents API walk is only used when both listings fail
+    or are truncated.
 
     Args:
         skill_path: Path to the skill directory relative to SKILLS_BASE_PATH
@@ -154,6 +185,19 @@ def fetch_skill_tree(skill_path: str, repo: str, branch: str) -> List[Dict[str,
     Returns:
         List of file info dicts with keys: path, name, type, size, download_url
     """
+    full_path = f"{SKILLS_BASE_PATH}/{skill_path}"
+    tree = get_repo_tree(repo, branch, fetch=_api_get)
+    if tree is None:
+        tree = get_subtree(repo, branch, full_path, fetch=_api_get)
+    if tree is not None:
+        return [
+            {
+                **entry,
+                "download_url": f"{RAW_BASE}/{repo}/{branch}/{entry['path']}",
+            }
+            for entry in tree.walk(full_path)
+        ]
+
     files: List[Dict[str, Any]] = []
     api_url = f"{GITHUB_API}/repos/{repo}/contents/{SKILLS_BASE_PATH}/{skill_path}"
 
@@ -199,6 +243,7 @@ def fetch_skill_tree(skill_path: str, repo: str, branch: str) -> List[Dict[str,
 # ---------------------------------------------------------------------------
 
 
+@stats.timed("skill.transform")
 def transform_skill_md(content: str, skill_name: str, category: str) -> str:
     """
     Transform skill markdown content from upstream to OpenCode format.
@@ -297,12 +342,16 @@ def _check_symlink(file_path: Path) -> None:
         current = current.parent
 
 
+@stats.timed("skill.file")
 def process_companion_file(
     file_info: Dict[str, Any],
     skill_dir: Path,
     repo: str,
     branch: str,
     verbose: bool,
+    archive: Optional[RepoArchive] = None,
+    skill_name: Optional[str] = None,
+    stage: Optional[StagedDirectory] = None,
 ) -> int:
     """
     Download and process a companion file for a skill.
@@ -321,6 +370,12 @@ def process_companion_file(
         repo: Repository name
         branch: Git branch
         verbose: Enable verbose logging
+        archive: Unpacked repository archive (``--bulk``); when provided the
+            file is read from it instead of being downloaded
+        skill_name: Name of the skill, when *skill_dir* is a staging
+            directory rather than the skill directory itself
+        stage: Staging directory *skill_dir* belongs to; the file is then
+            written through it instead of atomically in place
 
     Returns:
         Size of the file in bytes
@@ -344,15 +399,20 @@ def process_companion_file(
     # Security: symlink check
     _check_symlink(output_path)
 
-    # Download content
-    download_url = file_info.get("download_url", "")
-    if not download_url:
-        # Construct raw URL
-        download_url = f"{RAW_BASE}/{repo}/{branch}/{file_info['path']}"
+    # Download content (or read it from the bulk archive)
+    if archive is not None:
+        content = archive.read_text(file_info["path"])
+        if content is None:
+            raise ValueError(f"Missing from archive: {file_info['path']}")
+    else:
+        download_url = file_info.get("download_url", "")
+        if not download_url:
+            # Construct raw URL
+            download_url = f"{RAW_BASE}/{repo}/{branch}/{file_info['path']}"
 
-    content = _raw_get(download_url)
-    if content is None:
-        raise ValueError(f"Failed to download: {download_url}")
+        content = _raw_get(download_url)
+        if content is None:
+            raise ValueError(f"Failed to download: {download_url}")
 
     content_bytes = content.encode("utf-8")
 
@@ -361,7 +421,7 @@ def process_companion_file(
 
     if filename == "SKILL.md":
         # Extract skill name from directory
-        skill_name = skill_dir.name
+        skill_name = skill_name or skill_dir.name
         category = _extract_category_from_path(file_info["path"])
         final_content = transform_skill_md(content, skill_name, category)
 
@@ -389,23 +449,12 @@ def process_companion_file(
         # Copy as-is (templates/*, reference/*, other files)
         final_content = content
 
-    # Ensure parent directory exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write file (atomic: temp + rename)
-    tmp_fd, tmp_path = tempfile.mkstemp(
-        dir=str(output_path.parent), suffix=".tmp", prefix=".sync-"
-    )
-    try:
-        with os.fdopen(tmp_fd, "w", encoding="utf-8") as tmp:
-            tmp.write(final_content)
-        os.replace(tmp_path, str(output_path))
-    except BaseException:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
-        raise
+    # Write file: plain write into a staging directory (swapped in as a
+    # whole), otherwise atomic temp + rename, creating parent directories
+    if stage is not None:
+        stage.write_text(output_path, final_content)
+    else:
+        atomic_write_text(output_path, final_content)
 
     if verbose:
         logger.debug(
@@ -453,6 +502,7 @@ def is_handwritten_skill(skill_dir: Path) -> bool:
     return False
 
 
+@stats.timed("skill.sync")
 def sync_skill(
     skill_name: str,
     config: Dict[str, str],
@@ -462,10 +512,18 @@ def sync_skill(
     verbose: bool,
     dry_run: bool,
     force: bool = False,
+    archive: Optional[RepoArchive] = None,
+    skill_cache: Optional[Dict[str, Any]] = None,
+    file_jobs: int = COMPANION_FILE_JOBS,
 ) -> bool:
     """
     Sync a single skill from upstream repository.
 
+    Files are written to a staging directory next to the skill (see
+    :class:`StagedDirectory`), downloaded up to *file_jobs* at a time, and
+    the staging directory replaces the skill directory only once every file
+    succeeded; on any error the previous version is left untouched.
+
     Args:
         skill_name: Name of the skill
         config: Dict with 'category' and 'upstream_path' keys
@@ -475,6 +533,12 @@ def sync_skill(
         verbose: Enable verbose output
         dry_run: If True, don't actually write files
         force: If True, overwrite existing hand-written skills
+        archive: Unpacked repository archive (``--bulk``) to read files from
+        skill_cache: Mutable skills cache (rel_path -> upstream blob sha and
+            local sha256, per skill), updated in-place. Files whose blob sha
+            and local content still match are not downloaded again. Ignored
+            when *force* is True.
+        file_jobs: Maximum number of companion files downloaded concurrently
 
     Returns:
         True if successful, False otherwise
@@ -497,6 +561,9 @@ def sync_skill(
     # Fetch file tree
     try:
         files = fetch_skill_tree(upstream_path, repo, branch)
+    except RateLimited:
+        # Deferred by the scheduler; the skill is retried once unblocked
+        raise
     except Exception as exc:
         logger.error("  [error] %s: failed to fetch tree: %s", skill_name, exc)
         return False
@@ -519,69 +586,191 @@ def sync_skill(
     if verbose:
         logger.debug("  Found %d files (%d bytes)", len(files), total_size)
 
+    previous: Dict[str, Any] = {}
+    if skill_cache is not None and not force:
+        previous = skill_cache.get(skill_name) or {}
+    current: Dict[str, Dict[str, str]] = {}
+
     if dry_run:
-        logger.info("  [dry-run] Would sync %s: %d files", skill_name, len(files))
+        unchanged = sum(1 for f in files if _is_unchanged_file(f, skill_dir, previous))
+        logger.info(
+            "  [dry-run] Would sync %s: %d files (%d unchanged)",
+            skill_name,
+            len(files),
+            unchanged,
+        )
         return True
 
-    # Create skill directory
-    skill_dir.mkdir(parents=True, exist_ok=True)
+    # Stage the new version next to the old one. It starts empty, so files
+    # no longer listed upstream are dropped whatever the cache says; unchanged
+    # files and the hand-written marker are hard-linked over from the old one
+    with StagedDirectory(skill_dir, seed=False) as stage:
+        stage.keep(HANDWRITTEN_MARKER)
+        pending: List[Dict[str, Any]] = []
+        unchanged = 0
+        for file_info in files:
+            rel_path = file_info.get("rel_path", "")
+            if _is_unchanged_file(file_info, skill_dir, previous) and stage.keep(
+                rel_path
+            ):
+                current[rel_path] = previous[rel_path]
+                unchanged += 1
+                stats.add("files_unchanged")
+            else:
+                pending.append(file_info)
 
-    # Process each file
-    processed_size = 0
-    for i, file_info in enumerate(files):
-        try:
-            file_size = process_companion_file(
-                file_info, skill_dir, repo, branch, verbose
-            )
-            processed_size += file_size
+        processed_size = _process_companion_files(
+            pending,
+            stage,
+            skill_name,
+            repo,
+            branch,
+            verbose,
+            archive=archive,
+            jobs=file_jobs,
+        )
+        if processed_size is None:
+            return False
+        for file_info in pending:
+            if file_info.get("sha"):
+                current[file_info["rel_path"]] = {
+                    "sha": file_info["sha"],
+                    "sha256": _file_sha256(stage.path / file_info["rel_path"]),
+                }
 
-            # Rate limiting: delay between files
-            if i < len(files) - 1:
-                time.sleep(INTER_FILE_DELAY_MS / 1000.0)
+        stage.commit()
 
-        except ValueError as exc:
-            logger.error(
-                "  [error] %s/%s: %s", skill_name, file_info.get("rel_path", ""), exc
-            )
-            return False
-        except Exception as exc:
-            logger.error(
-                "  [error] %s/%s: unexpected error: %s",
-                skill_name,
-                file_info.get("rel_path", ""),
-                exc,
-            )
-            return False
+    if skill_cache is not None:
+        skill_cache[skill_name] = current
 
     if verbose:
         logger.debug(
-            "  [synced] %s: %d files, %d bytes", skill_name, len(files), processed_size
+            "  [synced] %s: %d files (%d unchanged), %d bytes",
+            skill_name,
+            len(files),
+            unchanged,
+            processed_size,
         )
 
     return True
 
 
+def _process_companion_files(
+    files: List[Dict[str, Any]],
+    stage: StagedDirectory,
+    skill_name: str,
+    repo: str,
+    branch: str,
+    verbose: bool,
+    *,
+    archive: Optional[RepoArchive] = None,
+    jobs: int = COMPANION_FILE_JOBS,
+) -> Optional[int]:
+    """Write *files* into *stage*, up to *jobs* at a time.
+
+    Returns the total bytes written, or None once a file failed (the error
+    is logged and files not yet started are cancelled).
+    """
+    if not files:
+        return 0
+    total = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(files)))) as pool:
+        futures = [
+            (
+                file_info,
+                pool.submit(
+                    process_companion_file,
+                    file_info,
+                    stage.path,
+                    repo,
+                    branch,
+                    verbose,
+                    archive=archive,
+                    skill_name=skill_name,
+                    stage=stage,
+                ),
+            )
+            for file_info in files
+        ]
+        for file_info, future in futures:
+            try:
+                total += future.result()
+            except ValueError as exc:
+                logger.error(
+                    "  [error] %s/%s: %s", skill_name, file_info["rel_path"], exc
+                )
+            except Exception as exc:
+                logger.error(
+                    "  [error] %s/%s: unexpected error: %s",
+                    skill_name,
+                    file_info["rel_path"],
+                    exc,
+                )
+            else:
+                continue
+            for _info, pending in futures:
+                pending.cancel()
+            return None
+    return total
+
+
+def _file_sha256(path: Path) -> str:
+    """Return the hex sha256 of a local file."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _is_unchanged_file(
+    file_info: Dict[str, Any], skill_dir: Path, previous: Dict[str, Any]
+) -> bool:
+    """Return True if a synced file matches both its upstream and local hashes.
+
+    The upstream blob sha must equal the cached one, and the local file must
+    still hold exactly what was written (so local edits are overwritten).
+    """
+    cached = previous.get(file_info.get("rel_path", ""))
+    if not isinstance(cached, dict) or not file_info.get("sha"):
+        return False
+    if cached.get("sha") != file_info["sha"]:
+        return False
+    local_path = skill_dir / file_info["rel_path"]
+    if local_path.is_symlink() or not local_path.is_file():
+        return False
+    try:
+        return _file_sha256(local_path) == cached.get("sha256")
+    except OSError:
+        return False
+
+
 # ---------------------------------------------------------------------------
 # Discovery
 # ---------------------------------------------------------------------------
 
 
-def discover_all_skills(repo: str) -> Dict[str, Dict[str, str]]:
+@stats.timed("discovery")
+def discover_all_skills(
+    repo: str, branch: str = DEFAULT_BRANCH
+) -> Dict[str, Dict[str, str]]:
     """
     Discover all skills in the upstream repository.
 
-    Walks the SKILLS_BASE_PATH directory and returns all skill directories.
+    Walks the SKILLS_BASE_PATH directory and returns all skill directories,
+    using the repository tree index when available and the Contents API
+    otherwise.
 
     Args:
         repo: Repository in format "owner/repo"
+        branch: Git branch name
 
     Returns:
         Dict mapping skill_name -> config dict
     """
     skills: Dict[str, Dict[str, str]] = {}
+    tree = get_repo_tree(repo, branch, fetch=_api_get)
 
-    url = f"{GITHUB_API}/repos/{repo}/contents/{SKILLS_BASE_PATH}"
-    categories = _api_get(url)
+    if tree is not None:
+        categories = tree.listdir(SKILLS_BASE_PATH)
+    else:
+        categories = _api_get(f"{GITHUB_API}/repos/{repo}/contents/{SKILLS_BASE_PATH}")
 
     if not categories:
         logger.error("Error: Could not list skill categories from repo.")
@@ -592,8 +781,12 @@ def discover_all_skills(repo: str) -> Dict[str, Dict[str, str]]:
             continue
         category = cat_entry["name"]
 
-        cat_url = f"{GITHUB_API}/repos/{repo}/contents/{SKILLS_BASE_PATH}/{category}"
-        skill_dirs = _api_get(cat_url)
+        if tree is not None:
+            skill_dirs = tree.listdir(f"{SKILLS_BASE_PATH}/{category}")
+        else:
+            skill_dirs = _api_get(
+                f"{GITHUB_API}/repos/{repo}/contents/{SKILLS_BASE_PATH}/{category}"
+            )
 
         if not skill_dirs:
             continue
@@ -737,6 +930,8 @@ def build_parser() -> argparse.ArgumentParser:
             "  python scripts/sync-skills.py --all            # Sync ALL skills\n"
             "  python scripts/sync-skills.py --dry-run -v     # Preview without writing\n"
             "  python scripts/sync-skills.py --clean --force  # Clean + re-sync\n"
+            "  python scripts/sync-skills.py --all --bulk     # One archive download\n"
+            "  python scripts/sync-skills.py --all --jobs 8   # Sync with 8 workers\n"
         ),
     )
     parser.add_argument(
@@ -782,14 +977,17 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--force",
         action="store_true",
-        help="Overwrite existing skill files (including hand-written)",
+        help=(
+            "Overwrite existing skill files (including hand-written) and "
+            "ignore the incremental skills cache"
+        ),
     )
     parser.add_argument(
         "--clean",
         action="store_true",
         help=(
-            "Remove all previously synced skill directories "
-            "before syncing. Preserves non-synced skills."
+            "Remove all previously synced skill directories and the sync "
+            "caches before syncing. Preserves non-synced skills."
         ),
     )
     parser.add_argument(
@@ -798,6 +996,39 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Verbose output",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Number of skills synced concurrently (default: 1). Workers share "
+            "the process-wide rate limiter and connection pool."
+        ),
+    )
+    parser.add_argument(
+        "--file-jobs",
+        type=int,
+        default=COMPANION_FILE_JOBS,
+        metavar="N",
+        help=(
+            "Number of companion files downloaded concurrently within each "
+            f"skill (default: {COMPANION_FILE_JOBS})"
+        ),
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help=(
+            "Download the upstream repository archive once and sync from it "
+            "instead of fetching each file (falls back to per-file fetching "
+            "if the download fails)"
+        ),
+    )
+    add_resume_argument(parser)
+    add_fixture_arguments(parser)
+    add_stats_arguments(parser)
     return parser
 
 
@@ -805,9 +1036,16 @@ def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
 
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.file_jobs < 1:
+        parser.error("--file-jobs must be at least 1")
+
     # Configure logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=log_level, format="%(message)s", stream=sys.stderr)
+    install_fixture_store(args)
+    stats.reset()
 
     repo = args.repo
     branch = args.branch
@@ -839,11 +1077,32 @@ def main() -> int:
         logger.info("  %s %d synced skill(s).", action, removed)
         if not args.dry_run:
             _remove_sync_cache(output_dir, verbose=args.verbose)
+            _remove_sync_cache(
+                output_dir,
+                verbose=args.verbose,
+                cache_filename=SKILLS_CACHE_FILENAME,
+            )
+            _remove_sync_cache(
+                output_dir,
+                verbose=args.verbose,
+                cache_filename=sync_journal_filename("sync-skills"),
+            )
+
+    # Bulk mode: one archive download serves discovery and every file
+    archive: Optional[RepoArchive] = None
+    if args.bulk and not args.list:
+        logger.info("Downloading repository archive of %s...", repo)
+        try:
+            archive = download_repo_archive(repo, branch, prefixes=(SKILLS_BASE_PATH,))
+        except ArchiveError as exc:
+            logger.warning("  [bulk] %s — falling back to per-file fetching", exc)
+        else:
+            prime_repo_tree(repo, branch, archive.tree)
 
     # Determine skill set
     if args.all:
         logger.info("Discovering all skills in %s...", repo)
-        skills = discover_all_skills(repo)
+        skills = discover_all_skills(repo, args.branch)
         if not skills:
             logger.error("No skills found.")
             return 1
@@ -861,7 +1120,9 @@ def main() -> int:
         if not skills:
             logger.error("No skills found matching category '%s'.", args.filter)
             # List available categories
-            all_skills = discover_all_skills(repo) if args.all else CURATED_SKILLS
+            all_skills = (
+                discover_all_skills(repo, args.branch) if args.all else CURATED_SKILLS
+            )
             categories = sorted({c["category"] for c in all_skills.values()})
             logger.info("Available categories: %s", ", ".join(categories))
             return 1
@@ -887,47 +1148,140 @@ def main() -> int:
     if args.dry_run:
         logger.info("  (dry-run mode: no files will be written)")
 
+    # Incremental cache: --force starts from scratch but still records the
+    # fresh hashes for the next run
+    skill_cache: Dict[str, Any] = {}
+    if not args.force:
+        skill_cache = _load_sync_cache(output_dir, SKILLS_CACHE_FILENAME)
+        if args.verbose:
+            logger.debug("  Incremental mode: %d skills in cache", len(skill_cache))
+
+    # Checkpoint journal: completed skills and their cache entries, replayed
+    # by --resume so only the remaining skills are synced
+    journal: Optional[SyncJournal] = None
+    resumed = 0
+    resumed_synced = 0
+    pending = dict(skills)
+    if not args.dry_run:
+        journal = SyncJournal(
+            output_dir / sync_journal_filename("sync-skills"),
+            {
+                "script": "sync-skills",
+                "repo": repo,
+                "branch": branch,
+                "all": args.all,
+                "filter": args.filter,
+                "force": args.force,
+            },
+        )
+        try:
+            done = journal.open(resume=args.resume).get("skill", {})
+        except SyncJournalMismatch as exc:
+            logger.error("  [resume] %s — rerun with the same options", exc)
+            return 1
+        for name in sorted(set(done) & set(skills)):
+            record = done[name]
+            if record.get("cache") is not None:
+                skill_cache[name] = record["cache"]
+            resumed += 1
+            resumed_synced += bool(record.get("result"))
+            del pending[name]
+        if resumed:
+            logger.info(
+                "  Resuming: %d skills already done, %d remaining",
+                resumed,
+                len(pending),
+            )
+
     success = 0
     skipped = 0
     failed = 0
 
-    for i, (name, config) in enumerate(sorted(skills.items()), 1):
-        label = f"[{i}/{len(skills)}]"
-        print(f"  {label} {name}...", end="", flush=True)
+    def _sync_one(item: Tuple[str, Dict[str, str]]) -> bool:
+        name, config = item
+        return sync_skill(
+            name,
+            config,
+            str(output_dir),
+            repo,
+            branch,
+            verbose=args.verbose,
+            dry_run=args.dry_run,
+            force=args.force,
+            archive=archive,
+            skill_cache=skill_cache,
+            file_jobs=args.file_jobs,
+        )
 
-        try:
-            result = sync_skill(
-                name,
-                config,
-                str(output_dir),
-                repo,
-                branch,
-                verbose=args.verbose,
-                dry_run=args.dry_run,
-                force=args.force,
-            )
-            if result:
-                success += 1
-                print(" done")
-            else:
-                skipped += 1
-                print(" skipped")
-        except Exception as exc:
+    progress = 0
+
+    def _record(
+        item: Tuple[str, Dict[str, str]],
+        result: Optional[bool],
+        error: Optional[BaseException],
+    ) -> None:
+        nonlocal progress, success, skipped, failed
+        progress += 1
+        print(f"  [{progress}/{len(pending)}] {item[0]}...", end="", flush=True)
+        if error is not None:
             failed += 1
-            logger.error(" error: %s", exc)
+            logger.error(" error: %s", error)
             if args.verbose:
-                traceback.print_exc()
+                traceback.print_exception(type(error), error, error.__traceback__)
+            return
+        if result:
+            success += 1
+            print(" done")
+        else:
+            skipped += 1
+            print(" skipped")
+        if journal is not None:
+            journal.record(
+                "skill", item[0], result=result, cache=skill_cache.get(item[0])
+            )
+
+    if args.jobs > 1:
+        logger.info("  Running with %d concurrent workers", args.jobs)
+    completed = run_sync(sorted(pending.items()), _sync_one, _record, jobs=args.jobs)
 
-        # Rate limiting: delay between skills
-        if i < len(skills):
-            time.sleep(INTER_SKILL_DELAY_MS / 1000.0)
+    if archive is not None:
+        archive.close()
+
+    # Persist the skills cache (also after Ctrl-C)
+    if not args.dry_run:
+        _save_sync_cache(output_dir, skill_cache, SKILLS_CACHE_FILENAME)
+
+    # Keep the journal while anything is left to do (see --resume)
+    if journal is not None:
+        journal.close(completed=completed and failed == 0)
+
+    summary = {
+        "skills": len(skills),
+        "resumed": resumed,
+        "synced": success,
+        "skipped": skipped,
+        "failed": failed,
+        "completed": completed,
+    }
+    if not completed:
+        write_stats(args, summary)
+        logger.warning(
+            "Sync interrupted after %d/%d skills; manifest not written. "
+            "Run again with --resume to continue.",
+            progress,
+            len(pending),
+        )
+        return 130
 
     # Write manifest
-    if success > 0 and not args.dry_run:
+    if success + resumed_synced > 0 and not args.dry_run:
         write_manifest(output_dir, skills, dry_run=args.dry_run)
+    write_stats(args, summary)
 
     # Summary
     parts = [f"{success} synced", f"{skipped} skipped", f"{failed} failed"]
+    if resumed:
+        parts.insert(1, f"{resumed} resumed")
     logger.info("Sync complete: %s", ", ".join(parts))
 
     if not os.environ.get("GITHUB_TOKEN") and len(skills) > 20:
@@ -10,17 +10,41 @@ Requires: Python 3.8+ (stdlib only, no pip dependencies)
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import contextlib
+import functools
 import hashlib
+import http.client
+import io
 import json
 import logging
 import os
 import re
+import shutil
+import ssl
+import tarfile
 import tempfile
+import threading
 import time
 import urllib.error
 import urllib.request
+import zlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -28,14 +52,51 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 DEFAULT_REPO = "davila7/claude-code-templates"
 DEFAULT_BRANCH = "main"
-GITHUB_API = "https://api.github.com"
-RAW_BASE = "https://raw.githubusercontent.com"
+# Endpoints (no trailing slash) can be pointed at a local GitHub stand-in,
+# e.g. by the benchmark harness in benchmark_sync.py
+GITHUB_API = os.environ.get("SYNC_GITHUB_API", "https://api.github.com")
+RAW_BASE = os.environ.get("SYNC_RAW_BASE", "https://raw.githubusercontent.com")
+CODELOAD_BASE = os.environ.get("SYNC_CODELOAD_BASE", "https://codeload.github.com")
+GRAPHQL_API = f"{GITHUB_API}/graphql"
+
+# Paths looked up per GraphQL freshness query (well under the node limit)
+GRAPHQL_BATCH_SIZE = 100
 
 SYNC_CACHE_FILENAME = ".sync-cache.json"
 
+# Checkpoint journal of an unfinished run, next to the sync cache (--resume).
+# One per script ({script} placeholder): sync-all and sync-agents share the
+# agents directory and must not truncate each other's checkpoint.
+SYNC_JOURNAL_FILENAME = ".sync-journal-{script}.jsonl"
+
 MAX_RATE_LIMIT_WAIT = 300  # 5 minutes — cap to prevent abusive Retry-After values
 MAX_BACKOFF_WAIT = 60  # 1 minute — cap for exponential backoff
 
+_RAW_MAX_BYTES = 1_048_576  # 1 MB — cap for a single raw file
+
+# Cap for the --bulk repository tarball, applied to both the compressed
+# download and the total size of the extracted members.
+ARCHIVE_MAX_BYTES = 200 * 1024 * 1024
+_ARCHIVE_CHUNK_SIZE = 64 * 1024
+
+# Age after which a StagedDirectory leftover is removed even though the PID
+# in its name is running (a reused PID, or a sync that hung)
+STAGING_STALE_AFTER = 3600  # 1 hour
+
+# Requests kept in hand when pacing against X-RateLimit-Remaining, so that a
+# concurrent process (or a manual curl) does not push us into a hard 403.
+RATE_LIMIT_RESERVE = 5
+# Fraction of the remaining budget that may be spent as an immediate burst
+# before requests are spread evenly until the reset.
+RATE_LIMIT_BURST_FRACTION = 0.5
+# Waits up to this long are slept inline; longer ones park the item (see
+# RateLimiter.deferring) so other work proceeds in the meantime.
+RATE_LIMIT_DEFER_THRESHOLD = 2.0
+# Times an item may be parked after a 403/429 of its own before that error
+# is raised, so a limit that keeps coming back fails the item after as many
+# attempts as the inline retries of _http_request would make.
+RATE_LIMIT_MAX_PARKS = 3
+
 # Source / upstream category -> OpenCode subdirectory for nested agent organization.
 # Used by both sync-agents.py (to place agent files) and update-manifest.py
 # (to categorize manifest entries).  Keep this as the single source of truth.
@@ -92,15 +153,43 @@ __all__ = [
     "DEFAULT_BRANCH",
     "GITHUB_API",
     "RAW_BASE",
+    "CODELOAD_BASE",
+    "GRAPHQL_API",
+    "GRAPHQL_BATCH_SIZE",
+    "ARCHIVE_MAX_BYTES",
     "SYNC_CACHE_FILENAME",
+    "SYNC_JOURNAL_FILENAME",
+    "sync_journal_filename",
+    "SyncJournalMismatch",
     "MAX_RATE_LIMIT_WAIT",
     "MAX_BACKOFF_WAIT",
+    "RATE_LIMIT_RESERVE",
+    "RATE_LIMIT_BURST_FRACTION",
+    "RATE_LIMIT_DEFER_THRESHOLD",
+    "RATE_LIMIT_MAX_PARKS",
     # Logger
     "logger",
     # Type alias
     "HttpResult",
-    # Class
+    "ResultCallback",
+    # Classes
     "SafeRedirectHandler",
+    "RateLimiter",
+    "RateLimited",
+    "SyncStats",
+    "stats",
+    "rate_limiter",
+    "rate_limit_resource",
+    "ConnectionPool",
+    "connection_pool",
+    "RepoTree",
+    "RepoArchive",
+    "ArchiveError",
+    "ResponseTooLargeError",
+    "FixtureStore",
+    "fixture_store",
+    "StageResult",
+    "PipelineInterrupted",
     # Functions
     "_get_headers",
     "_http_request",
@@ -108,15 +197,39 @@ __all__ = [
     "_raw_get",
     "_cached_get",
     "check_rate_limit",
+    "fetch_blob_oids",
+    "get_repo_tree",
+    "get_subtree",
+    "clear_repo_tree_cache",
+    "prime_repo_tree",
+    "download_repo_archive",
+    "add_fixture_arguments",
+    "install_fixture_store",
+    "add_stats_arguments",
+    "write_stats",
     "_load_sync_cache",
     "_save_sync_cache",
     "_remove_sync_cache",
+    "SyncJournal",
+    "add_resume_argument",
+    "atomic_write_text",
+    "atomic_write_bytes",
+    "StagedDirectory",
+    "STAGING_STALE_AFTER",
+    "sync_items",
+    "run_sync",
+    "run_sync_groups",
+    "pipeline_items",
+    "run_pipeline",
+    "FrontmatterScan",
+    "scan_frontmatter",
     "parse_frontmatter",
     "validate_output_path",
     "is_synced_file",
     "clean_synced_files",
     "_parse_retry_after",
     "parse_nested_frontmatter",
+    "AgentDocument",
     "validate_agent_schema",
     "check_template_conformance",
 ]
@@ -133,27 +246,836 @@ logger = logging.getLogger("sync-common")
 # ---------------------------------------------------------------------------
 
 
+def _check_redirect(url: str, newurl: str, code: int, headers: Any, fp: Any) -> None:
+    """Raise ``HTTPError`` if redirecting *url* to *newurl* changes origin."""
+    orig = urlparse(url)
+    dest = urlparse(newurl)
+    if orig.hostname != dest.hostname or orig.port != dest.port:
+        raise urllib.error.HTTPError(
+            newurl,
+            code,
+            f"Cross-origin redirect blocked: "
+            f"{orig.hostname}:{orig.port} -> {dest.hostname}:{dest.port}",
+            headers,
+            fp,
+        )
+
+
 class SafeRedirectHandler(urllib.request.HTTPRedirectHandler):
     """Block cross-origin redirects to protect the auth token."""
 
     def redirect_request(self, req, fp, code, msg, headers, newurl):
-        from urllib.parse import urlparse
+        _check_redirect(req.full_url, newurl, code, headers, fp)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(SafeRedirectHandler)
+
+
+# ---------------------------------------------------------------------------
+# Keep-alive connection pool — one TLS handshake per host instead of per file
+# ---------------------------------------------------------------------------
+
+_REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
+_MAX_REDIRECTS = 10  # same limit as urllib's HTTPRedirectHandler
+
+_PoolKey = Tuple[str, str, Optional[int]]
 
-        orig = urlparse(req.full_url)
-        dest = urlparse(newurl)
-        if orig.hostname != dest.hostname or orig.port != dest.port:
+
+class _PooledResponse:
+    """Response wrapper that hands its connection back to the pool on close.
+
+    Mirrors the subset of ``urllib`` responses used by :func:`_http_request`
+    (``status``, ``headers``, ``read()`` and the context-manager protocol).
+    """
+
+    def __init__(
+        self,
+        pool: "ConnectionPool",
+        key: _PoolKey,
+        conn: http.client.HTTPConnection,
+        resp: http.client.HTTPResponse,
+    ) -> None:
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self.status = resp.status
+        self.headers = resp.msg
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._resp.read(amt)
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        # A connection can only be reused once its body is fully consumed;
+        # partially read (capped) responses close the socket instead.
+        if self._resp.isclosed() and not self._resp.will_close:
+            self._pool._checkin(self._key, self._conn)
+        else:
+            self._resp.close()
+            self._conn.close()
+        self._conn = None
+
+    def __enter__(self) -> "_PooledResponse":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """Thread-safe per-host pool of keep-alive ``http.client`` connections.
+
+    Follows same-origin redirects (cross-origin ones are blocked exactly like
+    :class:`SafeRedirectHandler`) and raises ``urllib.error.HTTPError`` /
+    ``urllib.error.URLError`` like ``urllib``, so :func:`_http_request` keeps
+    its retry and rate-limit logic unchanged.
+    """
+
+    def __init__(self, *, max_idle_per_host: int = 8) -> None:
+        self._max_idle = max_idle_per_host
+        self._lock = threading.Lock()
+        self._idle: Dict[_PoolKey, List[http.client.HTTPConnection]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def _new_connection(
+        self, key: _PoolKey, timeout: float
+    ) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context
+            )
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _checkout(self, key: _PoolKey) -> Optional[http.client.HTTPConnection]:
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _checkin(self, key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _send(
+        self,
+        key: _PoolKey,
+        target: str,
+        headers: Dict[str, str],
+        data: Optional[bytes],
+        timeout: float,
+    ) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send a request, retrying once on a fresh socket if a reused one is stale.
+
+        The request is a POST when *data* is given, a GET otherwise.
+        """
+        method = "GET" if data is None else "POST"
+        conn = self._checkout(key)
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._new_connection(key, timeout)
+            try:
+                conn.request(method, target, body=data, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.HTTPException, OSError) as exc:
+                conn.close()
+                if reused:
+                    # Server closed an idle keep-alive socket — not an error
+                    conn, reused = None, False
+                    continue
+                raise urllib.error.URLError(exc) from exc
+
+    def open(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        *,
+        data: Optional[bytes] = None,
+        timeout: float = 30,
+    ) -> _PooledResponse:
+        """Request *url* on a pooled connection and return the (unread) response.
+
+        Sends a POST with *data* when given. As with ``urllib``, a redirected
+        POST is retried as a GET, except for 307/308 which are refused.
+        """
+        for _ in range(_MAX_REDIRECTS + 1):
+            parts = urlparse(url)
+            if parts.scheme not in ("http", "https") or not parts.hostname:
+                raise urllib.error.URLError(f"unsupported URL: {url}")
+            key: _PoolKey = (parts.scheme, parts.hostname, parts.port)
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+
+            conn, resp = self._send(key, target, headers, data, timeout)
+            status = resp.status
+            if 200 <= status < 300:
+                return _PooledResponse(self, key, conn, resp)
+
+            body = resp.read()
+            _PooledResponse(self, key, conn, resp).close()
+
+            location = resp.getheader("Location")
+            if status in _REDIRECT_CODES and location and data is not None:
+                if status in (307, 308):
+                    raise urllib.error.HTTPError(
+                        url, status, resp.reason, resp.msg, io.BytesIO(body)
+                    )
+                data = None
+            if status in _REDIRECT_CODES and location:
+                newurl = urljoin(url, location)
+                _check_redirect(url, newurl, status, resp.msg, io.BytesIO(body))
+                url = newurl
+                continue
             raise urllib.error.HTTPError(
-                newurl,
-                code,
-                f"Cross-origin redirect blocked: "
-                f"{orig.hostname}:{orig.port} -> {dest.hostname}:{dest.port}",
-                headers,
-                fp,
+                url, status, resp.reason, resp.msg, io.BytesIO(body)
             )
-        return super().redirect_request(req, fp, code, msg, headers, newurl)
+        raise urllib.error.HTTPError(
+            url, status, "Too many redirects", resp.msg, io.BytesIO(b"")
+        )
 
 
-_opener = urllib.request.build_opener(SafeRedirectHandler)
+connection_pool = ConnectionPool()
+
+
+def _open(
+    url: str,
+    headers: Dict[str, str],
+    *,
+    data: Optional[bytes] = None,
+    timeout: float = 30,
+) -> Any:
+    """Open *url* through the keep-alive pool (POSTing *data* if given).
+
+    When a :data:`fixture_store` is installed, requests are recorded to or
+    replayed from it instead (see :class:`FixtureStore`).
+    """
+    if fixture_store is not None:
+        return fixture_store.open(url, headers, data=data, timeout=timeout)
+    return _open_network(url, headers, data=data, timeout=timeout)
+
+
+def _open_network(
+    url: str,
+    headers: Dict[str, str],
+    *,
+    data: Optional[bytes] = None,
+    timeout: float = 30,
+) -> Any:
+    """Open *url* over the network.
+
+    Falls back to the plain ``urllib`` opener when a proxy is configured in
+    the environment, since the pool connects to hosts directly.
+    """
+    if urllib.request.getproxies():
+        req = urllib.request.Request(url, data=data, headers=headers)
+        return _opener.open(req, timeout=timeout)
+    return connection_pool.open(url, headers, data=data, timeout=timeout)
+
+
+# ---------------------------------------------------------------------------
+# Offline record/replay — HTTP fixture store below _open()
+# ---------------------------------------------------------------------------
+
+# Request headers that select a different response and so are part of the
+# fixture key. Authorization is deliberately left out (and never stored).
+_FIXTURE_KEY_HEADERS = ("Accept", "If-None-Match", "If-Modified-Since")
+
+
+class _FixtureResponse:
+    """Response replayed from a fixture body file (``_open()`` interface)."""
+
+    def __init__(self, body_path: Path, headers: Any, status: int) -> None:
+        self._fp = open(body_path, "rb")
+        self.headers = headers
+        self.status = status
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._fp.read(amt)
+
+    def close(self) -> None:
+        self._fp.close()
+
+    def __enter__(self) -> "_FixtureResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class FixtureStore:
+    """Record HTTP exchanges to a directory, or replay them without network.
+
+    Each exchange is stored as ``<key>.json`` (URL, status, response
+    headers) plus ``<key>.body``, where the key hashes the method, URL,
+    request body and the headers in :data:`_FIXTURE_KEY_HEADERS`, so
+    conditional requests (ETag / 304) replay faithfully. Because the store
+    sits below :func:`_http_request`, replays still go through the rate
+    limiter, retries and size caps. ``X-RateLimit-Reset`` is shifted to
+    the replay time so recorded budgets behave the same on every run.
+
+    Replay-only knobs for benchmarking:
+        latency: Seconds slept before every replayed response.
+        rate_limit_every: Answer every Nth request with a 429 carrying
+            ``Retry-After: retry_after`` (0 disables).
+
+    Unrecorded requests replay as 404 (with a warning).
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        mode: str,
+        *,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: int = 1,
+        transport: Optional[Callable[..., Any]] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"fixture mode must be one of {self.MODES}, not {mode!r}")
+        self.root = Path(root)
+        self.mode = mode
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self._transport = transport
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(url: str, headers: Dict[str, str], data: Optional[bytes] = None) -> str:
+        """Return the fixture key of a request."""
+        selected = {
+            name: value
+            for name, value in headers.items()
+            if name.title() in _FIXTURE_KEY_HEADERS
+        }
+        material = json.dumps(
+            [
+                "POST" if data is not None else "GET",
+                url,
+                sorted((k.title(), v) for k, v in selected.items()),
+                hashlib.sha256(data or b"").hexdigest(),
+            ]
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def open(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        *,
+        data: Optional[bytes] = None,
+        timeout: float = 30,
+    ) -> Any:
+        """Drop-in replacement for :func:`_open_network`."""
+        key = self.key(url, headers, data)
+        if self.mode == "record":
+            return self._record(key, url, headers, data, timeout)
+        return self._replay(key, url)
+
+    def _record(
+        self,
+        key: str,
+        url: str,
+        headers: Dict[str, str],
+        data: Optional[bytes],
+        timeout: float,
+    ) -> Any:
+        transport = self._transport or _open_network
+        self.root.mkdir(parents=True, exist_ok=True)
+        body_path = self.root / f"{key}.body"
+        try:
+            resp = transport(url, headers, data=data, timeout=timeout)
+        except urllib.error.HTTPError as exc:
+            body = exc.read() if exc.fp is not None else b""
+            self._save(key, url, exc.code, exc.headers, body)
+            raise self._http_error(url, exc.code, exc.headers, body_path) from None
+        with resp:
+            tmp_fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.root), suffix=".tmp", prefix=".fixture-"
+            )
+            try:
+                with os.fdopen(tmp_fd, "wb") as tmp:
+                    while True:
+                        chunk = resp.read(_ARCHIVE_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        tmp.write(chunk)
+                os.replace(tmp_path, str(body_path))
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self._save(key, url, resp.status, resp.headers, None)
+            return _FixtureResponse(body_path, resp.headers, resp.status)
+
+    def _save(
+        self, key: str, url: str, status: int, headers: Any, body: Optional[bytes]
+    ) -> None:
+        if body is not None:
+            atomic_write_bytes(self.root / f"{key}.body", body)
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": [[k, v] for k, v in (headers or {}).items()],
+            "recorded_at": self._clock(),
+        }
+        atomic_write_text(self.root / f"{key}.json", json.dumps(meta, indent=2) + "\n")
+
+    def _replay(self, key: str, url: str) -> Any:
+        with self._lock:
+            self.requests += 1
+            throttled = (
+                self.rate_limit_every > 0
+                and self.requests % self.rate_limit_every == 0
+            )
+        if self.latency > 0:
+            self._sleep(self.latency)
+        if throttled:
+            headers = http.client.HTTPMessage()
+            headers["Retry-After"] = str(self.retry_after)
+            raise urllib.error.HTTPError(
+                url, 429, "Too Many Requests (injected)", headers, io.BytesIO(b"")
+            )
+
+        meta_path = self.root / f"{key}.json"
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            logger.warning("  [replay] No fixture for %s — answering 404", url)
+            raise urllib.error.HTTPError(
+                url, 404, "Not Recorded", http.client.HTTPMessage(), io.BytesIO(b"")
+            ) from None
+
+        shift = self._clock() - float(meta.get("recorded_at", 0))
+        headers = http.client.HTTPMessage()
+        for name, value in meta.get("headers", []):
+            if name.lower() == "x-ratelimit-reset" and value.isdigit():
+                value = str(int(int(value) + shift))
+            headers[name] = value
+        status = int(meta["status"])
+        body_path = self.root / f"{key}.body"
+        if status >= 300:
+            raise self._http_error(url, status, headers, body_path)
+        return _FixtureResponse(body_path, headers, status)
+
+    @staticmethod
+    def _http_error(
+        url: str, status: int, headers: Any, body_path: Path
+    ) -> urllib.error.HTTPError:
+        body = body_path.read_bytes() if body_path.exists() else b""
+        reason = http.client.responses.get(status, "")
+        return urllib.error.HTTPError(url, status, reason, headers, io.BytesIO(body))
+
+
+# Installed by install_fixture_store() (--record / --replay); None = network
+fixture_store: Optional[FixtureStore] = None
+
+
+def add_fixture_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``--record`` / ``--replay`` options shared by the sync CLIs."""
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Record every HTTP response into the fixture directory DIR",
+    )
+    modes.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Serve every HTTP request from the fixture directory DIR (offline)",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Latency added to each replayed response (default: 0)",
+    )
+    parser.add_argument(
+        "--replay-rate-limit",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Answer every Nth replayed request with a 429 (default: off)",
+    )
+
+
+def install_fixture_store(args: argparse.Namespace) -> Optional[FixtureStore]:
+    """Install the fixture store selected by :func:`add_fixture_arguments`."""
+    global fixture_store
+    if args.record:
+        fixture_store = FixtureStore(args.record, "record")
+        logger.info("Recording HTTP fixtures to %s/", args.record)
+    elif args.replay:
+        fixture_store = FixtureStore(
+            args.replay,
+            "replay",
+            latency=args.replay_latency,
+            rate_limit_every=args.replay_rate_limit,
+        )
+        logger.info("Replaying HTTP fixtures from %s/ (offline)", args.replay)
+    return fixture_store
+
+
+# ---------------------------------------------------------------------------
+# Run instrumentation — per-phase timings and HTTP accounting (--stats-json)
+# ---------------------------------------------------------------------------
+
+
+class SyncStats:
+    """Thread-safe phase timers and counters for one sync run.
+
+    Phases are inclusive and summed across worker threads, so with
+    ``--jobs N`` their total can exceed the wall time; nested phases
+    (``http`` inside ``agent.fetch``) are counted in both.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything recorded so far and restart the wall clock."""
+        with self._lock:
+            self.started = self._clock()
+            self.phases: Dict[str, List[float]] = {}  # name -> [seconds, calls]
+            self.counters: Dict[str, float] = {}
+
+    def add(self, name: str, value: float = 1) -> None:
+        """Increase counter *name* by *value*."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Record one call of phase *name* lasting *seconds*."""
+        with self._lock:
+            phase = self.phases.setdefault(name, [0.0, 0])
+            phase[0] += seconds
+            phase[1] += 1
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one call of phase *name*."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add_time(name, self._clock() - start)
+
+    def timed(self, name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator timing every call of the wrapped function as *name*."""
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.phase(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def to_dict(self, summary: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Return the report; *summary* holds script-level item counts."""
+        with self._lock:
+            report: Dict[str, Any] = {
+                "wall_time_s": round(self._clock() - self.started, 3),
+                "phases": {
+                    name: {"seconds": round(seconds, 3), "calls": calls}
+                    for name, (seconds, calls) in sorted(self.phases.items())
+                },
+                "counters": {
+                    name: round(value, 3) if isinstance(value, float) else value
+                    for name, value in sorted(self.counters.items())
+                },
+            }
+        if summary is not None:
+            report["summary"] = summary
+        return report
+
+    def write_json(
+        self, path: Union[str, Path], summary: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Write :meth:`to_dict` to *path* as JSON."""
+        text = json.dumps(self.to_dict(summary), indent=2) + "\n"
+        atomic_write_text(Path(path), text)
+        logger.info("Stats written: %s", path)
+
+
+stats = SyncStats()
+
+
+def add_stats_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``--stats-json`` option shared by the sync CLIs."""
+    parser.add_argument(
+        "--stats-json",
+        metavar="PATH",
+        help=(
+            "Write per-phase timings and request accounting (bytes, retries, "
+            "304 hits, rate-limit sleeps) for this run to PATH as JSON"
+        ),
+    )
+
+
+def write_stats(args: argparse.Namespace, summary: Dict[str, Any]) -> None:
+    """Write the run report to ``--stats-json`` when it was given."""
+    if args.stats_json:
+        stats.write_json(args.stats_json, summary)
+
+
+# ---------------------------------------------------------------------------
+# Adaptive rate limiter — paces requests from X-RateLimit-* response headers
+# ---------------------------------------------------------------------------
+
+
+class _Bucket:
+    """Token bucket state for a single host."""
+
+    __slots__ = (
+        "tokens",
+        "capacity",
+        "rate",
+        "updated",
+        "blocked_until",
+        "reset",
+        "remaining",
+    )
+
+    def __init__(self, now: float) -> None:
+        self.tokens = 0.0
+        self.capacity = 0.0
+        self.rate: Optional[float] = None  # None → no budget known, unpaced
+        self.updated = now
+        self.blocked_until = 0.0
+        self.reset = 0  # X-RateLimit-Reset epoch of the current window
+        self.remaining = 0
+
+    def refill(self, now: float) -> None:
+        if self.rate is not None and now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+
+
+class RateLimited(Exception):
+    """Raised instead of sleeping when a deferring caller must wait.
+
+    See :meth:`RateLimiter.deferring`; *wait* is the number of seconds
+    until a request to *host* may be sent. *error* is the 403/429 that
+    caused the wait when it was raised between two attempts of the same
+    request (see :func:`_http_request`), ``None`` otherwise.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        wait: float,
+        error: Optional[urllib.error.HTTPError] = None,
+    ) -> None:
+        super().__init__(f"{host} rate-limited for {wait:.1f}s")
+        self.host = host
+        self.wait = wait
+        self.error = error
+
+
+class RateLimiter:
+    """Process-wide token bucket fed by GitHub's rate-limit headers.
+
+    Every response updates the bucket of its host from
+    ``X-RateLimit-Remaining`` / ``X-RateLimit-Reset``: up to
+    *burst_fraction* of the remaining budget can be spent immediately, the
+    rest is refilled at the pace that lands exactly on *reserve* requests
+    at the reset time.  Hosts that never send those headers (e.g.
+    raw.githubusercontent.com) stay unpaced until :meth:`penalize` is
+    called after a bare 429.
+
+    Buckets are keyed by host and ``X-RateLimit-Resource`` (``core``,
+    ``graphql``, ``search``...), since GitHub meters each resource in its
+    own window; see :func:`rate_limit_resource`.  An exhausted budget holds
+    its bucket until the reset, but never longer than
+    :data:`MAX_RATE_LIMIT_WAIT`.
+
+    Thread-safe: one instance is shared by every worker of a sync run.
+    """
+
+    def __init__(
+        self,
+        *,
+        reserve: int = RATE_LIMIT_RESERVE,
+        burst_fraction: float = RATE_LIMIT_BURST_FRACTION,
+        defer_threshold: float = RATE_LIMIT_DEFER_THRESHOLD,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._reserve = reserve
+        self._burst_fraction = burst_fraction
+        self._defer_threshold = defer_threshold
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        """Forget every known budget (used by tests and long-lived callers)."""
+        with self._lock:
+            self._buckets.clear()
+
+    def delay_for(self, host: str, resource: str = "core") -> float:
+        """Reserve one request slot for *host* and return the wait in seconds."""
+        with self._lock:
+            bucket = self._buckets.get((host, resource))
+            if bucket is None:
+                return 0.0
+            now = self._clock()
+            bucket.refill(now)
+            wait = max(bucket.blocked_until - now, 0.0)
+            if bucket.rate is None:
+                return wait
+            # Tokens may go negative: concurrent callers queue up behind
+            # each other instead of all waking at the same instant.
+            bucket.tokens -= 1.0
+            if bucket.tokens < 0:
+                if bucket.rate > 0:
+                    wait = max(wait, -bucket.tokens / bucket.rate)
+                else:
+                    wait = max(wait, bucket.blocked_until - now)
+            return wait
+
+    @contextlib.contextmanager
+    def deferring(self) -> Iterator[None]:
+        """Raise :class:`RateLimited` instead of sleeping, in this thread.
+
+        Used by the schedulers of :func:`sync_items` / :func:`pipeline_items`
+        to park a rate-limited item and keep its thread busy with other work.
+        Waits up to the defer threshold are still slept inline.
+        """
+        previous = getattr(self._local, "defer", False)
+        self._local.defer = True
+        try:
+            yield
+        finally:
+            self._local.defer = previous
+
+    def acquire(self, host: str, resource: str = "core") -> float:
+        """Block until a request to *host* may be sent.  Returns seconds slept."""
+        wait = self.delay_for(host, resource)
+        if wait > self._defer_threshold and getattr(self._local, "defer", False):
+            self._refund(host, resource)
+            raise RateLimited(host, wait)
+        if wait > 0:
+            logger.debug("  [rate-limit] pacing %s: waiting %.2fs", host, wait)
+            self._sleep(wait)
+        return wait
+
+    def _refund(self, host: str, resource: str) -> None:
+        """Give back the slot reserved by :meth:`delay_for` for *host*."""
+        with self._lock:
+            bucket = self._buckets.get((host, resource))
+            if bucket is not None and bucket.rate is not None:
+                bucket.tokens += 1.0
+
+    def update(self, host: str, headers: Any, resource: str = "core") -> None:
+        """Refresh the budget of *host* from a response's rate-limit headers.
+
+        ``X-RateLimit-Resource``, when sent, overrides *resource*.
+        """
+        if headers is None:
+            return
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining"))
+            reset = int(headers.get("X-RateLimit-Reset"))
+        except (TypeError, ValueError):
+            return
+        resource = headers.get("X-RateLimit-Resource") or resource
+
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.setdefault((host, resource), _Bucket(now))
+            bucket.refill(now)
+            # Responses of concurrent requests can arrive out of order: within
+            # the same window the lowest "remaining" is the freshest value.
+            if reset == bucket.reset and remaining > bucket.remaining:
+                return
+            new_window = reset != bucket.reset
+            window = max(reset - time.time(), 1.0)
+            budget = max(remaining - self._reserve, 0)
+            bucket.reset = reset
+            bucket.remaining = remaining
+            bucket.rate = budget / window
+            bucket.capacity = max(1.0, budget * self._burst_fraction)
+            if new_window or bucket.tokens > bucket.capacity:
+                bucket.tokens = bucket.capacity
+            if budget == 0:
+                hold = min(window, MAX_RATE_LIMIT_WAIT)
+                if now + hold > bucket.blocked_until:
+                    bucket.blocked_until = now + hold
+                    logger.warning(
+                        "  [rate-limit] %s %s budget exhausted (%d remaining). "
+                        "Holding requests for %.0fs%s.",
+                        host,
+                        resource,
+                        remaining,
+                        hold,
+                        " (capped)" if hold < window else "",
+                    )
+
+    def penalize(self, host: str, seconds: float, resource: str = "core") -> None:
+        """Hold every request to *host* for *seconds* (after a 403/429)."""
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.setdefault((host, resource), _Bucket(now))
+            bucket.blocked_until = max(bucket.blocked_until, now + seconds)
+
+
+rate_limiter = RateLimiter()
+
+
+def rate_limit_resource(url: str) -> str:
+    """Return the ``X-RateLimit-Resource`` a request to *url* is metered by.
+
+    Lets :data:`rate_limiter` pick the right bucket before the response
+    (and its headers) arrive.
+    """
+    path = urlparse(url).path
+    if path.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    if path.startswith("/search/"):
+        return "search"
+    return "core"
 
 
 # ---------------------------------------------------------------------------
@@ -177,6 +1099,42 @@ def _get_headers() -> Dict[str, str]:
 HttpResult = Tuple[bytes, Any, int]
 
 
+class ResponseTooLargeError(ValueError):
+    """Raised when a response body exceeds the caller's size cap."""
+
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def _read_body(
+    url: str, resp: Any, max_read_bytes: Optional[int], hasher: Any
+) -> bytes:
+    """Read *resp* in chunks, enforcing *max_read_bytes* and feeding *hasher*.
+
+    Oversize bodies are detected from Content-Length before anything is
+    read, and otherwise as soon as the running total passes the cap.
+    """
+    if max_read_bytes is not None:
+        declared = resp.headers.get("Content-Length")
+        if declared and declared.isdigit() and int(declared) > max_read_bytes:
+            raise ResponseTooLargeError(
+                f"{url}: Content-Length {declared} exceeds {max_read_bytes} bytes"
+            )
+    chunks: List[bytes] = []
+    total = 0
+    while True:
+        chunk = resp.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if max_read_bytes is not None and total > max_read_bytes:
+            raise ResponseTooLargeError(f"{url}: body exceeds {max_read_bytes} bytes")
+        if hasher is not None:
+            hasher.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
 def _parse_retry_after(value: str) -> int:
     """Parse ``Retry-After`` header value (delay-seconds **or** HTTP-date).
 
@@ -204,18 +1162,28 @@ def _http_request(
     max_retries: int = 3,
     backoff: float = 1.0,
     max_read_bytes: Optional[int] = None,
+    data: Optional[bytes] = None,
+    hasher: Any = None,
 ) -> Optional[HttpResult]:
     """Common HTTP GET helper with retries, exponential backoff, and rate-limit handling.
 
     Consolidates the retry / rate-limit / redirect logic previously
     duplicated across ``_api_get``, ``_raw_get``, and ``_cached_get``.
+    Every attempt goes through the shared :data:`rate_limiter`, which is
+    fed the rate-limit headers of each response so requests are paced
+    proactively instead of only after a 403/429, and reuses keep-alive
+    connections from :data:`connection_pool`.
 
     Args:
         url: The URL to fetch.
         headers: HTTP headers to send.  Defaults to :func:`_get_headers`.
         max_retries: Maximum number of attempts (default 3).
         backoff: Base delay in seconds for exponential backoff.
-        max_read_bytes: If set, cap the response body to this many bytes.
+        max_read_bytes: If set, reject bodies larger than this many bytes.
+            The body is streamed in chunks and the download is aborted as
+            soon as the cap is exceeded (or up front, from Content-Length).
+        data: Request body; when given the request is a POST (GraphQL).
+        hasher: Optional ``hashlib`` object fed each chunk as it is read.
 
     Returns:
         ``(body_bytes, response_headers, status_code)`` on success
@@ -223,6 +1191,7 @@ def _http_request(
         ``None`` when the server returns 404.
 
     Raises:
+        ResponseTooLargeError: If the body exceeds *max_read_bytes*.
         urllib.error.HTTPError: For non-retryable HTTP errors after all
             retries are exhausted.
         urllib.error.URLError: For non-retryable network errors after all
@@ -230,23 +1199,42 @@ def _http_request(
     """
     if headers is None:
         headers = _get_headers()
+    host = urlparse(url).hostname or ""
+    resource = rate_limit_resource(url)
+    rate_limit_error: Optional[urllib.error.HTTPError] = None
 
     for attempt in range(1, max_retries + 1):
-        req = urllib.request.Request(url, headers=headers)
+        if attempt > 1:
+            stats.add("retries")
         try:
-            with _opener.open(req, timeout=30) as resp:
-                if max_read_bytes is not None:
-                    body = resp.read(max_read_bytes)
-                else:
-                    body = resp.read()
-                return (body, resp.headers, resp.status)
+            waited = rate_limiter.acquire(host, resource)
+        except RateLimited as exc:
+            # Parked before retrying a 403/429: the scheduler counts it
+            # against the item's park budget and raises it when spent
+            exc.error = rate_limit_error
+            raise
+        if waited:
+            stats.add("rate_limit_sleep_s", waited)
+        stats.add("requests")
+        try:
+            with stats.phase("http"):
+                with _open(url, headers, data=data, timeout=30) as resp:
+                    rate_limiter.update(host, resp.headers, resource)
+                    body = _read_body(url, resp, max_read_bytes, hasher)
+            stats.add("bytes_downloaded", len(body))
+            return (body, resp.headers, resp.status)
         except urllib.error.HTTPError as exc:
+            rate_limiter.update(host, exc.headers, resource)
+
             # 304 Not Modified — used by _cached_get
             if exc.code == 304:
+                stats.add("not_modified")
                 return (b"", exc.headers, 304)
 
             # Rate limiting (403 / 429) with Retry-After or X-RateLimit-Reset
             if exc.code in (403, 429):
+                stats.add("rate_limited")
+                rate_limit_error = exc
                 retry_after = exc.headers.get("Retry-After")
                 reset = exc.headers.get("X-RateLimit-Reset")
                 remaining = exc.headers.get("X-RateLimit-Remaining", "?")
@@ -257,8 +1245,10 @@ def _http_request(
                         wait,
                         remaining,
                     )
+                    # Hold every worker, not just this one; the next
+                    # acquire() performs the actual wait.
+                    rate_limiter.penalize(host, wait, resource)
                     if attempt < max_retries:
-                        time.sleep(wait)
                         continue
                     logger.error(
                         "  [rate-limit] Retry-After present — "
@@ -276,8 +1266,8 @@ def _http_request(
                         remaining,
                         wait,
                     )
+                    rate_limiter.penalize(host, wait + 1, resource)
                     if attempt < max_retries:
-                        time.sleep(wait + 1)
                         continue
                     logger.error(
                         "  [rate-limit] X-RateLimit-Reset present — "
@@ -298,7 +1288,7 @@ def _http_request(
                         max_retries,
                         wait,
                     )
-                    time.sleep(wait)
+                    rate_limiter.penalize(host, wait, resource)
                     continue
                 logger.error(
                     "  [rate-limit] HTTP %d without Retry-After header — "
@@ -310,6 +1300,7 @@ def _http_request(
 
             # 404 — resource not found
             if exc.code == 404:
+                stats.add("not_found")
                 return None
 
             # Retryable error — exponential backoff
@@ -322,11 +1313,13 @@ def _http_request(
                     max_retries,
                     wait,
                 )
+                stats.add("backoff_sleep_s", wait)
                 time.sleep(wait)
                 continue
             raise
 
         except urllib.error.URLError as exc:
+            stats.add("network_errors")
             if attempt < max_retries:
                 wait = min(backoff * (2 ** (attempt - 1)), MAX_BACKOFF_WAIT)
                 logger.debug(
@@ -336,6 +1329,7 @@ def _http_request(
                     exc.reason,
                     wait,
                 )
+                stats.add("backoff_sleep_s", wait)
                 time.sleep(wait)
                 continue
             raise
@@ -348,13 +1342,17 @@ def _api_get(url: str, *, retries: int = 3, backoff: float = 2.0) -> Any:
 
     Handles rate limiting and retries via :func:`_http_request`.
     """
-    result = _http_request(
-        url,
-        headers=_get_headers(),
-        max_retries=retries,
-        backoff=backoff,
-        max_read_bytes=10_485_760,
-    )
+    try:
+        result = _http_request(
+            url,
+            headers=_get_headers(),
+            max_retries=retries,
+            backoff=backoff,
+            max_read_bytes=10_485_760,
+        )
+    except ResponseTooLargeError as exc:
+        logger.error("  [api] %s", exc)
+        return None
     if result is None:
         return None
     body, _headers, _status = result
@@ -369,7 +1367,8 @@ def _raw_get(url: str, *, retries: int = 3, backoff: float = 1.0) -> Optional[st
     """GET raw text content from a URL.
 
     Uses :func:`_http_request` with exponential backoff, rate-limit handling,
-    404 -> None, and a **1 MB download cap**.
+    404 -> None, and a **1 MB download cap** (larger files raise
+    :class:`ResponseTooLargeError` instead of being truncated).
     """
     headers = _get_headers()
     headers["Accept"] = "text/plain"
@@ -378,7 +1377,7 @@ def _raw_get(url: str, *, retries: int = 3, backoff: float = 1.0) -> Optional[st
         headers=headers,
         max_retries=retries,
         backoff=backoff,
-        max_read_bytes=1_048_576,
+        max_read_bytes=_RAW_MAX_BYTES,
     )
     if result is None:
         return None
@@ -420,12 +1419,14 @@ def _cached_get(
         if entry.get("last_modified"):
             headers["If-Modified-Since"] = entry["last_modified"]
 
+    hasher = hashlib.sha256()
     result = _http_request(
         url,
         headers=headers,
         max_retries=retries,
         backoff=backoff,
-        max_read_bytes=1_048_576,
+        max_read_bytes=_RAW_MAX_BYTES,
+        hasher=hasher,
     )
 
     if result is None:
@@ -448,7 +1449,8 @@ def _cached_get(
     last_mod = resp_headers.get("Last-Modified")
     if last_mod:
         new_entry["last_modified"] = last_mod
-    new_entry["sha256"] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    # Hashed while streaming; equal to the sha256 of the decoded content
+    new_entry["sha256"] = hasher.hexdigest()
     cache[agent_name] = new_entry
     return content
 
@@ -471,6 +1473,440 @@ def check_rate_limit() -> Tuple[int, int, int]:
     return (0, 0, 0)
 
 
+# ---------------------------------------------------------------------------
+# GraphQL freshness checks — blob OIDs for many paths in one request
+# ---------------------------------------------------------------------------
+
+
+def fetch_blob_oids(
+    repo: str,
+    branch: str,
+    paths: List[str],
+    *,
+    batch_size: int = GRAPHQL_BATCH_SIZE,
+) -> Optional[Dict[str, Optional[str]]]:
+    """Return the git blob OID of each of *paths* at *branch*.
+
+    Asks the GraphQL API for up to *batch_size* ``object(expression:)``
+    lookups per request, so freshness checks for hundreds of files cost a
+    handful of requests. Paths missing upstream map to None.
+
+    Returns None when no ``GITHUB_TOKEN`` is set (GraphQL requires one) or
+    when any batch fails, so callers fall back to per-file requests.
+    """
+    if not os.environ.get("GITHUB_TOKEN"):
+        logger.debug("  [graphql] No GITHUB_TOKEN — skipping freshness pre-pass")
+        return None
+    owner, _, name = repo.partition("/")
+    headers = _get_headers()
+    headers["Content-Type"] = "application/json"
+
+    oids: Dict[str, Optional[str]] = {}
+    for start in range(0, len(paths), batch_size):
+        batch = paths[start : start + batch_size]
+        params = " ".join(f"$e{i}: String!" for i in range(len(batch)))
+        fields = " ".join(
+            f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ oid }} }}"
+            for i in range(len(batch))
+        )
+        query = (
+            f"query($owner: String!, $name: String!, {params}) "
+            f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+        )
+        variables = {"owner": owner, "name": name}
+        variables.update({f"e{i}": f"{branch}:{p}" for i, p in enumerate(batch)})
+        payload = json.dumps({"query": query, "variables": variables})
+
+        try:
+            result = _http_request(
+                GRAPHQL_API,
+                headers=headers,
+                data=payload.encode("utf-8"),
+                max_read_bytes=10_485_760,
+            )
+            data = json.loads(result[0].decode("utf-8")) if result else None
+        except (urllib.error.URLError, ValueError) as exc:
+            logger.warning("  [graphql] Freshness query failed: %s", exc)
+            return None
+        repository = None
+        if isinstance(data, dict) and isinstance(data.get("data"), dict):
+            repository = data["data"].get("repository")
+        if not isinstance(repository, dict):
+            errors = data.get("errors") if isinstance(data, dict) else None
+            logger.warning("  [graphql] Freshness query failed: %s", errors or data)
+            return None
+        for i, path in enumerate(batch):
+            obj = repository.get(f"f{i}")
+            oids[path] = obj.get("oid") if isinstance(obj, dict) else None
+    return oids
+
+
+# ---------------------------------------------------------------------------
+# Repository tree index — one Git Trees API call instead of a Contents walk
+# ---------------------------------------------------------------------------
+
+# Git modes that are not regular files: symlinks and submodules are never
+# synced (the Contents API reports them as "symlink"/"submodule" types).
+_SKIPPED_TREE_MODES = frozenset({"120000", "160000"})
+
+
+class RepoTree:
+    """In-memory index of a recursive ``git/trees`` listing.
+
+    Entries are exposed in the same shape as the Contents API (``name``,
+    ``path``, ``type`` of ``"file"``/``"dir"``, ``size``, ``sha``) so that
+    discovery code can consume either source unchanged.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], base: str = "") -> None:
+        """Index *entries*; *base* is prepended to paths of a subtree listing."""
+        self._children: Dict[str, List[Dict[str, Any]]] = {}
+        base = base.strip("/")
+        for entry in entries:
+            path = entry.get("path", "")
+            if entry.get("mode") in _SKIPPED_TREE_MODES:
+                continue
+            kind = {"blob": "file", "tree": "dir"}.get(entry.get("type", ""))
+            if not path or kind is None:
+                continue
+            if base:
+                path = f"{base}/{path}"
+            parent, _, name = path.rpartition("/")
+            self._children.setdefault(parent, []).append(
+                {
+                    "name": name,
+                    "path": path,
+                    "type": kind,
+                    "size": entry.get("size", 0),
+                    "sha": entry.get("sha", ""),
+                }
+            )
+
+    def listdir(self, path: str) -> List[Dict[str, Any]]:
+        """Return the direct children of *path* (empty if it does not exist)."""
+        return list(self._children.get(path.strip("/"), []))
+
+    def walk(self, path: str) -> List[Dict[str, Any]]:
+        """Return every file below *path*, each with a ``rel_path`` key."""
+        root = path.strip("/")
+        files: List[Dict[str, Any]] = []
+        pending = [root]
+        while pending:
+            current = pending.pop()
+            for entry in self._children.get(current, []):
+                if entry["type"] == "dir":
+                    pending.append(entry["path"])
+                else:
+                    rel_path = entry["path"][len(root) + 1 :]
+                    files.append({**entry, "rel_path": rel_path})
+        files.sort(key=lambda f: f["rel_path"])
+        return files
+
+
+_repo_trees: Dict[Tuple[str, str], Optional[RepoTree]] = {}
+# Listing requests in progress, awaited by concurrent callers of the same key
+_repo_tree_fetches: Dict[Tuple[str, str], "Future[Optional[RepoTree]]"] = {}
+_repo_trees_lock = threading.Lock()
+
+
+def get_repo_tree(
+    repo: str,
+    branch: str = DEFAULT_BRANCH,
+    *,
+    fetch: Optional[Callable[[str], Any]] = None,
+) -> Optional[RepoTree]:
+    """Return the memoized :class:`RepoTree` for *repo* at *branch*.
+
+    The whole tree is fetched with a single ``git/trees/{branch}?recursive=1``
+    request the first time it is needed; concurrent callers wait for that
+    request instead of sending their own. Returns None when GitHub truncated
+    the listing (also memoized) or the request failed (retried by the next
+    call), in which case callers fall back to walking the Contents API.
+
+    *fetch* defaults to :func:`_api_get`; scripts pass their own reference so
+    tests patching it keep intercepting the request.
+    """
+    key = (repo, branch)
+    while True:
+        with _repo_trees_lock:
+            if key in _repo_trees:
+                return _repo_trees[key]
+            pending = _repo_tree_fetches.get(key)
+            if pending is None:
+                pending = _repo_tree_fetches[key] = Future()
+                break
+        if pending.result() is not None:
+            return pending.result()
+        # Truncated (now memoized) or failed: look again, fetching if needed
+
+    # Fetch outside the lock, so other repositories and branches go ahead
+    tree, final = None, False
+    try:
+        tree, final = _fetch_tree(repo, branch, fetch=fetch)
+    finally:
+        with _repo_trees_lock:
+            if final:
+                _repo_trees[key] = tree
+            del _repo_tree_fetches[key]
+        pending.set_result(tree)
+    return tree
+
+
+def get_subtree(
+    repo: str,
+    branch: str,
+    path: str,
+    *,
+    fetch: Optional[Callable[[str], Any]] = None,
+) -> Optional[RepoTree]:
+    """Return a :class:`RepoTree` holding only the directory *path*.
+
+    Lists the directory recursively with one ``git/trees/{branch}:{path}``
+    request, for when the repository-wide listing is unavailable or
+    truncated. Entries keep their full repository paths. Not memoized.
+    """
+    return _fetch_tree(repo, branch, path.strip("/"), fetch=fetch)[0]
+
+
+@stats.timed("discovery.tree")
+def _fetch_tree(
+    repo: str,
+    branch: str,
+    path: str = "",
+    *,
+    fetch: Optional[Callable[[str], Any]] = None,
+) -> Tuple[Optional[RepoTree], bool]:
+    """Fetch a recursive tree listing.
+
+    Returns ``(tree, final)``: *tree* is None if the request failed or the
+    listing was truncated, and *final* is False only for a failed request,
+    which is worth retrying later.
+    """
+    treeish = f"{branch}:{path}" if path else branch
+    data = (fetch or _api_get)(
+        f"{GITHUB_API}/repos/{repo}/git/trees/{treeish}?recursive=1"
+    )
+    if not isinstance(data, dict) or not isinstance(data.get("tree"), list):
+        logger.debug("  [tree] No tree listing for %s@%s", repo, treeish)
+        return None, False
+    if data.get("truncated"):
+        logger.info(
+            "  [tree] Tree listing for %s@%s is truncated, "
+            "falling back to the Contents API",
+            repo,
+            treeish,
+        )
+        return None, True
+    return RepoTree(data["tree"], base=path), True
+
+
+def clear_repo_tree_cache() -> None:
+    """Forget every memoized :class:`RepoTree`."""
+    with _repo_trees_lock:
+        _repo_trees.clear()
+
+
+def prime_repo_tree(repo: str, branch: str, tree: RepoTree) -> None:
+    """Memoize *tree* for *repo* at *branch* (e.g. built from an archive)."""
+    with _repo_trees_lock:
+        _repo_trees[(repo, branch)] = tree
+
+
+# ---------------------------------------------------------------------------
+# Bulk archive download — one tarball instead of one request per file
+# ---------------------------------------------------------------------------
+
+
+class ArchiveError(Exception):
+    """Raised when the repository archive cannot be downloaded or unpacked."""
+
+
+class RepoArchive:
+    """Selected members of a repository tarball, unpacked to a temp directory.
+
+    ``root`` mirrors the repository layout (``root / "cli-tool/..."``) and
+    ``tree`` indexes it as a :class:`RepoTree`, with real git blob SHAs.
+    The directory is removed by :meth:`close` or when the object is
+    garbage-collected.
+    """
+
+    def __init__(self) -> None:
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="opencode-sync-")
+        self.root = Path(self._tmpdir.name)
+        self.tree = RepoTree([])
+
+    def read_text(self, path: str) -> Optional[str]:
+        """Return the text of repository file *path*, or None if absent.
+
+        Applies the same 1 MB cap as :func:`_raw_get`.
+        """
+        file_path = self.root / path
+        try:
+            validate_output_path(file_path, self.root)
+        except ValueError:
+            return None
+        if file_path.is_symlink() or not file_path.is_file():
+            return None
+        if file_path.stat().st_size > _RAW_MAX_BYTES:
+            logger.warning("  [bulk] %s exceeds the 1 MB cap, skipping", path)
+            return None
+        return file_path.read_text(encoding="utf-8")
+
+    def close(self) -> None:
+        self._tmpdir.cleanup()
+
+    def __enter__(self) -> "RepoArchive":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _git_blob_sha(data: bytes) -> str:
+    """Return the git blob SHA-1 of *data* (as listed by the Trees API)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _archive_member_path(name: str, prefixes: Tuple[str, ...]) -> Optional[str]:
+    """Map a tarball member to its repository path, or None to skip it.
+
+    GitHub archives wrap everything in a single ``{repo}-{ref}/`` directory,
+    which is stripped. Absolute paths and ``..`` components are rejected.
+    """
+    _top, _, path = name.partition("/")
+    parts = path.split("/")
+    if not path or name.startswith("/") or ".." in parts or "" in parts[:-1]:
+        return None
+    if not any(path == p or path.startswith(p + "/") for p in prefixes):
+        return None
+    return path.rstrip("/")
+
+
+def _download_to_file(url: str, dest: Any, max_bytes: int) -> int:
+    """Stream *url* into the open binary file *dest*; return the byte count."""
+    host = urlparse(url).hostname or ""
+    headers = _get_headers()
+    headers["Accept"] = "application/octet-stream"
+    waited = rate_limiter.acquire(host)
+    if waited:
+        stats.add("rate_limit_sleep_s", waited)
+    stats.add("requests")
+    try:
+        with _open(url, headers, timeout=60) as resp:
+            rate_limiter.update(host, resp.headers)
+            declared = resp.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ArchiveError(
+                    f"archive is {declared} bytes, over the {max_bytes} byte cap"
+                )
+            total = 0
+            while True:
+                chunk = resp.read(_ARCHIVE_CHUNK_SIZE)
+                if not chunk:
+                    stats.add("bytes_downloaded", total)
+                    return total
+                total += len(chunk)
+                if total > max_bytes:
+                    raise ArchiveError(f"archive exceeds the {max_bytes} byte cap")
+                dest.write(chunk)
+    except (urllib.error.URLError, OSError, http.client.HTTPException) as exc:
+        raise ArchiveError(f"download of {url} failed: {exc}") from exc
+
+
+def _extract_archive(
+    fileobj: Any,
+    archive: RepoArchive,
+    prefixes: Tuple[str, ...],
+    max_bytes: int,
+) -> None:
+    """Unpack the regular files under *prefixes* of a gzipped tarball.
+
+    Members are written below ``archive.root`` and indexed in ``archive.tree``.
+
+    Symlinks, hard links, devices and paths escaping the root are skipped,
+    mirroring :func:`validate_output_path` and the skills symlink checks.
+    """
+    entries: List[Dict[str, Any]] = []
+    dirs = set()
+    extracted = 0
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r:gz") as tar:
+            for member in tar:
+                path = _archive_member_path(member.name, prefixes)
+                if path is None or member.isdir():
+                    continue
+                if not member.isfile():
+                    logger.warning(
+                        "  [SECURITY] Skipping non-regular archive member: %s", path
+                    )
+                    continue
+                target = archive.root / path
+                try:
+                    validate_output_path(target, archive.root)
+                except ValueError:
+                    logger.warning("  [SECURITY] Skipping unsafe member: %s", path)
+                    continue
+                extracted += member.size
+                if extracted > max_bytes:
+                    raise ArchiveError(
+                        f"extracted size exceeds the {max_bytes} byte cap"
+                    )
+                source = tar.extractfile(member)
+                if source is None:
+                    continue
+                data = source.read()
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+
+                entries.append(
+                    {
+                        "path": path,
+                        "type": "blob",
+                        "size": len(data),
+                        "sha": _git_blob_sha(data),
+                    }
+                )
+                parent = path.rpartition("/")[0]
+                while parent and parent not in dirs:
+                    dirs.add(parent)
+                    parent = parent.rpartition("/")[0]
+    except (tarfile.TarError, EOFError, zlib.error) as exc:
+        raise ArchiveError(f"invalid archive: {exc}") from exc
+
+    tree_entries = [{"path": d, "type": "tree"} for d in sorted(dirs)]
+    archive.tree = RepoTree(tree_entries + entries)
+
+
+@stats.timed("archive")
+def download_repo_archive(
+    repo: str,
+    branch: str = DEFAULT_BRANCH,
+    *,
+    prefixes: Tuple[str, ...],
+    max_bytes: int = ARCHIVE_MAX_BYTES,
+) -> RepoArchive:
+    """Download the *repo* tarball once and unpack the members under *prefixes*.
+
+    The archive is streamed to a temporary file (never held in memory) and
+    both its compressed and extracted sizes are capped at *max_bytes*.
+
+    Raises:
+        ArchiveError: On download failure, oversize archive or corrupt data.
+    """
+    url = f"{CODELOAD_BASE}/{repo}/tar.gz/{branch}"
+    archive = RepoArchive()
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            size = _download_to_file(url, tmp, max_bytes)
+            logger.debug("  [bulk] Downloaded %s (%d bytes)", url, size)
+            tmp.seek(0)
+            _extract_archive(tmp, archive, prefixes, max_bytes)
+    except BaseException:
+        archive.close()
+        raise
+    return archive
+
+
 # ---------------------------------------------------------------------------
 # Sync cache helpers
 # ---------------------------------------------------------------------------
@@ -499,10 +1935,16 @@ def _load_sync_cache(
 def _save_sync_cache(
     output_dir: Path, cache: Dict[str, Any], cache_filename: str = SYNC_CACHE_FILENAME
 ) -> None:
-    """Persist the sync cache to disk."""
+    """Persist the sync cache to disk.
+
+    Keys are sorted so the file is byte-identical whatever order concurrent
+    workers filled the cache in.
+    """
     cache_path = output_dir / cache_filename
     cache_path.parent.mkdir(parents=True, exist_ok=True)
-    cache_data = json.dumps(cache, indent=2, ensure_ascii=False) + "\n"
+    cache_data = (
+        json.dumps(cache, indent=2, ensure_ascii=False, sort_keys=True) + "\n"
+    )
     tmp_fd, tmp_path = tempfile.mkstemp(
         dir=str(cache_path.parent), suffix=".tmp", prefix=".sync-cache-"
     )
@@ -540,63 +1982,811 @@ def _remove_sync_cache(
     return False
 
 
+def sync_journal_filename(script: str) -> str:
+    """Name of the checkpoint journal of *script* (e.g. ``"sync-agents"``)."""
+    return SYNC_JOURNAL_FILENAME.format(script=script)
+
+
+class SyncJournalMismatch(Exception):
+    """Raised when ``--resume`` finds a journal written by a different run."""
+
+
+class SyncJournal:
+    """Write-ahead checkpoint of the items a sync run has completed.
+
+    One JSON object per line: a header describing the run (script, source
+    and the options that select or shape items), then one record per
+    completed item carrying its manifest entry and its cache deltas, so an
+    interrupted run (rate-limit exhaustion, CI timeout, Ctrl-C) can be
+    resumed with ``--resume`` without redoing finished items. Lines are
+    flushed as they are written; a truncated last line is ignored. The
+    journal is deleted once a run completes.
+    """
+
+    def __init__(self, path: Path, header: Dict[str, Any]) -> None:
+        self.path = Path(path)
+        self.header = dict(header, journal=1)
+        self._fh: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return completed records as ``{kind: {name: record}}``.
+
+        Empty when there is no journal. Raises :class:`SyncJournalMismatch`
+        when it belongs to a different run (other script, source or
+        options), which must not be resumed nor overwritten unasked.
+        """
+        done: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except (OSError, UnicodeDecodeError):
+            return done
+        records = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+        if not records:
+            return done
+        if records[0] != self.header:
+            recorded = records[0]
+            changed = sorted(
+                key
+                for key in set(recorded) | set(self.header)
+                if recorded.get(key) != self.header.get(key)
+            )
+            raise SyncJournalMismatch(
+                f"{self.path} is from another run ("
+                + ", ".join(
+                    f"{key}: {recorded.get(key)!r} != {self.header.get(key)!r}"
+                    for key in changed
+                )
+                + ")"
+            )
+        for record in records[1:]:
+            kind, name = record.get("kind"), record.get("name")
+            if isinstance(kind, str) and isinstance(name, str):
+                done.setdefault(kind, {})[name] = record
+        return done
+
+    def open(self, *, resume: bool = False) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Start journaling; with *resume*, keep and return earlier records.
+
+        Raises :class:`SyncJournalMismatch` (leaving the journal untouched)
+        when resuming a journal of a different run.
+        """
+        done = self.load() if resume else {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if done:
+            truncated = not self.path.read_bytes().endswith(b"\n")
+            self._fh = open(self.path, "a", encoding="utf-8")
+            if truncated:
+                # Terminate the line a crash cut short before appending
+                self._fh.write("\n")
+        else:
+            self._fh = open(self.path, "w", encoding="utf-8")
+            self._write(self.header)
+        return done
+
+    def record(self, kind: str, name: str, **data: Any) -> None:
+        """Append the completion record of item *name* of type *kind*."""
+        self._write({"kind": kind, "name": name, **data})
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n"
+        with self._lock:
+            if self._fh is not None:
+                self._fh.write(line)
+                self._fh.flush()
+
+    def close(self, *, completed: bool) -> None:
+        """Stop journaling; a completed run no longer needs its journal."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+        if completed:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def add_resume_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the ``--resume`` option shared by the sync CLIs."""
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Continue an interrupted run from its "
+            f"{sync_journal_filename('<script>')} checkpoint, skipping the items "
+            "it already completed (refused if other options were used)"
+        ),
+    )
+
+
 # ---------------------------------------------------------------------------
-# Frontmatter parser
+# Asyncio sync core — bounded concurrency shared by both sync scripts
 # ---------------------------------------------------------------------------
 
+# Called with (item, result, error) for every item passed to sync_items()
+ResultCallback = Callable[[Any, Any, Optional[BaseException]], None]
 
-def parse_frontmatter(content: str) -> Tuple[Dict[str, str], str]:
+
+def _deferrable(func: Callable[..., Any], *args: Any) -> Any:
+    """Call *func* in the worker thread with long rate-limit waits deferred."""
+    with rate_limiter.deferring():
+        return func(*args)
+
+
+class _Deferrals:
+    """Book-keeping of the items parked by one scheduler, with an ETA.
+
+    An item whose host is rate-limited is parked in a delayed queue (an
+    asyncio timer) instead of holding a thread while it sleeps; the ETA is
+    the longest pending wait plus the remaining items at the pace observed
+    so far.
     """
-    Parse YAML-like frontmatter from markdown content.
 
-    Returns (metadata_dict, body) where body is the markdown after the
-    closing '---'. The parser handles the simple key-value YAML used
-    in the source repo (no nested structures, just string values).
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self.parked = 0
+        self._started = time.monotonic()
+        self._announced_until = 0.0
+        self._failures: Dict[Any, int] = {}
+
+    def park(self, exc: RateLimited, key: Any) -> bool:
+        """Record one parked item and report the ETA when the wait grows.
+
+        Returns False without parking once the item identified by *key* has
+        been parked :data:`RATE_LIMIT_MAX_PARKS` times after a 403/429 of
+        its own (``exc.error``); the caller then fails it with that error.
+        """
+        if exc.error is not None:
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if failures >= RATE_LIMIT_MAX_PARKS:
+                return False
+        self.parked += 1
+        stats.add("deferred")
+        now = time.monotonic()
+        if now + exc.wait <= self._announced_until:
+            return True
+        self._announced_until = now + exc.wait
+        eta = exc.wait
+        if self.done:
+            eta += (self.total - self.done) * (now - self._started) / self.done
+        logger.info(
+            "  [rate-limit] %s: parking work for %.0fs, other items continue "
+            "(%d/%d done, ETA ~%.0fs)",
+            exc.host,
+            exc.wait,
+            self.done,
+            self.total,
+            eta,
+        )
+        return True
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write *text* to *path* atomically (temp file in the same dir + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_fd, tmp_path = tempfile.mkstemp(
+        dir=str(path.parent), suffix=".tmp", prefix=".sync-"
+    )
+    try:
+        with os.fdopen(tmp_fd, "w", encoding="utf-8") as tmp:
+            tmp.write(text)
+        os.replace(tmp_path, str(path))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Binary counterpart of :func:`atomic_write_text`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_fd, tmp_path = tempfile.mkstemp(
+        dir=str(path.parent), suffix=".tmp", prefix=".sync-"
+    )
+    try:
+        with os.fdopen(tmp_fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, str(path))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """copytree() copy function: hard-link *src* when possible, else copy."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether process *pid* exists (assumed so where it cannot be probed)."""
+    if os.name == "nt":
+        # os.kill() would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # e.g. EPERM: alive, owned by another user
+    return True
+
+
+def _fsync_path(path: Path, *, directory: bool = False) -> None:
+    """Flush *path* to disk; a no-op where directories cannot be opened."""
+    flags = os.O_RDONLY | (getattr(os, "O_DIRECTORY", 0) if directory else 0)
+    try:
+        fd = os.open(str(path), flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class StagedDirectory:
+    """Build a new version of a directory beside it and swap it in at once.
+
+    The staging directory starts as a hard-linked copy of *target* (when
+    *seed* is True) or empty, with :meth:`keep` carrying over single files
+    of *target*. Files are written into it directly, without the
+    per-file temp file + rename of :func:`atomic_write_text`, since nothing
+    reads the staging directory; existing links are unlinked first so the
+    live version is never written through. :meth:`commit` fsyncs the
+    written files and their directories in one batch, then renames the old
+    version aside and the staging directory into place, restoring the old
+    version if the second rename fails. Leaving the ``with`` block without
+    committing discards the staging directory and leaves *target* as it was.
+
+    Leftovers of an interrupted run are cleaned up on entry, and a previous
+    version that was moved aside but never replaced is put back. Staging
+    directories of another live sync process are left alone unless older
+    than :data:`STAGING_STALE_AFTER`.
     """
-    content = content.strip()
-    if not content.startswith("---"):
-        return {}, content
 
-    # Find closing ---
-    end_idx = content.find("\n---", 3)
-    if end_idx == -1:
-        return {}, content
+    def __init__(self, target: Path, *, seed: bool = True) -> None:
+        self.target = Path(target)
+        self.path = self.target.with_name(f".{self.target.name}.staging-{os.getpid()}")
+        self._backup = self.path.with_name(self.path.name + ".old")
+        self._seed = seed
+        self._written: List[Path] = []
+        self._lock = threading.Lock()
+        self.committed = False
+
+    def __enter__(self) -> "StagedDirectory":
+        self.recover(self.target)
+        if self._seed and self.target.is_dir():
+            shutil.copytree(
+                self.target, self.path, symlinks=True, copy_function=_link_or_copy
+            )
+        else:
+            self.path.mkdir(parents=True)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    @staticmethod
+    def recover(target: Path) -> None:
+        """Remove staging leftovers of *target*, restoring a moved-aside copy.
+
+        Only leftovers whose owner (the PID in their name) is this process
+        or no longer running, or that are older than
+        :data:`STAGING_STALE_AFTER`, are touched.
+        """
+        prefix = f".{target.name}.staging-"
+        now = time.time()
+        leftovers = sorted(target.parent.glob(prefix + "*"))
+        for leftover in leftovers:
+            pid = leftover.name[len(prefix) :]
+            pid = pid[:-4] if pid.endswith(".old") else pid
+            if not pid.isdigit():
+                continue
+            if int(pid) != os.getpid() and _pid_alive(int(pid)):
+                try:
+                    age = now - leftover.lstat().st_mtime
+                except OSError:
+                    continue
+                if age < STAGING_STALE_AFTER:
+                    continue
+            if leftover.name.endswith(".old") and not target.exists():
+                logger.warning("  [recover] %s: restoring previous version", target)
+                os.rename(leftover, target)
+            else:
+                shutil.rmtree(leftover, ignore_errors=True)
+
+    def keep(self, relative: str) -> bool:
+        """Hard-link (or copy) file *relative* of *target* into the stage.
+
+        Returns False when *target* holds no regular file there.
+        """
+        source = self.target / relative
+        path = self.path / relative
+        validate_output_path(path, self.path)
+        if source.is_symlink() or not source.is_file():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _link_or_copy(str(source), str(path))
+        return True
+
+    def write_text(self, path: Path, text: str) -> None:
+        """Write *text* to *path*, a location inside :attr:`path`."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A seeded file is a hard link into the live version
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text)
+        with self._lock:
+            self._written.append(path)
+
+    def commit(self) -> None:
+        """Flush the staged files and swap the staging directory into place."""
+        with self._lock:
+            written = list(self._written)
+        for path in written:
+            _fsync_path(path)
+        for directory in sorted({p.parent for p in written} | {self.path}):
+            _fsync_path(directory, directory=True)
+
+        if self.target.exists():
+            os.rename(self.target, self._backup)
+        try:
+            os.rename(self.path, self.target)
+        except OSError:
+            if self._backup.exists():
+                os.rename(self._backup, self.target)
+            raise
+        _fsync_path(self.target.parent, directory=True)
+        self.committed = True
+        shutil.rmtree(self._backup, ignore_errors=True)
+
+
+async def sync_items(
+    items: Iterable[Any],
+    worker: Callable[[Any], Any],
+    on_result: ResultCallback,
+    *,
+    limit: asyncio.Semaphore,
+    executor: Optional[Executor] = None,
+) -> None:
+    """Run the blocking *worker* over *items*, at most *limit* at a time.
+
+    Each call runs on *executor*, so the blocking HTTP helpers are reused
+    as-is. *on_result* receives ``(item, result, error)`` on the event loop
+    thread in **input order**, whatever the completion order, so counters,
+    caches and manifests are updated deterministically. Exceptions raised
+    by *worker* are passed as *error* (``result`` is then None).
+
+    Several calls may share one semaphore and executor inside a single
+    event loop, e.g. to sync agents and skills under one budget.
+
+    Rate-limit waits longer than :data:`RATE_LIMIT_DEFER_THRESHOLD` do not
+    block: the item releases its slot, is parked until its host may be
+    used again and is then retried from the start, while other items run.
+    An item that keeps hitting 403/429 fails with that error once it has
+    been parked :data:`RATE_LIMIT_MAX_PARKS` times for it.
+
+    When cancelled (Ctrl-C), items not yet started are dropped, but the
+    worker calls already running still complete in their thread: their
+    results are awaited and passed to *on_result*, in input order, before
+    the cancellation propagates.
+    """
+    loop = asyncio.get_running_loop()
+    items = list(items)
+    deferrals = _Deferrals(len(items))
+    # Latest worker call of each item, shielded from task cancellation
+    calls: Dict[int, "asyncio.Future[Any]"] = {}
+
+    async def _run(index: int, item: Any) -> Any:
+        while True:
+            async with limit:
+                call = loop.run_in_executor(executor, _deferrable, worker, item)
+                calls[index] = call
+                try:
+                    return await asyncio.shield(call)
+                except RateLimited as exc:
+                    if not deferrals.park(exc, index):
+                        raise exc.error from None
+                    wait = exc.wait
+            await asyncio.sleep(wait)
+            deferrals.parked -= 1
+
+    tasks = [asyncio.ensure_future(_run(i, item)) for i, item in enumerate(items)]
+    try:
+        for item, task in zip(items, tasks):
+            try:
+                # Shielded: on cancellation every task is cancelled at once
+                # below, before a freed slot can start another item
+                result, error = await asyncio.shield(task), None
+            except Exception as exc:
+                result, error = None, exc
+            on_result(item, result, error)
+            deferrals.done += 1
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        # Pending items never start; report the ones that completed or were
+        # running, whose files are on disk, so the caller's cache matches
+        for index in range(deferrals.done, len(items)):
+            task = tasks[index]
+            if task.done() and not task.cancelled():
+                outcome: "asyncio.Future[Any]" = task
+            elif index in calls:
+                outcome = calls[index]
+            else:
+                continue
+            try:
+                result, error = await outcome, None
+            except RateLimited:
+                continue  # parked, never completed
+            except Exception as exc:
+                result, error = None, exc
+            on_result(items[index], result, error)
+        raise
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_sync(
+    items: Iterable[Any],
+    worker: Callable[[Any], Any],
+    on_result: ResultCallback,
+    *,
+    jobs: int = 1,
+) -> bool:
+    """Drive :func:`sync_items` with *jobs* workers on a fresh event loop.
+
+    Returns False when interrupted with Ctrl-C. Items not yet started are
+    cancelled while in-flight ones are allowed to finish and still reach
+    *on_result*, so files on disk and the in-memory cache stay consistent
+    and the caller can still save the cache before exiting.
+    """
+    return run_sync_groups([(items, worker, on_result)], jobs=jobs)
+
+
+def run_sync_groups(
+    groups: Iterable[Tuple[Iterable[Any], Callable[[Any], Any], ResultCallback]],
+    *,
+    jobs: int = 1,
+) -> bool:
+    """Run several ``(items, worker, on_result)`` groups concurrently.
+
+    All groups share one event loop, one *jobs*-wide semaphore and one
+    thread pool, so e.g. agent and skill syncs draw on a single budget.
+    Results are still delivered in input order within each group. Same
+    Ctrl-C semantics as :func:`run_sync`.
+    """
+    jobs = max(1, jobs)
+    groups = list(groups)
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="sync")
+
+    async def _main() -> None:
+        limit = asyncio.Semaphore(jobs)
+        await asyncio.gather(
+            *(
+                sync_items(items, worker, on_result, limit=limit, executor=executor)
+                for items, worker, on_result in groups
+            )
+        )
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        logger.warning("Interrupted — waiting for in-flight items to finish...")
+        return False
+    finally:
+        executor.shutdown(wait=True)
+    return True
+
+
+class StageResult:
+    """Final result returned by a pipeline stage to skip the later stages.
+
+    E.g. a fetch stage that finds an agent unchanged upstream returns
+    ``StageResult(entry)`` so the transform and writer stages never see it.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+class PipelineInterrupted(Exception):
+    """Error reported for an item that Ctrl-C caught between pipeline stages.
+
+    Its earlier stages ran but the later ones never will, so the caller
+    must not count or record it as done.
+    """
+
+
+# Queue sentinel telling a stage worker to exit
+_STAGE_STOP = object()
+
+
+async def pipeline_items(
+    items: Iterable[Any],
+    stages: List[Callable[[Any, Any], Any]],
+    on_result: ResultCallback,
+    *,
+    workers: List[int],
+    executor: Optional[Executor] = None,
+    queue_size: int = 8,
+) -> None:
+    """Stream *items* through blocking *stages* connected by bounded queues.
+
+    Each stage is called as ``stage(item, value)`` on *executor*, where
+    *value* is the previous stage's return value (``None`` for the first
+    stage); ``workers[k]`` copies of stage *k* run concurrently. The first
+    stage's output feeds the second as soon as it is ready, so while one
+    item is transformed or written the next ones are already downloading.
+    Queues hold at most *queue_size* items, so a slow stage throttles the
+    ones before it instead of buffering the whole run in memory.
+
+    A stage ends an item early by returning :class:`StageResult`; an
+    exception ends it with that error. *on_result* is called exactly as
+    in :func:`sync_items`, in input order.
+
+    A stage call that would wait longer than
+    :data:`RATE_LIMIT_DEFER_THRESHOLD` on the rate limiter is parked in a
+    delayed queue and re-queued once its host may be used again; the
+    worker meanwhile moves on, so items already downloaded keep being
+    transformed and written. As in :func:`sync_items`, repeated 403/429
+    eventually fail the item instead of parking it forever.
+
+    On cancellation, items that never started are dropped. Running stage
+    calls are awaited, then every finished item is reported as usual and
+    every item caught between stages with :class:`PipelineInterrupted`.
+    """
+    loop = asyncio.get_running_loop()
+    items = list(items)
+    results = [loop.create_future() for _ in items]
+    # Latest stage call of each item and its stage, shielded from cancellation
+    calls: Dict[int, Tuple[int, "asyncio.Future[Any]"]] = {}
+    queues: List["asyncio.Queue[Any]"] = [asyncio.Queue()]
+    queues.extend(asyncio.Queue(maxsize=queue_size) for _ in stages[1:])
+    deferrals = _Deferrals(len(items))
+    # Per stage: parked jobs, and an event set whenever none are parked
+    parked = [0] * len(stages)
+    unparked = [asyncio.Event() for _ in stages]
+    for event in unparked:
+        event.set()
+    timers: List["asyncio.Future[None]"] = []
+
+    def _finish(index: int, value: Any, error: Optional[BaseException]) -> None:
+        if not results[index].done():
+            results[index].set_result((value, error))
+
+    async def _requeue(k: int, job: Tuple[int, Any], wait: float) -> None:
+        await asyncio.sleep(wait)
+        await queues[k].put(job)
+        parked[k] -= 1
+        deferrals.parked -= 1
+        if not parked[k]:
+            unparked[k].set()
+
+    async def _worker(k: int) -> None:
+        while True:
+            job = await queues[k].get()
+            if job is _STAGE_STOP:
+                if not parked[k]:
+                    return
+                # Parked jobs go back on the queue ahead of this sentinel
+                await unparked[k].wait()
+                await queues[k].put(_STAGE_STOP)
+                continue
+            index, value = job
+            call = loop.run_in_executor(
+                executor, _deferrable, stages[k], items[index], value
+            )
+            calls[index] = (k, call)
+            try:
+                value = await asyncio.shield(call)
+            except RateLimited as exc:
+                if not deferrals.park(exc, (k, index)):
+                    _finish(index, None, exc.error)
+                    continue
+                parked[k] += 1
+                unparked[k].clear()
+                timers.append(asyncio.ensure_future(_requeue(k, job, exc.wait)))
+                continue
+            except Exception as exc:
+                _finish(index, None, exc)
+                continue
+            if isinstance(value, StageResult):
+                _finish(index, value.value, None)
+            elif k + 1 < len(stages):
+                await queues[k + 1].put((index, value))
+            else:
+                _finish(index, value, None)
 
-    frontmatter_raw = content[3:end_idx].strip()
-    body = content[end_idx + 4 :].strip()
+    async def _stage(k: int) -> None:
+        await asyncio.gather(*(_worker(k) for _ in range(workers[k])))
+        if k + 1 < len(stages):
+            for _ in range(workers[k + 1]):
+                await queues[k + 1].put(_STAGE_STOP)
+
+    for index in range(len(items)):
+        queues[0].put_nowait((index, None))
+    for _ in range(workers[0]):
+        queues[0].put_nowait(_STAGE_STOP)
+
+    tasks = [asyncio.ensure_future(_stage(k)) for k in range(len(stages))]
+    try:
+        for item, future in zip(items, results):
+            value, error = await asyncio.shield(future)
+            on_result(item, value, error)
+            deferrals.done += 1
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        for task in tasks + timers:
+            task.cancel()
+        for index in range(deferrals.done, len(items)):
+            if results[index].done():
+                value, error = results[index].result()
+            elif index in calls:
+                k, call = calls[index]
+                try:
+                    value, error = await call, None
+                except RateLimited:
+                    if not k:
+                        continue  # parked before its first stage ran
+                    value, error = None, PipelineInterrupted(
+                        f"interrupted before stage {k + 1} of {len(stages)}"
+                    )
+                except Exception as exc:
+                    value, error = None, exc
+                else:
+                    if isinstance(value, StageResult):
+                        value = value.value
+                    elif k + 1 < len(stages):
+                        value, error = None, PipelineInterrupted(
+                            f"interrupted before stage {k + 2} of {len(stages)}"
+                        )
+            else:
+                continue
+            on_result(items[index], value, error)
+        raise
+    finally:
+        for task in tasks + timers:
+            task.cancel()
 
-    meta: Dict[str, str] = {}
-    current_key: Optional[str] = None
-    current_value_lines: List[str] = []
 
-    for line in frontmatter_raw.split("\n"):
-        # Check if this is a new key: value pair
-        match = re.match(r"^(\w[\w-]*)\s*:\s*(.*)", line)
+def run_pipeline(
+    items: Iterable[Any],
+    stages: List[Callable[[Any, Any], Any]],
+    on_result: ResultCallback,
+    *,
+    workers: List[int],
+    queue_size: int = 8,
+) -> bool:
+    """Drive :func:`pipeline_items` on a fresh event loop.
+
+    One thread is allotted per stage worker. Same Ctrl-C semantics as
+    :func:`run_sync`: returns False when interrupted, after letting
+    in-flight stage calls finish.
+    """
+    workers = [max(1, n) for n in workers]
+    executor = ThreadPoolExecutor(
+        max_workers=sum(workers), thread_name_prefix="sync-stage"
+    )
+
+    try:
+        asyncio.run(
+            pipeline_items(
+                items,
+                stages,
+                on_result,
+                workers=workers,
+                executor=executor,
+                queue_size=queue_size,
+            )
+        )
+    except KeyboardInterrupt:
+        logger.warning("Interrupted — waiting for in-flight items to finish...")
+        return False
+    finally:
+        executor.shutdown(wait=True)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Frontmatter parser
+# ---------------------------------------------------------------------------
+
+
+class FrontmatterScan(NamedTuple):
+    """Both views of a document's frontmatter, from one pass over it.
+
+    ``flat`` is the :func:`parse_frontmatter` view (key → string) and
+    ``nested`` the :func:`parse_nested_frontmatter` one (dicts and typed
+    scalars).
+    """
+
+    flat: Dict[str, str]
+    nested: Dict[str, Any]
+    body: str
+
+
+_RE_FRONTMATTER_KEY = re.compile(r"(\w[\w-]*)\s*:\s*(.*)")
+_RE_FRONTMATTER_SUBKEY = re.compile(r'(["\']?[^:]+["\']?)\s*:\s*(.*)')
+
+
+@functools.lru_cache(maxsize=256)
+def scan_frontmatter(content: str) -> FrontmatterScan:
+    """Split *content* into frontmatter views and body in a single scan.
+
+    Top-level ``key:`` lines are located once; the lines between two keys
+    feed both the flat value (continuation lines) and the nested one
+    (folded scalar or sub-keys). Results are memoized on the content, so
+    the validators and the scorer share one parse per document — treat
+    the returned dicts as read-only.
+    """
+    stripped = content.strip()
+    end_idx = stripped.find("\n---", 3) if stripped.startswith("---") else -1
+    if end_idx == -1:
+        return FrontmatterScan({}, {}, stripped)
+
+    body = stripped[end_idx + 4 :].strip()
+
+    lines = stripped[3:end_idx].strip().split("\n")
+    heads = []
+    for idx, line in enumerate(lines):
+        match = _RE_FRONTMATTER_KEY.match(line)
         if match:
-            # Save previous key if any
-            if current_key is not None:
-                meta[current_key] = "\n".join(current_value_lines).strip()
-            current_key = match.group(1)
-            current_value_lines = [match.group(2)]
-        else:
-            # Continuation line
-            if current_key is not None:
-                current_value_lines.append(line)
-
-    # Save last key
-    if current_key is not None:
-        meta[current_key] = "\n".join(current_value_lines).strip()
-
-    # Clean up quoted values
-    for key in meta:
-        val = meta[key]
-        if val.startswith('"') and val.endswith('"'):
+            heads.append((idx, match.group(1), match.group(2)))
+
+    flat: Dict[str, str] = {}
+    nested: Dict[str, Any] = {}
+    for pos, (idx, key, value) in enumerate(heads):
+        stop = heads[pos + 1][0] if pos + 1 < len(heads) else len(lines)
+        block = lines[idx + 1 : stop]
+
+        text = "\n".join([value, *block]).strip()
+        if text.startswith('"') and text.endswith('"'):
             # Handle escaped sequences in the quoted string
-            val = val[1:-1]
-            val = val.replace('\\"', '"').replace("\\n", "\n")
-            meta[key] = val
+            text = text[1:-1].replace('\\"', '"').replace("\\n", "\n")
+        flat[key] = text
+        nested[key] = _parse_nested_value(value.strip(), block)
+
+    return FrontmatterScan(flat, nested, body)
 
-    return meta, body
+
+def parse_frontmatter(content: str) -> Tuple[Dict[str, str], str]:
+    """
+    Parse YAML-like frontmatter from markdown content.
+
+    Returns (metadata_dict, body) where body is the markdown after the
+    closing '---'. The parser handles the simple key-value YAML used
+    in the source repo (no nested structures, just string values).
+    """
+    scan = scan_frontmatter(content)
+    return dict(scan.flat), scan.body
 
 
 # ---------------------------------------------------------------------------
@@ -737,6 +2927,71 @@ def _parse_yaml_value(val: str) -> Union[str, int, bool]:
     return stripped
 
 
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _parse_nested_value(value: str, block: List[str]) -> Any:
+    """Nested view of one top-level key: *value* plus its following *block*."""
+    # Folded scalar (description: >)
+    if value == ">":
+        folded: List[str] = []
+        for line in block:
+            if not line.strip() or _indent(line) < 2:
+                break
+            folded.append(line.strip())
+        return " ".join(folded)
+
+    # Inline value
+    if value:
+        return _parse_yaml_value(value)
+
+    # Nested dict (key with no value → sub-keys follow)
+    sub: Dict[str, Any] = {}
+    i = 0
+    while i < len(block):
+        sline = block[i]
+        if not sline.strip():
+            i += 1
+            continue
+        if _indent(sline) < 2:
+            break
+        sm = _RE_FRONTMATTER_SUBKEY.match(sline.lstrip())
+        if not sm:
+            i += 1
+            continue
+        skey = sm.group(1).strip().strip("\"'")
+        sval = sm.group(2).strip()
+        if sval:
+            sub[skey] = _parse_yaml_value(sval)
+            i += 1
+            continue
+        # Third level
+        ssub: Dict[str, Any] = {}
+        i += 1
+        while i < len(block):
+            ssline = block[i]
+            if not ssline.strip():
+                i += 1
+                continue
+            if _indent(ssline) < 4:
+                break
+            ssm = _RE_FRONTMATTER_SUBKEY.match(ssline.lstrip())
+            if ssm:
+                sskey = ssm.group(1).strip().strip("\"'")
+                ssub[sskey] = _parse_yaml_value(ssm.group(2))
+            i += 1
+        sub[skey] = ssub
+    return sub
+
+
+def _copy_nested(meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: _copy_nested(val) if isinstance(val, dict) else val
+        for key, val in meta.items()
+    }
+
+
 def parse_nested_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
     """Parse YAML frontmatter with up to 3 levels of nesting.
 
@@ -751,104 +3006,87 @@ def parse_nested_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
     Returns ``(metadata_dict, body)`` — same contract as
     :func:`parse_frontmatter` but values can be dicts or typed scalars.
     """
-    content = content.strip()
-    if not content.startswith("---"):
-        return {}, content
+    scan = scan_frontmatter(content)
+    return _copy_nested(scan.nested), scan.body
 
-    end_idx = content.find("\n---", 3)
-    if end_idx == -1:
-        return {}, content
 
-    raw = content[3:end_idx].strip()
-    body = content[end_idx + 4 :].strip()
-
-    result: Dict[str, Any] = {}
-    lines = raw.split("\n")
-    i = 0
-
-    while i < len(lines):
-        line = lines[i]
-        if not line.strip():
-            i += 1
-            continue
-
-        indent = len(line) - len(line.lstrip())
-        if indent > 0:
-            i += 1
-            continue
+# ---------------------------------------------------------------------------
+# Parsed agent document
+# ---------------------------------------------------------------------------
 
-        match = re.match(r"^([\w][\w-]*)\s*:\s*(.*)", line.lstrip())
-        if not match:
-            i += 1
-            continue
+# ATX heading: 1-6 "#" then whitespace, or alone on its line
+_RE_HEADING = re.compile(r"^(#{1,6})(?=\s)(.*)$", re.MULTILINE)
 
-        key = match.group(1)
-        value_part = match.group(2).strip()
 
-        # Folded scalar (description: >)
-        if value_part == ">":
-            folded: List[str] = []
-            i += 1
-            while i < len(lines):
-                nxt = lines[i]
-                if not nxt.strip():
-                    break
-                if len(nxt) - len(nxt.lstrip()) < 2:
-                    break
-                folded.append(nxt.strip())
-                i += 1
-            result[key] = " ".join(folded)
-            continue
+class AgentDocument:
+    """An agent markdown file whose views are computed lazily, once each.
 
-        # Inline value
-        if value_part:
-            result[key] = _parse_yaml_value(value_part)
-            i += 1
-            continue
-
-        # Nested dict (key with no value → sub-keys follow)
-        sub: Dict[str, Any] = {}
-        i += 1
-        while i < len(lines):
-            sline = lines[i]
-            if not sline.strip():
-                i += 1
-                continue
-            sindent = len(sline) - len(sline.lstrip())
-            if sindent < 2:
-                break
-            sm = re.match(r'^(["\']?[^:]+["\']?)\s*:\s*(.*)', sline.lstrip())
-            if not sm:
-                i += 1
-                continue
-            skey = sm.group(1).strip().strip("\"'")
-            sval = sm.group(2).strip()
-            if not sval:
-                # Third level
-                ssub: Dict[str, Any] = {}
-                i += 1
-                while i < len(lines):
-                    ssline = lines[i]
-                    if not ssline.strip():
-                        i += 1
-                        continue
-                    ssindent = len(ssline) - len(ssline.lstrip())
-                    if ssindent < 4:
-                        break
-                    ssm = re.match(r'^(["\']?[^:]+["\']?)\s*:\s*(.*)', ssline.lstrip())
-                    if ssm:
-                        sskey = ssm.group(1).strip().strip("\"'")
-                        ssub[sskey] = _parse_yaml_value(ssm.group(2))
-                    i += 1
-                sub[skey] = ssub
-                continue
-            else:
-                sub[skey] = _parse_yaml_value(sval)
-            i += 1
-
-        result[key] = sub
+    The validators below and ``quality_scorer.score_agent`` accept either a
+    document or a raw string, so a document built once after conversion is
+    parsed once however many checks run on it. Returned dicts and lists are
+    shared: treat them as read-only.
+    """
 
-    return result, body
+    def __init__(self, content: str) -> None:
+        self.content = content
+
+    @classmethod
+    def of(cls, document: Union[str, AgentDocument]) -> AgentDocument:
+        """Return *document* unchanged, or wrap a raw markdown string."""
+        return document if isinstance(document, cls) else cls(document)
+
+    @functools.cached_property
+    def _scan(self) -> FrontmatterScan:
+        return scan_frontmatter(self.content)
+
+    @property
+    def frontmatter(self) -> Dict[str, Any]:
+        """Nested frontmatter, as returned by :func:`parse_nested_frontmatter`."""
+        return self._scan.nested
+
+    @property
+    def meta(self) -> Dict[str, str]:
+        """Flat frontmatter, as returned by :func:`parse_frontmatter`."""
+        return self._scan.flat
+
+    @property
+    def body(self) -> str:
+        return self._scan.body
+
+    @functools.cached_property
+    def headings(self) -> List[Tuple[int, str, int, int]]:
+        """``(level, title, start, end)`` for every ATX heading of the body.
+
+        *start* and *end* delimit the heading line within :attr:`body`; a
+        bare ``##`` line is a heading with an empty title.
+        """
+        return [
+            (len(m.group(1)), m.group(2).strip(), m.start(), m.end())
+            for m in _RE_HEADING.finditer(self.body)
+        ]
+
+    @functools.cached_property
+    def sections(self) -> Dict[str, str]:
+        """``## Title`` → stripped text up to the next ``##`` heading.
+
+        ``###`` sub-headings stay inside their section. The first section
+        wins when a title is repeated; untitled ones are left out.
+        """
+        level2 = [h for h in self.headings if h[0] == 2]
+        result: Dict[str, str] = {}
+        for i, (_level, title, _start, end) in enumerate(level2):
+            if title and title not in result:
+                stop = level2[i + 1][2] if i + 1 < len(level2) else len(self.body)
+                result[title] = self.body[end:stop].strip()
+        return result
+
+    @functools.cached_property
+    def preamble(self) -> str:
+        """Stripped body text before the first ``##`` heading."""
+        for level, _title, start, _end in self.headings:
+            if level == 2:
+                return self.body[:start].strip()
+        return self.body.strip()
 
 
 # ---------------------------------------------------------------------------
@@ -858,7 +3096,7 @@ def parse_nested_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
 _VALID_MODES = frozenset({"primary", "subagent", "all"})
 
 
-def validate_agent_schema(content: str) -> List[str]:
+def validate_agent_schema(content: Union[str, AgentDocument]) -> List[str]:
     """Validate an agent file's frontmatter against the required schema.
 
     Checks:
@@ -866,11 +3104,12 @@ def validate_agent_schema(content: str) -> List[str]:
     - ``mode`` is present and one of ``primary``, ``subagent``, ``all``
     - ``permission`` is present and is a dict (nested block)
 
-    Returns a list of warning strings (empty = valid).
+    *content* is the markdown or an :class:`AgentDocument`. Returns a list
+    of warning strings (empty = valid).
     """
     warnings: List[str] = []
 
-    meta, _body = parse_nested_frontmatter(content)
+    meta = AgentDocument.of(content).frontmatter
 
     if not meta:
         warnings.append("missing or empty frontmatter")
@@ -905,13 +3144,13 @@ def validate_agent_schema(content: str) -> List[str]:
 # ---------------------------------------------------------------------------
 
 _REQUIRED_SECTIONS = [
-    "## Decisions",
-    "## Examples",
-    "## Quality Gate",
+    "Decisions",
+    "Examples",
+    "Quality Gate",
 ]
 
 
-def check_template_conformance(content: str) -> List[str]:
+def check_template_conformance(content: Union[str, AgentDocument]) -> List[str]:
     """Check that an agent file body contains the required template sections.
 
     Required sections:
@@ -920,21 +3159,20 @@ def check_template_conformance(content: str) -> List[str]:
     - ``## Examples``
     - ``## Quality Gate``
 
-    Returns a list of warning strings (empty = conformant).
+    *content* is the markdown or an :class:`AgentDocument`. Returns a list
+    of warning strings (empty = conformant).
     """
     warnings: List[str] = []
 
-    _meta, body = parse_nested_frontmatter(content)
+    document = AgentDocument.of(content)
 
-    if not body.strip():
+    if not document.body:
         warnings.append("empty body — no sections found")
         return warnings
 
     # Check identity: there should be prose before the first ## heading
-    first_heading = re.search(r"^##\s", body, re.MULTILINE)
-    if first_heading:
-        preamble = body[: first_heading.start()].strip()
-        if len(preamble) < 20:
+    if any(level == 2 for level, *_rest in document.headings):
+        if len(document.preamble) < 20:
             warnings.append(
                 "missing or too short identity section (prose before first ## heading)"
             )
@@ -943,11 +3181,10 @@ def check_template_conformance(content: str) -> List[str]:
         warnings.append("no ## headings found — missing all required sections")
         return warnings
 
-    # Check required section headings
+    # Check required section headings (case-insensitive title prefix)
+    titles = [title.lower() for title in document.sections]
     for section in _REQUIRED_SECTIONS:
-        # Match heading at start of line, case-insensitive
-        pattern = r"^" + re.escape(section)
-        if not re.search(pattern, body, re.MULTILINE | re.IGNORECASE):
-            warnings.append(f"missing required section: {section}")
+        if not any(title.startswith(section.lower()) for title in titles):
+            warnings.append(f"missing required section: ## {section}")
 
     return warnings
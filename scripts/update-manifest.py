@@ -353,6 +353,7 @@ def update_manifest(
     metadata_path: Optional[str] = DEFAULT_METADATA_OUTPUT,
     *,
     dry_run: bool = False,
+    sync_data: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Run the full manifest update pipeline.
 
@@ -362,6 +363,8 @@ def update_manifest(
         metadata_path: Where to write sync metadata JSON (set to ``None``
             to skip metadata output).
         dry_run: If ``True``, log what would change without writing files.
+        sync_data: Already-built sync manifest to merge instead of reading
+            *sync_path* (used by ``sync-all.py`` to merge in-process).
 
     Returns:
         Metadata dictionary with keys: ``added``, ``stale``,
@@ -377,7 +380,7 @@ def update_manifest(
         raise ManifestNotFoundError(f"Root manifest not found: {root_path}")
 
     # Check sync manifest exists
-    if not os.path.isfile(sync_path):
+    if sync_data is None and not os.path.isfile(sync_path):
         raise SyncManifestNotFoundError(
             f"No sync manifest found at {sync_path}, nothing to merge"
         )
@@ -391,10 +394,15 @@ def update_manifest(
     if not isinstance(root, dict):
         raise ManifestError(f"Root manifest is not a JSON object: {root_path}")
 
-    try:
-        sync = load_json(sync_path)
-    except (json.JSONDecodeError, OSError) as exc:
-        raise ManifestError(f"Failed to load sync manifest {sync_path}: {exc}") from exc
+    if sync_data is not None:
+        sync = sync_data
+    else:
+        try:
+            sync = load_json(sync_path)
+        except (json.JSONDecodeError, OSError) as exc:
+            raise ManifestError(
+                f"Failed to load sync manifest {sync_path}: {exc}"
+            ) from exc
 
     if not isinstance(sync, dict):
         raise ManifestError(f"Sync manifest is not a JSON object: {sync_path}")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+test_benchmark_sync.py - Unit tests for the sync benchmark harness.
+
+Exercises the synthetic repository and the local GitHub stand-in over
+loopback only; one smoke test runs sync-agents.py against it end to end.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import sync_common  # noqa: E402
+
+benchmark_sync = importlib.import_module("benchmark_sync")
+SyntheticRepo = benchmark_sync.SyntheticRepo
+GitHubStandIn = benchmark_sync.GitHubStandIn
+AGENTS_BASE_PATH = benchmark_sync.sync_agents.AGENTS_BASE_PATH
+
+
+class TestSyntheticRepo(unittest.TestCase):
+    def setUp(self):
+        self.repo = SyntheticRepo(agents=12, skills=3)
+
+    def test_tree_indexes_every_agent(self):
+        tree = sync_common.RepoTree(self.repo.tree())
+        agents = [
+            f
+            for f in tree.walk(AGENTS_BASE_PATH)
+            if f["name"].startswith("bench-agent-")
+        ]
+        self.assertEqual(len(agents), 12)
+        # Blob SHAs match the content, so freshness checks behave as upstream
+        path = agents[0]["path"]
+        self.assertEqual(
+            agents[0]["sha"], sync_common._git_blob_sha(self.repo.files[path])
+        )
+
+    def test_subtree_paths_are_relative(self):
+        skill_dir = next(d for d in self.repo.dirs if d.endswith("bench-skill-00000"))
+        paths = sorted(e["path"] for e in self.repo.tree(skill_dir))
+        self.assertEqual(paths, ["SKILL.md", "reference", "reference/notes.md"])
+
+    def test_contents_listing_shape(self):
+        listing = self.repo.contents(AGENTS_BASE_PATH, "http://api", "http://raw")
+        self.assertTrue(all(e["type"] == "dir" for e in listing))
+        category = listing[0]["path"]
+        files = self.repo.contents(category, "http://api", "http://raw")
+        self.assertTrue(files[0]["download_url"].startswith("http://raw/"))
+        self.assertIsNone(self.repo.contents("missing", "http://api", "http://raw"))
+
+
+class TestGitHubStandIn(unittest.TestCase):
+    def setUp(self):
+        self.repo = SyntheticRepo(agents=2, skills=0)
+        self.path = next(p for p in self.repo.files if p.endswith(".md"))
+
+    def _server(self, **kwargs):
+        server = GitHubStandIn(self.repo, **kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _raw_url(self, server):
+        return f"{server.raw_base}/{sync_common.DEFAULT_REPO}/main/{self.path}"
+
+    def test_api_carries_rate_limit_headers(self):
+        server = self._server(api_budget=10)
+        url = f"{server.api_base}/repos/{sync_common.DEFAULT_REPO}/git/trees/main"
+        with urllib.request.urlopen(url) as resp:
+            body = json.loads(resp.read())
+            self.assertEqual(resp.headers["X-RateLimit-Remaining"], "9")
+        self.assertFalse(body["truncated"])
+        self.assertEqual(server.requests["api:200"], 1)
+
+    def test_raw_etag_and_304(self):
+        server = self._server()
+        with urllib.request.urlopen(self._raw_url(server)) as resp:
+            etag = resp.headers["ETag"]
+            self.assertEqual(resp.read(), self.repo.files[self.path])
+        req = urllib.request.Request(
+            self._raw_url(server), headers={"If-None-Match": etag}
+        )
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(req)
+        self.assertEqual(ctx.exception.code, 304)
+
+    def test_injected_429_with_retry_after(self):
+        server = self._server(inject_429=2)
+        urllib.request.urlopen(self._raw_url(server)).close()
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(self._raw_url(server))
+        self.assertEqual(ctx.exception.code, 429)
+        self.assertEqual(ctx.exception.headers["Retry-After"], "1")
+
+    def test_trees_disabled_forces_contents_fallback(self):
+        server = self._server(trees=False)
+        url = f"{server.api_base}/repos/{sync_common.DEFAULT_REPO}/git/trees/main"
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(url)
+        self.assertEqual(ctx.exception.code, 404)
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def test_smoke_agents_cold_run(self):
+        with patch("sys.stderr"):
+            report = benchmark_sync.run_benchmarks(
+                [5], jobs=2, scripts=["sync-agents"], scenarios=["cold"]
+            )
+        (result,) = report["results"]
+        self.assertEqual(result["exit_code"], 0)
+        self.assertEqual(result["requests"].get("raw:200"), 5)
+        self.assertGreater(result["wall_time_s"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
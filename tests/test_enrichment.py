@@ -5,19 +5,27 @@ test_enrichment.py — Tests for S2 Agent Enrichment features.
 Covers:
 - get_archetype() and AGENT_ARCHETYPE_MAP
 - build_archetype_permissions() (all archetypes, sub-profiles, exceptions)
+- scan_frontmatter()
+- AgentDocument
 - validate_agent_schema()
 - check_template_conformance()
 - score_agent()
+- quality_scorer --batch mode
+- generate_readme_scores score cache
 - Archetype integration in build_opencode_agent()
 """
 
 from __future__ import annotations
 
 import importlib
+import io
 import json
+import shutil
 import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 # Ensure scripts/ is importable
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -28,10 +36,15 @@ sys.path.insert(0, str(SCRIPTS_DIR))
 sync_agents = importlib.import_module("sync-agents")
 
 from sync_common import (
+    AgentDocument,
     check_template_conformance,
+    parse_frontmatter,
     parse_nested_frontmatter,
+    scan_frontmatter,
     validate_agent_schema,
 )
+import generate_readme_scores
+import quality_scorer
 from quality_scorer import score_agent
 
 
@@ -388,6 +401,99 @@ class TestParseNestedFrontmatter(unittest.TestCase):
         self.assertEqual(meta, {})
 
 
+# ===================================================================
+# Test: scan_frontmatter()
+# ===================================================================
+
+
+class TestScanFrontmatter(unittest.TestCase):
+    """Tests for scan_frontmatter(), the shared single-pass parser."""
+
+    CONTENT = (
+        "\n---\n"
+        "description: >\n  First line\n  second line\n"
+        "permission:\n  read: allow\n"
+        "---\n\nIdentity prose.\n\n## Decisions\n"
+    )
+
+    def test_flat_and_nested_views(self):
+        scan = scan_frontmatter(self.CONTENT)
+        self.assertEqual(scan.flat["description"], ">\n  First line\n  second line")
+        self.assertEqual(scan.flat["permission"], "read: allow")
+        self.assertEqual(scan.nested["description"], "First line second line")
+        self.assertEqual(scan.nested["permission"], {"read": "allow"})
+        self.assertEqual((scan.flat, scan.body), parse_frontmatter(self.CONTENT))
+        self.assertEqual(
+            (scan.nested, scan.body), parse_nested_frontmatter(self.CONTENT)
+        )
+
+    def test_memoized_results_are_not_shared_with_callers(self):
+        meta, _body = parse_nested_frontmatter(self.CONTENT)
+        meta["permission"]["write"] = "allow"
+        flat, _body = parse_frontmatter(self.CONTENT)
+        flat["mode"] = "primary"
+        scan = scan_frontmatter(self.CONTENT)
+        self.assertIs(scan, scan_frontmatter(self.CONTENT))
+        self.assertEqual(scan.nested["permission"], {"read": "allow"})
+        self.assertNotIn("mode", scan.flat)
+
+
+# ===================================================================
+# Test: AgentDocument
+# ===================================================================
+
+
+class TestAgentDocument(unittest.TestCase):
+    """Tests for AgentDocument, the parse-once view of an agent file."""
+
+    def setUp(self):
+        self.content = _make_agent(body=_GOOD_BODY)
+        self.doc = AgentDocument(self.content)
+
+    def test_frontmatter_and_body(self):
+        meta, body = parse_nested_frontmatter(self.content)
+        self.assertEqual(self.doc.frontmatter, meta)
+        self.assertEqual(self.doc.body, body)
+        self.assertEqual(self.doc.meta["mode"], "subagent")
+
+    def test_section_index(self):
+        self.assertEqual(
+            list(self.doc.sections), ["Decisions", "Examples", "Quality Gate"]
+        )
+        self.assertTrue(self.doc.sections["Examples"].startswith("```bash"))
+        self.assertTrue(self.doc.preamble.startswith("You are the test agent."))
+        self.assertTrue(self.doc.preamble.endswith("(2024)."))
+
+    def test_heading_rules(self):
+        doc = AgentDocument(
+            "Intro.\n\n##\tTabbed\nA\n### Sub\nB\n##\nC\n##NoSpace\n## Tabbed\nD\n"
+        )
+        self.assertEqual(
+            [(level, title) for level, title, _s, _e in doc.headings],
+            [(2, "Tabbed"), (3, "Sub"), (2, ""), (2, "Tabbed")],
+        )
+        # Sub-headings stay in their section, a bare "##" still ends it
+        self.assertEqual(doc.sections, {"Tabbed": "A\n### Sub\nB"})
+        self.assertEqual(doc.preamble, "Intro.")
+
+    def test_views_are_memoized(self):
+        self.assertIs(self.doc.sections, self.doc.sections)
+        self.assertIs(AgentDocument.of(self.doc), self.doc)
+
+    def test_checks_accept_a_document(self):
+        self.assertEqual(validate_agent_schema(self.doc), [])
+        self.assertEqual(check_template_conformance(self.doc), [])
+        self.assertEqual(score_agent(self.doc), score_agent(self.content))
+
+    def test_build_opencode_agent_accepts_source_document(self):
+        source = "---\ndescription: Test agent\ntools: Read\n---\nBody content here"
+        meta, body = parse_frontmatter(source)
+        self.assertEqual(
+            sync_agents.build_opencode_agent("x", AgentDocument(source), None, "ai"),
+            sync_agents.build_opencode_agent("x", meta, body, "ai"),
+        )
+
+
 # ===================================================================
 # Test: validate_agent_schema()
 # ===================================================================
@@ -563,6 +669,155 @@ class TestScoreAgent(unittest.TestCase):
         # No frontmatter → frontmatter dimension should be 1
         self.assertEqual(result["dimensions"]["frontmatter"], 1)
 
+    def test_section_boundaries(self):
+        """Sections end at the next ## heading; ### stays inside, first wins."""
+        body = (
+            "Identity prose.\n\n## Examples\n\n### Shell\n\n```bash\nls\n```\n\n"
+            "## Quality Gate\n\n## Examples\n\n```\nx\n```\n"
+        )
+        result = score_agent(_make_agent(body=body))
+        self.assertEqual(result["dimensions"]["examples"], 3)
+        # Heading with no content counts as missing
+        self.assertEqual(result["dimensions"]["quality_gate"], 1)
+
+    def test_banned_headings_up_to_level_three(self):
+        body = "Identity.\n\n# Workflow\n\n### tools\n\n#### Collaboration\n"
+        result = score_agent(_make_agent(body=body))
+        self.assertEqual(result["dimensions"]["no_banned_sections"], 1)
+        result = score_agent(_make_agent(body="Identity.\n\n## Tools  \n"))
+        self.assertEqual(result["dimensions"]["no_banned_sections"], 3)
+
+
+# ===================================================================
+# Test: quality_scorer --batch
+# ===================================================================
+
+
+class TestBatchScoring(unittest.TestCase):
+    """Tests for the quality_scorer --batch CLI mode."""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, True)
+        for rel, body in (("ai/good.md", _GOOD_BODY), ("devops/poor.md", "Be.")):
+            path = self.root / rel
+            path.parent.mkdir(parents=True)
+            path.write_text(_make_agent(body=body), encoding="utf-8")
+        self.out = self.root.parent / f"{self.root.name}.out"
+        self.addCleanup(self.out.unlink, True)
+
+    def _main(self, *argv):
+        argv = ["--batch", str(self.root), "-o", str(self.out), *argv]
+        with patch("sys.stderr", new_callable=io.StringIO):
+            return quality_scorer.main(argv)
+
+    def test_jsonl_records_in_path_order(self):
+        self.assertEqual(self._main("--jobs", "2"), 0)
+        records = [json.loads(ln) for ln in self.out.read_text().splitlines()]
+        self.assertEqual([r["path"] for r in records], ["ai/good.md", "devops/poor.md"])
+        good = score_agent(_make_agent(body=_GOOD_BODY))
+        self.assertEqual(records[0], {"path": "ai/good.md", **good})
+
+    def test_min_overall_gate(self):
+        self.assertEqual(self._main("--jobs", "1", "--min-overall", "1.0"), 0)
+        self.assertEqual(self._main("--jobs", "1", "--min-overall", "3.5"), 1)
+
+    def test_csv_output(self):
+        self.assertEqual(self._main("--format", "csv", "--jobs", "1"), 0)
+        header, *rows = self.out.read_text().splitlines()
+        self.assertEqual(header.split(","), quality_scorer._CSV_FIELDS)
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(rows[1].startswith("devops/poor.md,5,"))
+
+    def test_batch_excludes_file_arguments(self):
+        with self.assertRaises(SystemExit):
+            self._main("extra.md")
+
+
+# ===================================================================
+# Test: generate_readme_scores score cache
+# ===================================================================
+
+
+class TestReadmeScoreCache(unittest.TestCase):
+    """Tests for the incremental score cache of generate_readme_scores."""
+
+    def setUp(self):
+        self.agents_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.agents_dir, True)
+        (self.agents_dir / "ai").mkdir()
+        self.path = self.agents_dir / "ai" / "good.md"
+        self.path.write_text(_make_agent(body=_GOOD_BODY), encoding="utf-8")
+        self.manifest = [{"name": "good", "category": "ai", "path": "ai/good"}]
+        patcher = patch.object(generate_readme_scores, "AGENTS_DIR", self.agents_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _score(self, cache):
+        with patch.object(
+            generate_readme_scores, "score_agent", wraps=score_agent
+        ) as scorer:
+            (result,) = generate_readme_scores.score_all_agents(self.manifest, cache)
+        return result, scorer.call_count
+
+    def test_unchanged_agents_are_not_rescored(self):
+        cache = {"ai/gone": {"sha256": "x"}}
+        first, calls = self._score(cache)
+        self.assertEqual(calls, 1)
+        self.assertEqual(list(cache), ["ai/good"])
+        again, calls = self._score(cache)
+        self.assertEqual(calls, 0)
+        self.assertEqual(again, first)
+
+    def test_edited_agent_is_rescored(self):
+        cache = {}
+        first, _calls = self._score(cache)
+        self.path.write_text(_make_agent(body="Be."), encoding="utf-8")
+        second, calls = self._score(cache)
+        self.assertEqual(calls, 1)
+        self.assertLess(second.overall, first.overall)
+
+    def _update_readmes(self, **kwargs):
+        readme_fr = self.agents_dir / "README.md"
+        readme_en = self.agents_dir / "README.en.md"
+        for readme in (readme_fr, readme_en):
+            if not readme.exists():
+                readme.write_text(
+                    f"{generate_readme_scores.MARKER_BEGIN}\n"
+                    f"{generate_readme_scores.MARKER_END}\n",
+                    encoding="utf-8",
+                )
+        with patch.object(
+            generate_readme_scores, "load_manifest", return_value=self.manifest
+        ), patch.object(generate_readme_scores, "README_FR", readme_fr), patch.object(
+            generate_readme_scores, "README_EN", readme_en
+        ), patch(
+            "builtins.print"
+        ), patch(
+            "sys.stderr"
+        ):
+            return generate_readme_scores.update_readmes(**kwargs)
+
+    def test_cache_round_trip_and_check_mode_is_read_only(self):
+        cache_path = self.agents_dir / ".score-cache.json"
+        with patch.object(generate_readme_scores, "SCORE_CACHE_PATH", cache_path):
+            self.assertEqual(self._update_readmes(check=True), 1)
+            self.assertFalse(cache_path.exists())
+            self.assertEqual(self._update_readmes(), 0)
+            self.assertEqual(
+                list(generate_readme_scores.load_score_cache()), ["ai/good"]
+            )
+            # --check reuses the (committed) cache...
+            with patch.object(generate_readme_scores, "score_agent") as scorer:
+                self.assertEqual(self._update_readmes(check=True), 0)
+            scorer.assert_not_called()
+            # ...and fails, tables being up to date, once it is out of date
+            cache_path.unlink()
+            self.assertEqual(self._update_readmes(check=True), 1)
+            self.assertFalse(cache_path.exists())
+            with patch.object(generate_readme_scores, "SCORER_VERSION", "next"):
+                self.assertEqual(generate_readme_scores.load_score_cache(), {})
+
 
 # ===================================================================
 # Test: Archetype integration in build_opencode_agent()
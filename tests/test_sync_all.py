@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+test_sync_all.py - Unit tests for sync-all.py, the combined agents + skills
+sync command.
+
+Per-item sync functions are patched out, so no network calls are made.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+sync_all = importlib.import_module("sync-all")
+sync_agents = sync_all.sync_agents
+sync_skills = sync_all.sync_skills
+
+
+def _agent_entry(name, source_path, *args, **kwargs):
+    return {
+        "name": name,
+        "category": source_path.split("/")[0],
+        "path": name,
+        "mode": "subagent",
+        "source": f"{sync_agents.AGENTS_BASE_PATH}/{source_path}.md",
+        "status": "synced",
+    }
+
+
+class TestBuildParser(unittest.TestCase):
+    def test_defaults(self):
+        args = sync_all.build_parser().parse_args([])
+        self.assertEqual(args.tier, "core")
+        self.assertEqual(args.jobs, 1)
+        self.assertEqual(args.agents_dir, "agents")
+        self.assertEqual(args.skills_dir, ".opencode/skills")
+        self.assertFalse(args.no_manifest_update)
+        self.assertIsNone(args.stats_json)
+
+    def test_selection_uses_curated_lists(self):
+        self.assertEqual(
+            sync_all.select_agents("core", "o/r"), sync_agents.CURATED_AGENTS
+        )
+        self.assertEqual(
+            sync_all.select_skills(False, "o/r"), sync_skills.CURATED_SKILLS
+        )
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.root_manifest = self.tmpdir / "manifest.json"
+        self.root_manifest.write_text(
+            json.dumps({"version": "1.0.0", "agent_count": 0, "agents": []}),
+            encoding="utf-8",
+        )
+        self.argv = [
+            "sync-all.py",
+            "--agents-dir",
+            str(self.tmpdir / "agents"),
+            "--skills-dir",
+            str(self.tmpdir / "skills"),
+            "--root-manifest",
+            str(self.root_manifest),
+            "--metadata-output",
+            str(self.tmpdir / "meta.json"),
+            "--jobs",
+            "4",
+        ]
+        self.agents = {"alpha": "development-team/alpha", "beta": "ai/beta"}
+        self.skills = {"clean-code": sync_skills.CURATED_SKILLS["clean-code"]}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _main(self, extra=()):
+        with patch.object(sys, "argv", self.argv + list(extra)), patch.object(
+            sync_all, "select_agents", return_value=self.agents
+        ), patch.object(
+            sync_all, "select_skills", return_value=self.skills
+        ), patch.object(
+            sync_agents, "sync_agent", side_effect=_agent_entry
+        ) as agent_mock, patch.object(
+            sync_skills, "sync_skill", return_value=True
+        ) as skill_mock, patch(
+            "builtins.print"
+        ):
+            code = sync_all.main()
+        return code, agent_mock, skill_mock
+
+    def test_syncs_both_and_merges_manifest_in_process(self):
+        with patch.object(
+            sync_all.update_manifest_mod,
+            "update_manifest",
+            wraps=sync_all.update_manifest_mod.update_manifest,
+        ) as update_mock:
+            code, agent_mock, skill_mock = self._main()
+
+        self.assertEqual(code, 0)
+        self.assertEqual(agent_mock.call_count, 2)
+        self.assertEqual(skill_mock.call_count, 1)
+        sync_data = update_mock.call_args.kwargs["sync_data"]
+        self.assertEqual([a["name"] for a in sync_data["agents"]], ["alpha", "beta"])
+        root = json.loads(self.root_manifest.read_text(encoding="utf-8"))
+        self.assertEqual(sorted(a["name"] for a in root["agents"]), ["alpha", "beta"])
+        self.assertTrue((self.tmpdir / "skills" / "manifest.json").is_file())
+
+    def test_no_manifest_update(self):
+        with patch.object(
+            sync_all.update_manifest_mod, "update_manifest"
+        ) as update_mock:
+            code, _agents, _skills = self._main(["--no-manifest-update"])
+        self.assertEqual(code, 0)
+        update_mock.assert_not_called()
+
+    def test_stats_json_report(self):
+        stats_path = self.tmpdir / "stats.json"
+        code, _agents, _skills = self._main(
+            ["--no-manifest-update", "--stats-json", str(stats_path)]
+        )
+        self.assertEqual(code, 0)
+        report = json.loads(stats_path.read_text(encoding="utf-8"))
+        self.assertEqual(report["summary"]["agents"], 2)
+        self.assertEqual(report["summary"]["synced"], 3)
+        self.assertTrue(report["summary"]["completed"])
+        self.assertIn("wall_time_s", report)
+
+    def _interrupted_run(self):
+        """Run with every skill failing; return the journal left behind."""
+        journal = self.tmpdir / "agents" / sync_all.sync_journal_filename("sync-all")
+        with patch.object(sync_skills, "sync_skill", side_effect=OSError("x")):
+            with patch.object(sys, "argv", self.argv), patch.object(
+                sync_all, "select_agents", return_value=self.agents
+            ), patch.object(
+                sync_all, "select_skills", return_value=self.skills
+            ), patch.object(
+                sync_agents, "sync_agent", side_effect=_agent_entry
+            ), patch(
+                "builtins.print"
+            ):
+                self.assertEqual(sync_all.main(), 1)
+        self.assertTrue(journal.is_file())
+        return journal
+
+    def test_resume_skips_items_completed_before_failure(self):
+        journal = self._interrupted_run()
+
+        code, agent_mock, skill_mock = self._main(["--resume"])
+        self.assertEqual(code, 0)
+        agent_mock.assert_not_called()
+        self.assertEqual(skill_mock.call_count, 1)
+        self.assertFalse(journal.exists())
+        root = json.loads(self.root_manifest.read_text(encoding="utf-8"))
+        self.assertEqual(sorted(a["name"] for a in root["agents"]), ["alpha", "beta"])
+
+    def test_resume_with_other_options_is_refused(self):
+        journal = self._interrupted_run()
+        before = journal.read_bytes()
+
+        code, agent_mock, skill_mock = self._main(["--resume", "--tier", "extended"])
+        self.assertEqual(code, 1)
+        agent_mock.assert_not_called()
+        skill_mock.assert_not_called()
+        self.assertEqual(journal.read_bytes(), before)
+
+    def test_resume_with_other_skill_selection_is_refused(self):
+        """--all also selects every skill, so it must match on --resume."""
+        self.argv += ["--tier", "all"]
+        journal = self._interrupted_run()
+
+        code, agent_mock, skill_mock = self._main(["--resume", "--all"])
+        self.assertEqual(code, 1)
+        agent_mock.assert_not_called()
+        skill_mock.assert_not_called()
+        self.assertTrue(journal.is_file())
+
+    def test_failed_item_sets_exit_code(self):
+        self.agents = {"alpha": "development-team/alpha"}
+        with patch.object(sync_skills, "sync_skill", side_effect=OSError("x")):
+            with patch.object(sys, "argv", self.argv), patch.object(
+                sync_all, "select_agents", return_value=self.agents
+            ), patch.object(
+                sync_all, "select_skills", return_value=self.skills
+            ), patch.object(
+                sync_agents, "sync_agent", side_effect=_agent_entry
+            ), patch(
+                "builtins.print"
+            ):
+                self.assertEqual(sync_all.main(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
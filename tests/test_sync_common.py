@@ -0,0 +1,1148 @@
+#!/usr/bin/env python3
+"""
+test_sync_common.py - Unit tests for the shared sync infrastructure.
+
+Covers the shared helpers of sync_common.py (rate limiting, transport,
+tree discovery, archives, the asyncio core) without reaching external
+hosts (pool tests use a loopback server).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import sync_common  # noqa: E402
+
+RateLimiter = sync_common.RateLimiter
+
+
+class _FakeClock:
+    """Manually advanced monotonic clock; sleep() advances it."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _headers(remaining: int, reset_in: int, now_epoch: float = 0.0) -> dict:
+    return {
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(now_epoch + reset_in)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Tests RateLimiter
+# ---------------------------------------------------------------------------
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Tests for RateLimiter: adaptive token bucket fed by response headers."""
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        self.limiter = RateLimiter(
+            reserve=0, burst_fraction=0.5, clock=self.clock, sleep=self.clock.sleep
+        )
+        # Freeze wall-clock time so X-RateLimit-Reset windows are exact
+        patcher = patch.object(sync_common.time, "time", return_value=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unknown_host_is_not_paced(self):
+        """Hosts without rate-limit headers never wait."""
+        for _ in range(100):
+            self.assertEqual(self.limiter.acquire("raw.githubusercontent.com"), 0.0)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_burst_then_paced(self):
+        """Half the remaining budget is a free burst; the rest is spread out."""
+        # 100 requests left for 100 s → 1 req/s, burst capacity 50
+        self.limiter.update("api.github.com", _headers(100, 100))
+        for _ in range(50):
+            self.assertEqual(self.limiter.acquire("api.github.com"), 0.0)
+        waited = self.limiter.acquire("api.github.com")
+        self.assertAlmostEqual(waited, 1.0)
+
+    def test_large_budget_not_throttled(self):
+        """With 5000 req/h left, a typical sync never sleeps."""
+        self.limiter.update("api.github.com", _headers(5000, 3600))
+        for _ in range(300):
+            self.limiter.acquire("api.github.com")
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_exhausted_budget_waits_for_reset(self):
+        """Remaining=0 blocks until the reset time."""
+        self.limiter.update("api.github.com", _headers(0, 42))
+        waited = self.limiter.acquire("api.github.com")
+        self.assertAlmostEqual(waited, 42.0)
+
+    def test_exhausted_budget_wait_is_capped(self):
+        """A far-off reset holds the bucket for MAX_RATE_LIMIT_WAIT at most."""
+        cap = sync_common.MAX_RATE_LIMIT_WAIT
+        with self.assertLogs(sync_common.logger, "WARNING") as logs:
+            self.limiter.update("api.github.com", _headers(0, cap * 12))
+        self.assertIn("capped", logs.output[0])
+        self.assertAlmostEqual(self.limiter.acquire("api.github.com"), cap)
+        self.assertEqual(self.limiter.acquire("api.github.com"), 0.0)
+
+    def test_resources_have_separate_buckets(self):
+        """An exhausted GraphQL window does not hold REST requests."""
+        headers = dict(_headers(0, 60), **{"X-RateLimit-Resource": "graphql"})
+        self.limiter.update("api.github.com", headers)
+        self.limiter.update("api.github.com", _headers(5000, 3600))
+        self.assertEqual(self.limiter.acquire("api.github.com"), 0.0)
+        self.assertAlmostEqual(self.limiter.acquire("api.github.com", "graphql"), 60)
+
+    def test_rate_limit_resource_from_url(self):
+        resource = sync_common.rate_limit_resource
+        self.assertEqual(resource(sync_common.GRAPHQL_API), "graphql")
+        self.assertEqual(resource("https://api.github.com/search/code?q=x"), "search")
+        self.assertEqual(resource("https://api.github.com/repos/o/r/git/trees"), "core")
+
+    def test_stale_remaining_ignored(self):
+        """An out-of-order response with a higher remaining is ignored."""
+        self.limiter.update("api.github.com", _headers(0, 60))
+        self.limiter.update("api.github.com", _headers(50, 60))
+        self.assertAlmostEqual(self.limiter.acquire("api.github.com"), 60.0)
+
+    def test_penalize_blocks_unpaced_host(self):
+        """A bare 429 holds every request to that host."""
+        self.limiter.penalize("raw.githubusercontent.com", 5)
+        self.assertAlmostEqual(self.limiter.acquire("raw.githubusercontent.com"), 5)
+        self.assertEqual(self.limiter.acquire("raw.githubusercontent.com"), 0.0)
+
+    def test_deferring_raises_instead_of_sleeping(self):
+        """Long waits raise RateLimited in deferring mode instead of sleeping."""
+        self.limiter.update("api.github.com", _headers(0, 30))
+        with self.limiter.deferring():
+            with self.assertRaises(sync_common.RateLimited) as ctx:
+                self.limiter.acquire("api.github.com")
+        self.assertEqual(ctx.exception.host, "api.github.com")
+        self.assertAlmostEqual(ctx.exception.wait, 30.0)
+        self.assertEqual(self.clock.sleeps, [])
+        # Outside the block the same wait is slept as before
+        self.assertAlmostEqual(self.limiter.acquire("api.github.com"), 30.0)
+
+    def test_deferring_sleeps_short_waits(self):
+        self.limiter.penalize("raw.githubusercontent.com", 1)
+        with self.limiter.deferring():
+            self.assertAlmostEqual(self.limiter.acquire("raw.githubusercontent.com"), 1)
+
+    def test_missing_or_invalid_headers_ignored(self):
+        """Responses without usable headers leave the bucket untouched."""
+        self.limiter.update("api.github.com", {})
+        self.limiter.update("api.github.com", None)
+        self.limiter.update(
+            "api.github.com",
+            {"X-RateLimit-Remaining": "x", "X-RateLimit-Reset": "1"},
+        )
+        self.assertEqual(self.limiter.acquire("api.github.com"), 0.0)
+
+
+class _FakeResponse:
+    """Minimal context-manager response returned by a patched opener."""
+
+    def __init__(self, body: bytes, headers: dict, status: int = 200) -> None:
+        self._body = io.BytesIO(body)
+        self.headers = headers
+        self.status = status
+
+    def read(self, amt=None):
+        return self._body.read(amt)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestHttpRequestRateLimiting(unittest.TestCase):
+    """Tests for _http_request() integration with the shared rate limiter."""
+
+    def test_response_headers_feed_limiter(self):
+        """Every response updates the limiter of its host."""
+        headers = {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "99"}
+        response = _FakeResponse(b"{}", headers)
+        with patch.object(sync_common, "_open", return_value=response):
+            with patch.object(sync_common.rate_limiter, "update") as mock_update:
+                sync_common._http_request("https://api.github.com/x", headers={})
+        mock_update.assert_called_once_with("api.github.com", headers, "core")
+
+    def test_retry_after_penalizes_host(self):
+        """A 429 with Retry-After holds the host instead of sleeping inline."""
+        import urllib.error
+
+        err = urllib.error.HTTPError(
+            "https://api.github.com/x", 429, "Too Many", {"Retry-After": "7"}, None
+        )
+        ok = _FakeResponse(b"{}", {})
+        limiter = sync_common.rate_limiter
+        with patch.object(sync_common, "_open", side_effect=[err, ok]):
+            with patch.object(limiter, "penalize") as mock_penalize:
+                with patch.object(limiter, "acquire") as mock_acquire:
+                    with patch.object(sync_common.time, "sleep") as mock_sleep:
+                        result = sync_common._http_request(
+                            "https://api.github.com/x", headers={}
+                        )
+        self.assertEqual(result[2], 200)
+        mock_penalize.assert_called_once_with("api.github.com", 7, "core")
+        self.assertEqual(mock_acquire.call_count, 2)
+        mock_sleep.assert_not_called()
+
+
+class TestSyncStats(unittest.TestCase):
+    """Tests for the SyncStats phase timers and _http_request() accounting."""
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        self.stats = sync_common.SyncStats(clock=self.clock)
+
+    def test_phase_and_timed_accumulate(self):
+        with self.stats.phase("discovery"):
+            self.clock.sleep(2.0)
+
+        @self.stats.timed("agent.fetch")
+        def fetch(name):
+            self.clock.sleep(0.5)
+            return name
+
+        self.assertEqual(fetch("a"), "a")
+        fetch("b")
+        report = self.stats.to_dict({"synced": 2})
+        self.assertEqual(report["wall_time_s"], 3.0)
+        self.assertEqual(report["phases"]["discovery"], {"seconds": 2.0, "calls": 1})
+        self.assertEqual(report["phases"]["agent.fetch"], {"seconds": 1.0, "calls": 2})
+        self.assertEqual(report["summary"], {"synced": 2})
+
+    def test_write_json_after_reset(self):
+        self.stats.add("requests", 3)
+        self.stats.reset()
+        self.stats.add("retries")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "stats.json"
+            self.stats.write_json(path)
+            report = json.loads(path.read_text(encoding="utf-8"))
+        self.assertEqual(report["counters"], {"retries": 1})
+        self.assertNotIn("summary", report)
+
+    def test_http_request_accounting(self):
+        """Bytes, 304 hits and 404s are counted per request."""
+        not_modified = urllib.error.HTTPError("https://x/a", 304, "NM", {}, None)
+        missing = urllib.error.HTTPError("https://x/b", 404, "NF", {}, None)
+        replies = [_FakeResponse(b"12345", {}), not_modified, missing]
+        with patch.object(sync_common, "stats", self.stats), patch.object(
+            sync_common, "_open", side_effect=replies
+        ):
+            for _ in replies:
+                sync_common._http_request("https://x/a", headers={})
+        counters = self.stats.to_dict()["counters"]
+        self.assertEqual(counters["requests"], 3)
+        self.assertEqual(counters["bytes_downloaded"], 5)
+        self.assertEqual(counters["not_modified"], 1)
+        self.assertEqual(counters["not_found"], 1)
+        self.assertEqual(self.stats.to_dict()["phases"]["http"]["calls"], 3)
+
+
+class _LocalHandler(BaseHTTPRequestHandler):
+    """Keep-alive test server: /ok, /redirect, /offsite and 404 otherwise."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.peers.add(self.client_address)
+        if self.path == "/ok":
+            self._reply(200, b'{"ok": true}')
+        elif self.path == "/redirect":
+            self._reply(302, b"", {"Location": "/ok"})
+        elif self.path == "/offsite":
+            self._reply(302, b"", {"Location": "http://example.invalid/ok"})
+        else:
+            self._reply(404, b"missing")
+
+    def _reply(self, status, body, extra=None):
+        self.send_response(status)
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Tests for the keep-alive ConnectionPool against a loopback server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _LocalHandler)
+        cls.server.peers = set()
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.peers.clear()
+        self.pool = sync_common.ConnectionPool()
+        self.addCleanup(self.pool.close)
+
+    def _get(self, path):
+        with self.pool.open(self.base + path, {}) as resp:
+            return resp.status, resp.read()
+
+    def test_connection_is_reused(self):
+        """Sequential requests to one host share a single socket."""
+        for _ in range(3):
+            self.assertEqual(self._get("/ok"), (200, b'{"ok": true}'))
+        self.assertEqual(len(self.server.peers), 1)
+
+    def test_partial_read_discards_connection(self):
+        """A response that is not fully read is not returned to the pool."""
+        with self.pool.open(self.base + "/ok", {}) as resp:
+            resp.read(2)
+        self._get("/ok")
+        self.assertEqual(len(self.server.peers), 2)
+
+    def test_same_origin_redirect_followed(self):
+        self.assertEqual(self._get("/redirect"), (200, b'{"ok": true}'))
+
+    def test_cross_origin_redirect_blocked(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._get("/offsite")
+        self.assertIn("Cross-origin redirect blocked", str(ctx.exception))
+
+    def test_error_status_raises_http_error(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._get("/nope")
+        self.assertEqual(ctx.exception.code, 404)
+        self.assertEqual(ctx.exception.read(), b"missing")
+
+    def test_proxy_falls_back_to_urllib(self):
+        """With a proxy configured, _open() bypasses the pool."""
+        with patch.object(sync_common.urllib.request, "getproxies") as proxies:
+            proxies.return_value = {"https": "http://proxy:3128"}
+            with patch.object(sync_common._opener, "open") as mock_open:
+                sync_common._open("https://api.github.com/x", {})
+        mock_open.assert_called_once()
+
+
+def _tree_entry(path, kind="blob", mode="100644"):
+    return {"path": path, "type": kind, "mode": mode, "sha": path, "size": 1}
+
+
+class TestRepoTree(unittest.TestCase):
+    """Tests for RepoTree and the memoized get_repo_tree()."""
+
+    ENTRIES = [
+        _tree_entry("skills", "tree", "040000"),
+        _tree_entry("skills/dev", "tree", "040000"),
+        _tree_entry("skills/dev/SKILL.md"),
+        _tree_entry("skills/dev/scripts", "tree", "040000"),
+        _tree_entry("skills/dev/scripts/run.py"),
+        _tree_entry("skills/dev/link", mode="120000"),
+    ]
+
+    def setUp(self):
+        sync_common.clear_repo_tree_cache()
+        self.addCleanup(sync_common.clear_repo_tree_cache)
+
+    def test_listdir_uses_contents_api_shape(self):
+        tree = sync_common.RepoTree(self.ENTRIES)
+        entries = {e["name"]: e["type"] for e in tree.listdir("skills/dev")}
+        self.assertEqual(entries, {"SKILL.md": "file", "scripts": "dir"})
+        self.assertEqual(tree.listdir("missing"), [])
+
+    def test_walk_returns_nested_files_with_rel_path(self):
+        tree = sync_common.RepoTree(self.ENTRIES)
+        rel_paths = [f["rel_path"] for f in tree.walk("skills/dev")]
+        self.assertEqual(rel_paths, ["SKILL.md", "scripts/run.py"])
+
+    def test_tree_is_fetched_once(self):
+        fetch = lambda url: {"tree": self.ENTRIES, "truncated": False}  # noqa: E731
+        with patch.object(sync_common, "_api_get", side_effect=fetch) as mock_get:
+            first = sync_common.get_repo_tree("owner/repo", "main")
+            second = sync_common.get_repo_tree("owner/repo", "main")
+        self.assertIs(first, second)
+        mock_get.assert_called_once_with(
+            "https://api.github.com/repos/owner/repo/git/trees/main?recursive=1"
+        )
+
+    def test_truncated_tree_is_rejected(self):
+        data = {"tree": self.ENTRIES, "truncated": True}
+        tree = sync_common.get_repo_tree("owner/repo", "main", fetch=lambda _: data)
+        self.assertIsNone(tree)
+        # A truncated listing is GitHub's final answer: not requested again
+        fetch = lambda _: self.fail("refetched")  # noqa: E731
+        self.assertIsNone(sync_common.get_repo_tree("owner/repo", "main", fetch=fetch))
+
+    def test_failed_fetch_is_not_memoized(self):
+        replies = iter([None, {"tree": self.ENTRIES, "truncated": False}])
+        fetch = lambda _: next(replies)  # noqa: E731
+        self.assertIsNone(sync_common.get_repo_tree("owner/repo", "main", fetch=fetch))
+        tree = sync_common.get_repo_tree("owner/repo", "main", fetch=fetch)
+        self.assertEqual(len(tree.walk("skills/dev")), 2)
+
+    def test_concurrent_callers_share_one_fetch_without_blocking_others(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch(url):
+            calls.append(url)
+            release.wait(5)
+            return {"tree": self.ENTRIES, "truncated": False}
+
+        def lookup():
+            return sync_common.get_repo_tree("o/r", "main", fetch=slow_fetch)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first, second = pool.submit(lookup), pool.submit(lookup)
+            # Another branch is not held up by the listing in progress
+            other = sync_common.get_repo_tree(
+                "o/r", "dev", fetch=lambda _: {"tree": [], "truncated": False}
+            )
+            self.assertIsNotNone(other)
+            release.set()
+            self.assertIs(first.result(), second.result())
+        self.assertEqual(len(calls), 1)
+
+
+def _tarball(members):
+    """Build an in-memory GitHub-style tarball from (name, kind, data) tuples."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, kind, data in members:
+            info = tarfile.TarInfo(name)
+            if kind == "file":
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+                continue
+            if kind == "dir":
+                info.type = tarfile.DIRTYPE
+            else:
+                info.type = tarfile.SYMTYPE if kind == "symlink" else tarfile.LNKTYPE
+                info.linkname = data.decode()
+            tar.addfile(info)
+    buf.seek(0)
+    return buf
+
+
+class TestRepoArchive(unittest.TestCase):
+    """Tests for the --bulk archive extraction."""
+
+    PREFIX = "cli-tool/components/agents"
+
+    def setUp(self):
+        self.archive = sync_common.RepoArchive()
+        self.addCleanup(self.archive.close)
+
+    def _extract(self, members, max_bytes=10_000):
+        sync_common._extract_archive(
+            _tarball(members), self.archive, (self.PREFIX,), max_bytes
+        )
+
+    def test_extracts_only_prefixed_regular_files(self):
+        self._extract(
+            [
+                ("repo-main/", "dir", b""),
+                ("repo-main/README.md", "file", b"outside"),
+                (f"repo-main/{self.PREFIX}/dev/coder.md", "file", b"# coder"),
+                (f"repo-main/{self.PREFIX}/dev/link.md", "symlink", b"/etc/passwd"),
+                (f"repo-main/{self.PREFIX}/dev/hard.md", "hardlink", b"x"),
+                (f"repo-main/{self.PREFIX}/../../../evil.md", "file", b"evil"),
+            ]
+        )
+        self.assertEqual(
+            self.archive.read_text(f"{self.PREFIX}/dev/coder.md"), "# coder"
+        )
+        files = self.archive.tree.walk(self.PREFIX)
+        self.assertEqual([f["rel_path"] for f in files], ["dev/coder.md"])
+        # Same blob SHA as `git hash-object`
+        self.assertEqual(files[0]["sha"], sync_common._git_blob_sha(b"# coder"))
+        self.assertIsNone(self.archive.read_text("README.md"))
+        self.assertFalse((self.archive.root.parent / "evil.md").exists())
+
+    def test_extracted_size_is_capped(self):
+        with self.assertRaises(sync_common.ArchiveError):
+            self._extract([(f"r/{self.PREFIX}/big.md", "file", b"x" * 200)], 100)
+
+    def test_corrupt_archive_raises(self):
+        with self.assertRaises(sync_common.ArchiveError):
+            sync_common._extract_archive(
+                io.BytesIO(b"not a tarball"), self.archive, (self.PREFIX,), 100
+            )
+
+    def test_declared_size_over_cap_aborts_download(self):
+        response = _FakeResponse(b"", {"Content-Length": "500"})
+        with patch.object(sync_common, "_open", return_value=response):
+            with self.assertRaises(sync_common.ArchiveError):
+                sync_common._download_to_file(
+                    "https://codeload.github.com/o/r/tar.gz/main", io.BytesIO(), 100
+                )
+
+
+class TestFetchBlobOids(unittest.TestCase):
+    """Tests for the batched GraphQL freshness lookup."""
+
+    def _reply(self, oids):
+        data = {
+            f"f{i}": ({"oid": oid} if oid else None) for i, oid in enumerate(oids)
+        }
+        body = json.dumps({"data": {"repository": data}}).encode()
+        return (body, {}, 200)
+
+    def test_requires_token(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with patch.object(sync_common, "_http_request") as mock_request:
+                self.assertIsNone(sync_common.fetch_blob_oids("o/r", "main", ["a"]))
+        mock_request.assert_not_called()
+
+    def test_batches_paths_and_maps_missing_to_none(self):
+        replies = [self._reply(["1", None]), self._reply(["3"])]
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "t"}):
+            with patch.object(
+                sync_common, "_http_request", side_effect=replies
+            ) as mock_request:
+                oids = sync_common.fetch_blob_oids(
+                    "owner/repo", "main", ["a.md", "b.md", "c.md"], batch_size=2
+                )
+        self.assertEqual(oids, {"a.md": "1", "b.md": None, "c.md": "3"})
+        self.assertEqual(mock_request.call_count, 2)
+        payload = json.loads(mock_request.call_args_list[0].kwargs["data"])
+        self.assertEqual(payload["variables"]["e1"], "main:b.md")
+        self.assertEqual(payload["variables"]["owner"], "owner")
+
+    def test_graphql_errors_abort_prepass(self):
+        body = json.dumps({"errors": [{"message": "bad"}]}).encode()
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "t"}):
+            with patch.object(
+                sync_common, "_http_request", return_value=(body, {}, 200)
+            ):
+                self.assertIsNone(sync_common.fetch_blob_oids("o/r", "main", ["a"]))
+
+
+class TestFixtureStore(unittest.TestCase):
+    """Tests for FixtureStore: offline record/replay below _open()."""
+
+    URL = "https://raw.githubusercontent.com/o/r/main/a.md"
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = Path(self.tmpdir.name) / "fixtures"
+
+    def _request(self, store, headers=None):
+        with patch.object(sync_common, "fixture_store", store):
+            with patch.object(sync_common.rate_limiter, "acquire"):
+                return sync_common._http_request(
+                    self.URL, headers=headers or {}, max_retries=2, backoff=0
+                )
+
+    def _record(self, transport, headers=None, clock=lambda: 1000.0):
+        store = sync_common.FixtureStore(
+            self.root, "record", transport=transport, clock=clock
+        )
+        return self._request(store, headers)
+
+    def test_record_then_replay_offline(self):
+        headers = {"ETag": '"v1"', "X-RateLimit-Reset": "1100"}
+        self._record(lambda *a, **k: _FakeResponse(b"agent body", headers))
+
+        store = sync_common.FixtureStore(self.root, "replay", clock=lambda: 5000.0)
+        with patch.object(sync_common, "_open_network") as network:
+            body, resp_headers, status = self._request(store)
+        network.assert_not_called()
+        self.assertEqual((body, status), (b"agent body", 200))
+        self.assertEqual(resp_headers.get("etag"), '"v1"')
+        # Reset is shifted by the time elapsed since recording
+        self.assertEqual(resp_headers.get("X-RateLimit-Reset"), "5100")
+
+    def test_conditional_requests_replay_304(self):
+        conditional = {"If-None-Match": '"v1"'}
+
+        def not_modified(url, *args, **kwargs):
+            raise urllib.error.HTTPError(url, 304, "Not Modified", {}, None)
+
+        self._record(not_modified, headers=conditional)
+        store = sync_common.FixtureStore(self.root, "replay")
+        self.assertEqual(self._request(store, headers=conditional)[2], 304)
+        # Without the conditional header it is a different, unrecorded request
+        self.assertIsNone(self._request(store))
+        self.assertEqual(store.misses, 1)
+
+    def test_authorization_not_part_of_key(self):
+        key = sync_common.FixtureStore.key
+        self.assertEqual(
+            key(self.URL, {"Authorization": "token a"}),
+            key(self.URL, {"Authorization": "token b"}),
+        )
+        self.assertNotEqual(key(self.URL, {}), key(self.URL, {}, data=b"{}"))
+
+    def test_injected_rate_limit_and_latency(self):
+        self._record(lambda *a, **k: _FakeResponse(b"x", {}))
+        sleeps = []
+        store = sync_common.FixtureStore(
+            self.root,
+            "replay",
+            latency=0.25,
+            rate_limit_every=1,
+            retry_after=3,
+            sleep=sleeps.append,
+        )
+        with patch.object(sync_common.rate_limiter, "penalize") as penalize:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                self._request(store)
+        self.assertEqual(ctx.exception.code, 429)
+        penalize.assert_called_with("raw.githubusercontent.com", 3, "core")
+        self.assertEqual(sleeps, [0.25, 0.25])
+
+    def test_cli_options_install_store(self):
+        import argparse
+
+        parser = argparse.ArgumentParser()
+        sync_common.add_fixture_arguments(parser)
+        args = parser.parse_args(["--replay", str(self.root), "--replay-latency", "1"])
+        with patch.object(sync_common, "fixture_store", None):
+            store = sync_common.install_fixture_store(args)
+            self.assertIs(sync_common.fixture_store, store)
+        self.assertEqual((store.mode, store.latency), ("replay", 1.0))
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            parser.parse_args(["--record", "a", "--replay", "b"])
+
+
+class TestStreamingReads(unittest.TestCase):
+    """Tests for the chunked, size-capped body reads of _http_request()."""
+
+    URL = "https://raw.githubusercontent.com/o/r/main/x.md"
+
+    def _request(self, response, **kwargs):
+        with patch.object(sync_common, "_open", return_value=response):
+            return sync_common._http_request(self.URL, headers={}, **kwargs)
+
+    def test_declared_oversize_aborts_before_reading(self):
+        response = _FakeResponse(b"x" * 10, {"Content-Length": "5000"})
+        with self.assertRaises(sync_common.ResponseTooLargeError):
+            self._request(response, max_read_bytes=100)
+        self.assertEqual(response.read(), b"x" * 10)  # body left untouched
+
+    def test_undeclared_oversize_aborts_while_streaming(self):
+        response = _FakeResponse(b"x" * 200_000, {})
+        with self.assertRaises(sync_common.ResponseTooLargeError):
+            self._request(response, max_read_bytes=100_000)
+        self.assertNotEqual(response.read(), b"")  # stopped early
+
+    def test_hasher_is_fed_while_reading(self):
+        body = "é" * 100_000
+        hasher = hashlib.sha256()
+        result = self._request(
+            _FakeResponse(body.encode(), {}), max_read_bytes=None, hasher=hasher
+        )
+        self.assertEqual(result[0], body.encode())
+        expected = hashlib.sha256(body.encode()).hexdigest()
+        self.assertEqual(hasher.hexdigest(), expected)
+
+    def test_cached_get_records_streamed_hash(self):
+        cache = {}
+        response = _FakeResponse(b"hi", {})
+        with patch.object(sync_common, "_open", return_value=response):
+            content = sync_common._cached_get(self.URL, "agent", cache)
+        self.assertEqual(content, "hi")
+        self.assertEqual(cache["agent"]["sha256"], hashlib.sha256(b"hi").hexdigest())
+
+    def test_oversize_raw_get_raises_instead_of_truncating(self):
+        response = _FakeResponse(b"x" * (sync_common._RAW_MAX_BYTES + 1), {})
+        with patch.object(sync_common, "_open", return_value=response):
+            with self.assertRaises(sync_common.ResponseTooLargeError):
+                sync_common._raw_get(self.URL)
+
+    def test_oversize_api_get_returns_none(self):
+        response = _FakeResponse(b"[]", {"Content-Length": str(20 * 1024 * 1024)})
+        with patch.object(sync_common, "_open", return_value=response):
+            self.assertIsNone(sync_common._api_get("https://api.github.com/x"))
+
+
+class TestStagedDirectory(unittest.TestCase):
+    """Tests for StagedDirectory: whole-directory swap with rollback."""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmp = Path(tmpdir.name)
+        self.target = self.tmp / "skill"
+        (self.target / "ref").mkdir(parents=True)
+        (self.target / "SKILL.md").write_text("old", encoding="utf-8")
+        (self.target / "ref" / "api.md").write_text("api", encoding="utf-8")
+
+    def test_commit_swaps_seeded_copy(self):
+        with sync_common.StagedDirectory(self.target) as stage:
+            stage.write_text(stage.path / "SKILL.md", "new")
+            # Seeded files are hard links; the live version is not written
+            self.assertEqual((self.target / "SKILL.md").read_text(), "old")
+            stage.commit()
+        self.assertEqual((self.target / "SKILL.md").read_text(), "new")
+        self.assertEqual((self.target / "ref" / "api.md").read_text(), "api")
+        self.assertEqual([p.name for p in self.tmp.iterdir()], ["skill"])
+
+    def test_unseeded_stage_keeps_only_listed_files(self):
+        with sync_common.StagedDirectory(self.target, seed=False) as stage:
+            self.assertTrue(stage.keep("ref/api.md"))
+            self.assertFalse(stage.keep("missing.md"))
+            with self.assertRaises(ValueError):
+                stage.keep("../outside.md")
+            stage.commit()
+        self.assertEqual([p.name for p in self.target.iterdir()], ["ref"])
+        self.assertEqual((self.target / "ref" / "api.md").read_text(), "api")
+
+    def test_uncommitted_stage_is_discarded(self):
+        with self.assertRaises(RuntimeError):
+            with sync_common.StagedDirectory(self.target) as stage:
+                stage.write_text(stage.path / "SKILL.md", "new")
+                raise RuntimeError("download failed")
+        self.assertEqual((self.target / "SKILL.md").read_text(), "old")
+        self.assertEqual([p.name for p in self.tmp.iterdir()], ["skill"])
+
+    def test_failed_swap_restores_previous_version(self):
+        real_rename = os.rename
+
+        def _rename(src, dst):
+            if Path(src) == stage.path:
+                raise OSError("rename failed")
+            real_rename(src, dst)
+
+        with sync_common.StagedDirectory(self.target) as stage:
+            stage.write_text(stage.path / "SKILL.md", "new")
+            with patch.object(sync_common.os, "rename", side_effect=_rename):
+                with self.assertRaises(OSError):
+                    stage.commit()
+        self.assertEqual((self.target / "SKILL.md").read_text(), "old")
+
+    def _dead_pid(self):
+        child = subprocess.Popen([sys.executable, "-c", ""])
+        child.wait()
+        return child.pid
+
+    def test_recover_restores_moved_aside_version(self):
+        pid = self._dead_pid()
+        backup = self.tmp / f".skill.staging-{pid}.old"
+        os.rename(self.target, backup)
+        (self.tmp / f".skill.staging-{pid}").mkdir()
+        sync_common.StagedDirectory.recover(self.target)
+        self.assertEqual((self.target / "SKILL.md").read_text(), "old")
+        self.assertEqual([p.name for p in self.tmp.iterdir()], ["skill"])
+
+    def test_recover_spares_live_process_until_stale(self):
+        """Another running sync's staging directory is only removed once old."""
+        live = self.tmp / f".skill.staging-{os.getppid()}"
+        live.mkdir()
+        sync_common.StagedDirectory.recover(self.target)
+        self.assertTrue(live.is_dir())
+
+        stale = time.time() - sync_common.STAGING_STALE_AFTER - 1
+        os.utime(live, (stale, stale))
+        sync_common.StagedDirectory.recover(self.target)
+        self.assertFalse(live.exists())
+
+
+class TestSyncJournal(unittest.TestCase):
+    """Tests for the SyncJournal checkpoint used by --resume."""
+
+    HEADER = {"script": "sync-agents", "repo": "o/r"}
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = Path(tmpdir.name) / sync_common.sync_journal_filename(
+            "sync-agents"
+        )
+
+    def _interrupted_run(self):
+        journal = sync_common.SyncJournal(self.path, self.HEADER)
+        journal.open()
+        journal.record("agent", "alpha", entry={"name": "alpha"}, cache={"oid": "1"})
+        journal.close(completed=False)
+        # A crash mid-write leaves a truncated last line
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write('{"kind": "agent", "name": "be')
+
+    def test_resume_returns_completed_records(self):
+        self._interrupted_run()
+        journal = sync_common.SyncJournal(self.path, self.HEADER)
+        done = journal.open(resume=True)
+        self.assertEqual(list(done["agent"]), ["alpha"])
+        self.assertEqual(done["agent"]["alpha"]["cache"], {"oid": "1"})
+        journal.record("agent", "beta", entry={"name": "beta"})
+        journal.close(completed=False)
+        self.assertEqual(sorted(journal.load()["agent"]), ["alpha", "beta"])
+
+    def test_fresh_run_starts_over(self):
+        self._interrupted_run()
+        journal = sync_common.SyncJournal(self.path, self.HEADER)
+        self.assertEqual(journal.open(resume=False), {})
+        journal.close(completed=False)
+        self.assertEqual(journal.load(), {})
+
+    def test_resume_of_another_run_is_refused(self):
+        """A journal written with other options is neither resumed nor reset."""
+        self._interrupted_run()
+        before = self.path.read_bytes()
+        other = sync_common.SyncJournal(self.path, dict(self.HEADER, tier="all"))
+        with self.assertRaises(sync_common.SyncJournalMismatch) as ctx:
+            other.open(resume=True)
+        self.assertIn("tier: None != 'all'", str(ctx.exception))
+        self.assertEqual(self.path.read_bytes(), before)
+
+    def test_each_script_has_its_own_journal(self):
+        names = {
+            sync_common.sync_journal_filename(script)
+            for script in ("sync-agents", "sync-all", "sync-skills")
+        }
+        self.assertEqual(len(names), 3)
+
+    def test_completed_run_removes_journal(self):
+        journal = sync_common.SyncJournal(self.path, self.HEADER)
+        journal.open()
+        journal.close(completed=True)
+        self.assertFalse(self.path.exists())
+
+
+class TestAsyncSyncCore(unittest.TestCase):
+    """Tests for run_sync() / sync_items(), the shared asyncio core."""
+
+    def _run(self, items, worker, jobs):
+        results = []
+        completed = sync_common.run_sync(
+            items, worker, lambda *r: results.append(r), jobs=jobs
+        )
+        self.assertTrue(completed)
+        return results
+
+    def test_results_in_input_order(self):
+        def worker(n):
+            # Earlier items finish last
+            time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        results = self._run(range(5), worker, jobs=4)
+        self.assertEqual([item for item, _r, _e in results], [0, 1, 2, 3, 4])
+        self.assertEqual([r for _i, r, _e in results], [0, 10, 20, 30, 40])
+
+    def test_errors_are_captured(self):
+        def worker(n):
+            if n == 1:
+                raise RuntimeError("boom")
+            return n
+
+        results = self._run([0, 1, 2], worker, jobs=2)
+        self.assertIsNone(results[1][1])
+        self.assertIsInstance(results[1][2], RuntimeError)
+        self.assertEqual(results[2][1:], (2, None))
+
+    def test_serial_mode(self):
+        seen = []
+        results = self._run(["a", "b"], lambda x: seen.append(x) or x, jobs=1)
+        self.assertEqual(seen, ["a", "b"])
+        self.assertEqual([r for _i, r, _e in results], ["a", "b"])
+
+    def test_shared_semaphore_bounds_concurrency_across_calls(self):
+        """Agents and skills can run in one loop under a single budget."""
+        lock = threading.Lock()
+        active = [0, 0]  # current, peak
+
+        def worker(n):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return n
+
+        seen = []
+
+        def record(*result):
+            seen.append(result)
+
+        async def main():
+            limit = asyncio.Semaphore(2)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                await asyncio.gather(
+                    *(
+                        sync_common.sync_items(
+                            range(4), worker, record, limit=limit, executor=executor
+                        )
+                        for _ in range(2)
+                    )
+                )
+
+        asyncio.run(main())
+        self.assertEqual(len(seen), 8)
+        self.assertLessEqual(active[1], 2)
+
+    def test_run_sync_groups_orders_each_group(self):
+        agents, skills = [], []
+        completed = sync_common.run_sync_groups(
+            [
+                (["b", "a"], str.upper, lambda *r: agents.append(r[1])),
+                ([3, 1, 2], lambda n: n * 2, lambda *r: skills.append(r[1])),
+            ],
+            jobs=3,
+        )
+        self.assertTrue(completed)
+        self.assertEqual(agents, ["B", "A"])
+        self.assertEqual(skills, [6, 2, 4])
+
+    def test_pipeline_chains_stages_in_input_order(self):
+        def fetch(n, _value):
+            time.sleep(0.01 * (4 - n))  # earlier items download last
+            return n
+
+        results = []
+        completed = sync_common.run_pipeline(
+            range(4),
+            [fetch, lambda n, v: v * 10, lambda n, v: f"wrote {v}"],
+            lambda *r: results.append(r),
+            workers=[4, 1, 1],
+        )
+        self.assertTrue(completed)
+        self.assertEqual(results, [(n, f"wrote {n * 10}", None) for n in range(4)])
+
+    def test_pipeline_stage_result_and_errors_skip_later_stages(self):
+        written = []
+
+        def fetch(n, _value):
+            if n == 0:
+                return sync_common.StageResult("unchanged")
+            if n == 1:
+                raise OSError("gone")
+            return n
+
+        def write(n, value):
+            written.append(n)
+            return value
+
+        results = []
+        sync_common.run_pipeline(
+            [0, 1, 2], [fetch, write], lambda *r: results.append(r), workers=[2, 1]
+        )
+        self.assertEqual(written, [2])
+        self.assertEqual(results[0], (0, "unchanged", None))
+        self.assertIsInstance(results[1][2], OSError)
+        self.assertEqual(results[2], (2, 2, None))
+
+    def test_pipeline_overlaps_fetch_with_writes(self):
+        """Downloads keep going while an earlier item is being written."""
+        events = []
+        lock = threading.Lock()
+
+        def fetch(n, _value):
+            with lock:
+                events.append(("fetch", n))
+            return n
+
+        def write(n, value):
+            if n == 0:
+                time.sleep(0.05)
+            with lock:
+                events.append(("write", n))
+            return value
+
+        sync_common.run_pipeline(
+            range(3), [fetch, write], lambda *r: None, workers=[1, 1], queue_size=4
+        )
+        self.assertLess(events.index(("fetch", 2)), events.index(("write", 0)))
+
+    def test_rate_limited_item_is_parked_not_blocking(self):
+        """A deferred item frees its slot; it is retried after the wait."""
+        calls = []
+
+        def worker(n):
+            calls.append(n)
+            if n == 0 and calls.count(0) == 1:
+                raise sync_common.RateLimited("api.github.com", 0.05)
+            return n
+
+        results = self._run([0, 1, 2], worker, jobs=1)
+        self.assertEqual(calls, [0, 1, 2, 0])
+        self.assertEqual([r for _i, r, _e in results], [0, 1, 2])
+
+    def test_pipeline_keeps_writing_while_fetch_is_parked(self):
+        events = []
+
+        def fetch(n, _value):
+            if n == 0 and ("fetch", 0) not in events:
+                events.append(("fetch", 0))
+                raise sync_common.RateLimited("raw.githubusercontent.com", 0.05)
+            events.append(("fetch", n))
+            return n
+
+        def write(n, value):
+            events.append(("write", n))
+            return value
+
+        results = []
+        completed = sync_common.run_pipeline(
+            range(3), [fetch, write], lambda *r: results.append(r), workers=[1, 1]
+        )
+        self.assertTrue(completed)
+        self.assertEqual(results, [(n, n, None) for n in range(3)])
+        # Items 1 and 2 were written before item 0 was fetched again
+        self.assertEqual(events[-2:], [("fetch", 0), ("write", 0)])
+
+    def _persistent_403(self, schedule):
+        """Run *schedule* with every request answered by a 403 + reset."""
+        limiter = sync_common.RateLimiter(defer_threshold=0.01)
+        # Keep the real penalty logic but make every park short
+        penalize = limiter.penalize
+        calls = []
+
+        def forbidden(url, headers, **_kwargs):
+            calls.append(url)
+            reset = str(int(time.time()) + 3600)
+            raise urllib.error.HTTPError(
+                url,
+                403,
+                "Forbidden",
+                {"X-RateLimit-Reset": reset, "X-RateLimit-Remaining": "4990"},
+                None,
+            )
+
+        short_penalty = patch.object(
+            limiter, "penalize", lambda h, _s, r: penalize(h, 0.05, r)
+        )
+        with patch.object(sync_common, "rate_limiter", limiter), short_penalty:
+            with patch.object(sync_common, "_open", side_effect=forbidden):
+                started = time.monotonic()
+                results = schedule(
+                    lambda url: sync_common._http_request(url, headers={})
+                )
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(len(calls), sync_common.RATE_LIMIT_MAX_PARKS)
+        return results
+
+    def test_persistent_403_fails_after_park_budget(self):
+        """A limit that never lifts fails the item instead of re-parking it."""
+        results = self._persistent_403(
+            lambda fetch: self._run(["https://api.github.com/x"], fetch, jobs=1)
+        )
+        [(_item, result, error)] = results
+        self.assertIsNone(result)
+        self.assertIsInstance(error, urllib.error.HTTPError)
+        self.assertEqual(error.code, 403)
+
+    def test_pipeline_persistent_403_fails_after_park_budget(self):
+        results = []
+
+        def schedule(fetch):
+            completed = sync_common.run_pipeline(
+                ["https://api.github.com/x"],
+                [lambda url, _value: fetch(url)],
+                lambda *r: results.append(r),
+                workers=[1],
+            )
+            self.assertTrue(completed)
+            return results
+
+        [(_item, result, error)] = self._persistent_403(schedule)
+        self.assertIsNone(result)
+        self.assertEqual(error.code, 403)
+
+    def test_interrupt_returns_false(self):
+        def on_result(item, result, error):
+            raise KeyboardInterrupt
+
+        completed = sync_common.run_sync([1, 2, 3], lambda n: n, on_result, jobs=2)
+        self.assertFalse(completed)
+
+    def test_interrupt_reports_in_flight_items(self):
+        """Ctrl-C drops pending items but still reports running ones."""
+        second_started = threading.Event()
+
+        def worker(n):
+            if n == 0:
+                second_started.wait(5)
+                os.kill(os.getpid(), signal.SIGINT)
+                time.sleep(0.1)
+            elif n == 1:
+                second_started.set()
+                time.sleep(0.2)
+            return n * 10
+
+        results = []
+        completed = sync_common.run_sync(
+            range(4), worker, lambda *r: results.append(r), jobs=2
+        )
+        self.assertFalse(completed)
+        self.assertEqual(results, [(0, 0, None), (1, 10, None)])
+
+    def test_pipeline_interrupt_reports_items_caught_between_stages(self):
+        """Ctrl-C reports written items and fails the half-processed ones."""
+        first_written = threading.Event()
+        third_started = threading.Event()
+        written = []
+
+        def fetch(n, _value):
+            if n == 1:
+                first_written.wait(5)
+                third_started.wait(5)
+                os.kill(os.getpid(), signal.SIGINT)
+                time.sleep(0.1)
+            elif n == 2:
+                third_started.set()
+                time.sleep(0.2)
+            return n
+
+        def write(n, value):
+            written.append(n)
+            first_written.set()
+            return f"wrote {value}"
+
+        results = []
+        completed = sync_common.run_pipeline(
+            range(4), [fetch, write], lambda *r: results.append(r), workers=[2, 1]
+        )
+        self.assertFalse(completed)
+        self.assertEqual(written, [0])
+        self.assertEqual(results[0], (0, "wrote 0", None))
+        self.assertEqual([item for item, _v, _e in results], [0, 1, 2])
+        for _item, value, error in results[1:]:
+            self.assertIsNone(value)
+            self.assertIsInstance(error, sync_common.PipelineInterrupted)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
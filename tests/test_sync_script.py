@@ -28,9 +28,10 @@ sys.path.insert(0, str(SCRIPTS_DIR))
 import importlib
 
 sync_agents = importlib.import_module("sync-agents")
+import sync_common  # noqa: E402
 
 # Fonctions a tester
-parse_frontmatter = sync_agents.parse_frontmatter
+parse_frontmatter = sync_common.parse_frontmatter
 extract_short_description = sync_agents.extract_short_description
 build_permissions = sync_agents.build_permissions
 clean_body = sync_agents.clean_body
@@ -1012,6 +1013,229 @@ You are a fullstack developer.
         self.assertEqual(result["mode"], "primary")
 
 
+    @patch.object(sync_agents, "_raw_get")
+    def test_sync_reads_from_bulk_archive(self, mock_raw_get):
+        """Verifie qu'en mode --bulk la source est lue dans l'archive locale."""
+        archive = sync_common.RepoArchive()
+        self.addCleanup(archive.close)
+        source = archive.root / sync_agents.AGENTS_BASE_PATH / "development-tools"
+        source.mkdir(parents=True)
+        (source / "test-agent.md").write_text(self.SAMPLE_SOURCE, encoding="utf-8")
+
+        result = sync_agent(
+            "test-agent",
+            "development-tools/test-agent",
+            "davila7/claude-code-templates",
+            self.output_dir,
+            force=True,
+            archive=archive,
+        )
+        self.assertEqual(result["status"], "synced")
+        self.assertTrue((self.output_dir / "devtools" / "test-agent.md").exists())
+        mock_raw_get.assert_not_called()
+
+        missing = sync_agent(
+            "other-agent",
+            "development-tools/other-agent",
+            "davila7/claude-code-templates",
+            self.output_dir,
+            archive=archive,
+        )
+        self.assertIsNone(missing)
+
+    def test_sync_same_oid_skips_request(self):
+        """Verifie qu'un OID de blob inchange evite toute requete HTTP."""
+        agent_file = self.output_dir / "devtools" / "test-agent.md"
+        agent_file.parent.mkdir(parents=True)
+        agent_file.write_text("existing", encoding="utf-8")
+        cache = {"test-agent": {"etag": '"e1"', "oid": "abc"}}
+
+        with patch.object(sync_agents, "_cached_get") as mock_cached_get:
+            result = sync_agent(
+                "test-agent",
+                "development-tools/test-agent",
+                "davila7/claude-code-templates",
+                self.output_dir,
+                incremental=True,
+                sync_cache=cache,
+                upstream_oid="abc",
+            )
+        self.assertEqual(result["status"], "unchanged")
+        mock_cached_get.assert_not_called()
+
+    def test_sync_new_oid_refetches_and_records_oid(self):
+        """Verifie qu'un OID different declenche le telechargement et est stocke."""
+        cache = {"test-agent": {"etag": '"e1"', "oid": "old"}}
+
+        def fake_cached_get(url, name, sync_cache):
+            sync_cache[name] = {"etag": '"e2"', "sha256": "x"}
+            return self.SAMPLE_SOURCE
+
+        with patch.object(sync_agents, "_cached_get", side_effect=fake_cached_get):
+            result = sync_agent(
+                "test-agent",
+                "development-tools/test-agent",
+                "davila7/claude-code-templates",
+                self.output_dir,
+                incremental=True,
+                sync_cache=cache,
+                upstream_oid="new",
+            )
+        self.assertEqual(result["status"], "synced")
+        self.assertEqual(cache["test-agent"]["oid"], "new")
+
+    def test_pipeline_stages_match_sync_agent(self):
+        """Verifie que transform_agent + write_agent produisent le meme fichier."""
+        rendered = sync_agents.transform_agent(
+            "test-agent", "development-tools/test-agent", self.SAMPLE_SOURCE
+        )
+        meta, agent_md, entry = rendered
+        self.assertEqual(meta["name"], "test-agent")
+        self.assertNotIn("status", entry)
+
+        result = sync_agents.write_agent("test-agent", rendered, self.output_dir)
+        self.assertEqual(result["status"], "synced")
+        written = (self.output_dir / "devtools" / "test-agent.md").read_text(
+            encoding="utf-8"
+        )
+        self.assertEqual(written, agent_md)
+
+        # Second write without --force is skipped
+        again = sync_agents.write_agent("test-agent", rendered, self.output_dir)
+        self.assertEqual(again["status"], "skipped")
+
+    def test_transform_cache_reused_on_forced_rebuild(self):
+        """Verifie qu'un rebuild force reutilise le markdown si rien n'a change."""
+        cache = {}
+        args = ("test-agent", "development-tools/test-agent", self.SAMPLE_SOURCE)
+        first = sync_agents.transform_agent(*args, transform_cache=cache)
+        self.assertIn("test-agent", cache)
+
+        with patch.object(sync_agents, "build_opencode_agent") as mock_build:
+            second = sync_agents.transform_agent(*args, transform_cache=cache)
+        mock_build.assert_not_called()
+        self.assertEqual(second[1], first[1])
+
+    def test_transform_cache_invalidated_by_inputs(self):
+        """Verifie que source, permissions, mode ou convertisseur invalident."""
+        cache = {}
+        name, path = "test-agent", "development-tools/test-agent"
+        sync_agents.transform_agent(
+            name, path, self.SAMPLE_SOURCE, transform_cache=cache
+        )
+
+        changed_inputs = [
+            dict(content=self.SAMPLE_SOURCE + "\nMore."),
+            dict(content=self.SAMPLE_SOURCE, permissions=UNKNOWN_PERMISSIONS),
+        ]
+        for kwargs in changed_inputs:
+            content = kwargs.pop("content")
+            with patch.object(
+                sync_agents,
+                "build_opencode_agent",
+                wraps=sync_agents.build_opencode_agent,
+            ) as mock_build:
+                sync_agents.transform_agent(
+                    name, path, content, transform_cache=cache, **kwargs
+                )
+            mock_build.assert_called_once()
+
+        # Promoting the agent to primary changes its mode: line
+        primary = sync_agents.PRIMARY_AGENTS | {name}
+        with patch.object(sync_agents, "PRIMARY_AGENTS", primary):
+            rendered = sync_agents.transform_agent(
+                name, path, self.SAMPLE_SOURCE, transform_cache=cache
+            )
+        self.assertIn("mode: primary", rendered[1])
+
+        with patch.object(sync_agents, "CONVERTER_VERSION", "next"), patch.object(
+            sync_agents, "build_opencode_agent", return_value="rebuilt"
+        ) as mock_build:
+            sync_agents.transform_agent(
+                name,
+                path,
+                self.SAMPLE_SOURCE,
+                permissions=UNKNOWN_PERMISSIONS,
+                transform_cache=cache,
+            )
+        mock_build.assert_called_once()
+
+    def test_score_error_counts_agent_once(self):
+        """Verifie qu'un echec de --score laisse l'agent compte comme synchronise."""
+        import quality_scorer
+
+        stats_path = self.output_dir / "stats.json"
+        argv = [
+            "sync-agents.py",
+            "--output-dir",
+            str(self.output_dir / "agents"),
+            "--force",
+            "--score",
+            "--stats-json",
+            str(stats_path),
+        ]
+        agents = {"test-agent": "development-tools/test-agent"}
+        with patch.object(sys, "argv", argv), patch.object(
+            sync_agents, "CURATED_AGENTS", agents
+        ), patch.object(
+            sync_agents, "fetch_agent_source", return_value=self.SAMPLE_SOURCE
+        ), patch.object(
+            quality_scorer, "score_agent", side_effect=ValueError("boom")
+        ), patch(
+            "builtins.print"
+        ):
+            code = sync_agents.main()
+
+        self.assertEqual(code, 0)
+        summary = json.loads(stats_path.read_text(encoding="utf-8"))["summary"]
+        self.assertEqual(summary["synced"], 1)
+        self.assertEqual(summary["failed"], 0)
+        self.assertEqual(summary["score_errors"], 1)
+
+    def _incremental_run(self, write_agent):
+        """Lance main() avec un cache existant ; le fetch renouvelle l'ETag."""
+        agents_dir = self.output_dir / "agents"
+        _save_sync_cache(agents_dir, {"test-agent": {"etag": '"old"'}})
+
+        def fetch(name, *_args, sync_cache, **_kwargs):
+            sync_cache[name] = {"etag": '"new"'}
+            return self.SAMPLE_SOURCE
+
+        argv = ["sync-agents.py", "--output-dir", str(agents_dir)]
+        agents = {"test-agent": "development-tools/test-agent"}
+        with patch.object(sys, "argv", argv), patch.object(
+            sync_agents, "CURATED_AGENTS", agents
+        ), patch.object(
+            sync_agents, "fetch_upstream_oids", return_value={}
+        ), patch.object(
+            sync_agents, "fetch_agent_source", side_effect=fetch
+        ), patch.object(
+            sync_agents, "write_agent", side_effect=write_agent
+        ), patch(
+            "builtins.print"
+        ):
+            code = sync_agents.main()
+        return code, _load_sync_cache(agents_dir)
+
+    def test_failed_write_keeps_previous_cache_entry(self):
+        """Verifie qu'un agent non ecrit ne passe pas pour inchange au run suivant."""
+        code, cache = self._incremental_run(OSError("disk full"))
+        self.assertEqual(code, 1)
+        self.assertEqual(cache["test-agent"], {"etag": '"old"'})
+
+    def test_written_agent_updates_cache_entry(self):
+        """Verifie que le nouvel ETag est enregistre une fois l'agent ecrit."""
+        code, cache = self._incremental_run(lambda name, *_a, **_k: {"name": name})
+        self.assertEqual(code, 0)
+        self.assertEqual(cache["test-agent"], {"etag": '"new"'})
+
+    def test_transform_empty_body_returns_none(self):
+        """Verifie qu'un corps vide est rejete par l'etape de transformation."""
+        self.assertIsNone(
+            sync_agents.transform_agent("x", "ai/x", "---\nname: x\n---\n")
+        )
+
+
 # ---------------------------------------------------------------------------
 # Tests _load_sync_cache() / _save_sync_cache()
 # ---------------------------------------------------------------------------
@@ -1262,5 +1486,81 @@ class TestValidateOutputPath(unittest.TestCase):
         validate_output_path(file_path, self.base_dir)
 
 
+# ---------------------------------------------------------------------------
+# Tests --jobs
+# ---------------------------------------------------------------------------
+
+
+class TestJobsArgument(unittest.TestCase):
+    """Tests pour l'argument --jobs du parser CLI."""
+
+    def test_jobs_default(self):
+        """Verifie que --jobs vaut 1 par defaut (execution sequentielle)."""
+        args = build_parser().parse_args([])
+        self.assertEqual(args.jobs, 1)
+
+    def test_jobs_value(self):
+        """Verifie que --jobs/-j accepte un entier."""
+        self.assertEqual(build_parser().parse_args(["--jobs", "8"]).jobs, 8)
+        self.assertEqual(build_parser().parse_args(["-j", "3"]).jobs, 3)
+
+    def test_cache_saved_with_sorted_keys(self):
+        """Verifie que le cache est ecrit dans un ordre deterministe."""
+        tmpdir = tempfile.mkdtemp(prefix="test_jobs_cache_")
+        try:
+            _save_sync_cache(Path(tmpdir), {"zeta": {}, "alpha": {}})
+            raw = (Path(tmpdir) / ".sync-cache.json").read_text(encoding="utf-8")
+            self.assertLess(raw.index('"alpha"'), raw.index('"zeta"'))
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Tests discover_all_agents() (avec mocking)
+# ---------------------------------------------------------------------------
+
+
+class TestDiscoverAllAgents(unittest.TestCase):
+    """Tests pour discover_all_agents() : index Git Trees et repli Contents."""
+
+    def setUp(self):
+        sync_common.clear_repo_tree_cache()
+        self.addCleanup(sync_common.clear_repo_tree_cache)
+
+    def test_discovery_from_tree_uses_single_call(self):
+        """Un seul appel Git Trees suffit a decouvrir tous les agents."""
+        base = sync_agents.AGENTS_BASE_PATH
+        tree = {
+            "truncated": False,
+            "tree": [
+                {"path": base, "type": "tree", "mode": "040000"},
+                {"path": f"{base}/dev", "type": "tree", "mode": "040000"},
+                {"path": f"{base}/dev/coder.md", "type": "blob", "mode": "100644"},
+                {"path": f"{base}/dev/README.md", "type": "blob", "mode": "100644"},
+                {"path": f"{base}/ops", "type": "tree", "mode": "040000"},
+                {"path": f"{base}/ops/sre.md", "type": "blob", "mode": "100644"},
+            ],
+        }
+        with patch.object(sync_agents, "_api_get", return_value=tree) as mock_get:
+            result = sync_agents.discover_all_agents("owner/repo")
+        self.assertEqual(result, {"coder": "dev/coder", "sre": "ops/sre"})
+        mock_get.assert_called_once()
+        self.assertIn("/git/trees/", mock_get.call_args[0][0])
+
+    def test_fallback_to_contents_api(self):
+        """Sans arbre exploitable, le parcours Contents API est utilise."""
+
+        def fake_api_get(url):
+            if "/git/trees/" in url:
+                return {"tree": [], "truncated": True}
+            if url.endswith("/agents"):
+                return [{"type": "dir", "name": "dev"}]
+            return [{"type": "file", "name": "coder.md"}]
+
+        with patch.object(sync_agents, "_api_get", side_effect=fake_api_get):
+            result = sync_agents.discover_all_agents("owner/repo")
+        self.assertEqual(result, {"coder": "dev/coder"})
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
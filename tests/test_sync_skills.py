@@ -13,6 +13,7 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
@@ -28,6 +29,7 @@ sys.path.insert(0, str(SCRIPTS_DIR))
 import importlib
 
 sync_skills = importlib.import_module("sync-skills")
+import sync_common  # noqa: E402
 
 # Functions to test
 transform_skill_md = sync_skills.transform_skill_md
@@ -680,6 +682,29 @@ Content here.
             )
         self.assertIn("Invalid filename", str(ctx.exception))
 
+    @patch.object(sync_skills, "_raw_get")
+    def test_reads_from_bulk_archive(self, mock_raw_get):
+        """With an archive, files are read locally instead of downloaded."""
+        archive = sync_common.RepoArchive()
+        self.addCleanup(archive.close)
+        path = "cli-tool/components/skills/dev/test-skill/guide.md"
+        (archive.root / path).parent.mkdir(parents=True)
+        (archive.root / path).write_text("# Guide\n", encoding="utf-8")
+        file_info = {"path": path, "name": "guide.md", "rel_path": "guide.md"}
+
+        process_companion_file(
+            file_info, self.skill_dir, "owner/repo", "main", False, archive=archive
+        )
+
+        self.assertEqual((self.skill_dir / "guide.md").read_text(), "# Guide\n")
+        mock_raw_get.assert_not_called()
+
+        file_info = {**file_info, "path": path + ".missing"}
+        with self.assertRaises(ValueError):
+            process_companion_file(
+                file_info, self.skill_dir, "owner/repo", "main", False, archive=archive
+            )
+
 
 # ---------------------------------------------------------------------------
 # Tests sync_skill() - Main sync logic with mocking
@@ -858,6 +883,138 @@ class TestSyncSkill(unittest.TestCase):
         self.assertFalse((self.output_dir / "test").exists())
 
 
+
+class TestSkillsCache(unittest.TestCase):
+    """Tests for blob-SHA based incremental skill sync."""
+
+    BASE = "cli-tool/components/skills/development/test"
+
+    def setUp(self):
+        self.tmpdir = _safe_tmpdir(prefix="test_skills_cache_")
+        self.output_dir = Path(self.tmpdir) / "skills"
+        self.skill_dir = self.output_dir / "test"
+        self.cache = {}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _file(self, rel_path, sha):
+        return {
+            "path": f"{self.BASE}/{rel_path}",
+            "name": rel_path.rsplit("/", 1)[-1],
+            "rel_path": rel_path,
+            "size": 10,
+            "sha": sha,
+        }
+
+    def _sync(self, files, force=False):
+        config = {"category": "development", "upstream_path": "development/test"}
+        with patch.object(sync_skills, "fetch_skill_tree", return_value=files):
+            with patch.object(sync_skills, "_raw_get", return_value="# Doc\n") as get:
+                result = sync_skill(
+                    "test",
+                    config,
+                    str(self.output_dir),
+                    "owner/repo",
+                    "main",
+                    verbose=False,
+                    dry_run=False,
+                    force=force,
+                    skill_cache=self.cache,
+                )
+        self.assertTrue(result)
+        return [c.args[0].rsplit("/", 1)[-1] for c in get.call_args_list]
+
+    def test_unchanged_files_are_not_downloaded(self):
+        files = [self._file("guide.md", "a1"), self._file("ref/api.md", "b1")]
+        self.assertEqual(len(self._sync(files)), 2)
+        self.assertEqual(self.cache["test"]["guide.md"]["sha"], "a1")
+        self.assertEqual(self._sync(files), [])
+
+    def test_changed_files_refetched_and_removed_files_pruned(self):
+        self._sync([self._file("guide.md", "a1"), self._file("ref/api.md", "b1")])
+        downloaded = self._sync([self._file("guide.md", "a2")])
+        self.assertEqual(downloaded, ["guide.md"])
+        self.assertFalse((self.skill_dir / "ref").exists())
+        self.assertEqual(list(self.cache["test"]), ["guide.md"])
+
+    def test_forced_sync_prunes_files_removed_upstream(self):
+        """--force starts from an empty cache but still drops removed files."""
+        self._sync([self._file("guide.md", "a1"), self._file("ref/api.md", "b1")])
+        self.cache = {}
+        self.assertEqual(self._sync([self._file("guide.md", "a1")], True), ["guide.md"])
+        self.assertEqual(sorted(os.listdir(self.skill_dir)), ["guide.md"])
+
+    def test_files_predating_the_cache_are_pruned(self):
+        self.skill_dir.mkdir(parents=True)
+        (self.skill_dir / "old.md").write_text("# Old\n", encoding="utf-8")
+        self._sync([self._file("guide.md", "a1")])
+        self.assertEqual(sorted(os.listdir(self.skill_dir)), ["guide.md"])
+
+    def test_handwritten_marker_survives_forced_sync(self):
+        self.skill_dir.mkdir(parents=True)
+        (self.skill_dir / sync_skills.HANDWRITTEN_MARKER).touch()
+        self._sync([self._file("guide.md", "a1")], force=True)
+        self.assertTrue((self.skill_dir / sync_skills.HANDWRITTEN_MARKER).is_file())
+
+    def test_local_edit_forces_refetch(self):
+        files = [self._file("guide.md", "a1")]
+        self._sync(files)
+        (self.skill_dir / "guide.md").write_text("edited", encoding="utf-8")
+        self.assertEqual(self._sync(files), ["guide.md"])
+        self.assertEqual((self.skill_dir / "guide.md").read_text(), "# Doc\n")
+
+    def test_failed_file_keeps_previous_version(self):
+        """A failed download leaves the old skill intact and no staging dir."""
+        self._sync([self._file("guide.md", "a1"), self._file("ref/api.md", "b1")])
+        files = [self._file("guide.md", "a2"), self._file("ref/api.md", "b2")]
+
+        def _get(url):
+            return None if url.endswith("api.md") else "# New\n"
+
+        config = {"category": "development", "upstream_path": "development/test"}
+        with patch.object(sync_skills, "fetch_skill_tree", return_value=files):
+            with patch.object(sync_skills, "_raw_get", side_effect=_get):
+                result = sync_skill(
+                    "test",
+                    config,
+                    str(self.output_dir),
+                    "owner/repo",
+                    "main",
+                    verbose=False,
+                    dry_run=False,
+                    skill_cache=self.cache,
+                )
+        self.assertFalse(result)
+        self.assertEqual((self.skill_dir / "guide.md").read_text(), "# Doc\n")
+        self.assertEqual(self.cache["test"]["guide.md"]["sha"], "a1")
+        self.assertEqual([p.name for p in self.output_dir.iterdir()], ["test"])
+
+    def test_companion_files_downloaded_concurrently(self):
+        """Files of one skill are in flight at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _get(url):
+            barrier.wait()
+            return "# Doc\n"
+
+        files = [self._file("guide.md", "a1"), self._file("ref/api.md", "b1")]
+        config = {"category": "development", "upstream_path": "development/test"}
+        with patch.object(sync_skills, "fetch_skill_tree", return_value=files):
+            with patch.object(sync_skills, "_raw_get", side_effect=_get):
+                result = sync_skill(
+                    "test",
+                    config,
+                    str(self.output_dir),
+                    "owner/repo",
+                    "main",
+                    verbose=False,
+                    dry_run=False,
+                    file_jobs=2,
+                )
+        self.assertTrue(result)
+        self.assertTrue((self.skill_dir / "ref" / "api.md").is_file())
+
 # ---------------------------------------------------------------------------
 # Tests fetch_skill_tree() - with mocking
 # ---------------------------------------------------------------------------
@@ -1056,6 +1213,19 @@ class TestBuildParser(unittest.TestCase):
         args = parser.parse_args(["--filter", "development"])
         self.assertEqual(args.filter, "development")
 
+    def test_jobs_option(self):
+        """--jobs defaults to 1 and accepts -j."""
+        parser = build_parser()
+        self.assertEqual(parser.parse_args([]).jobs, 1)
+        self.assertEqual(parser.parse_args(["-j", "6"]).jobs, 6)
+
+    def test_file_jobs_option(self):
+        """--file-jobs defaults to COMPANION_FILE_JOBS."""
+        parser = build_parser()
+        default = sync_skills.COMPANION_FILE_JOBS
+        self.assertEqual(parser.parse_args([]).file_jobs, default)
+        self.assertEqual(parser.parse_args(["--file-jobs", "2"]).file_jobs, 2)
+
     def test_all_flag(self):
         """Should accept --all flag."""
         parser = build_parser()
@@ -1087,5 +1257,93 @@ class TestBuildParser(unittest.TestCase):
         self.assertTrue(args.verbose)
 
 
+# ---------------------------------------------------------------------------
+# Tests tree-backed discovery (Git Trees API)
+# ---------------------------------------------------------------------------
+
+
+class TestTreeBackedDiscovery(unittest.TestCase):
+    """Tests that discovery is served from a single Git Trees API call."""
+
+    BASE = sync_skills.SKILLS_BASE_PATH
+
+    def setUp(self):
+        sync_common.clear_repo_tree_cache()
+        self.addCleanup(sync_common.clear_repo_tree_cache)
+        paths = {
+            "": "tree",
+            "/development": "tree",
+            "/development/clean-code": "tree",
+            "/development/clean-code/SKILL.md": "blob",
+            "/development/clean-code/scripts": "tree",
+            "/development/clean-code/scripts/lint.py": "blob",
+            "/ai": "tree",
+            "/ai/ml-expert": "tree",
+            "/ai/ml-expert/SKILL.md": "blob",
+        }
+        self.tree = {
+            "truncated": False,
+            "tree": [
+                {"path": self.BASE + path, "type": kind, "sha": path, "size": 10}
+                for path, kind in paths.items()
+            ],
+        }
+
+    def test_discover_all_skills_from_tree(self):
+        with patch.object(sync_skills, "_api_get", return_value=self.tree) as mock:
+            result = discover_all_skills("owner/repo")
+        self.assertEqual(set(result), {"clean-code", "ml-expert"})
+        self.assertEqual(result["ml-expert"]["upstream_path"], "ai/ml-expert")
+        mock.assert_called_once()
+
+    def test_fetch_skill_tree_reuses_discovery_tree(self):
+        with patch.object(sync_skills, "_api_get", return_value=self.tree) as mock:
+            discover_all_skills("owner/repo")
+            files = fetch_skill_tree("development/clean-code", "owner/repo", "main")
+        mock.assert_called_once()
+        self.assertEqual(
+            [f["rel_path"] for f in files], ["SKILL.md", "scripts/lint.py"]
+        )
+        self.assertEqual(
+            files[1]["download_url"],
+            f"{sync_skills.RAW_BASE}/owner/repo/main/{self.BASE}"
+            "/development/clean-code/scripts/lint.py",
+        )
+
+    def test_fetch_skill_tree_uses_subtree_when_repo_tree_truncated(self):
+        """A truncated repo listing falls back to one subtree request."""
+        subtree = {
+            "truncated": False,
+            "tree": [
+                {"path": "SKILL.md", "type": "blob", "sha": "a", "size": 3},
+                {"path": "scripts", "type": "tree", "sha": "b"},
+                {"path": "scripts/lint.py", "type": "blob", "sha": "c", "size": 4},
+            ],
+        }
+
+        def fake_api_get(url):
+            if "/git/trees/main:" in url:
+                return subtree
+            if "/git/trees/" in url:
+                return {"tree": [], "truncated": True}
+            self.fail(f"unexpected Contents API call: {url}")
+
+        with patch.object(sync_skills, "_api_get", side_effect=fake_api_get) as mock:
+            files = fetch_skill_tree("development/clean-code", "owner/repo", "main")
+        self.assertEqual(mock.call_count, 2)
+        self.assertTrue(
+            mock.call_args[0][0].endswith(
+                f"/git/trees/main:{self.BASE}/development/clean-code?recursive=1"
+            )
+        )
+        self.assertEqual(
+            [(f["rel_path"], f["sha"]) for f in files],
+            [("SKILL.md", "a"), ("scripts/lint.py", "c")],
+        )
+        self.assertEqual(
+            files[0]["path"], f"{self.BASE}/development/clean-code/SKILL.md"
+        )
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
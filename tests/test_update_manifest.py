@@ -594,6 +594,21 @@ class TestUpdateManifest(unittest.TestCase):
                 metadata_path=self.metadata_path,
             )
 
+    def test_sync_data_merged_without_sync_file(self):
+        """sync_data is merged in-process; sync_path is never read."""
+        write_json(self.root_path, make_root_manifest())
+
+        result = update_manifest(
+            root_path=self.root_path,
+            sync_path="/nonexistent/sync.json",
+            metadata_path=self.metadata_path,
+            sync_data=make_sync_manifest(agents=[make_agent("in-process")]),
+        )
+
+        self.assertEqual(result["added"], ["in-process"])
+        manifest = load_json(self.root_path)
+        self.assertEqual(manifest["agents"][0]["name"], "in-process")
+
     def test_no_root_manifest_raises(self):
         """Missing root manifest raises ManifestNotFoundError."""
         write_json(self.sync_path, make_sync_manifest())